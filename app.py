@@ -1,18 +1,29 @@
 import streamlit as st
+import json
 import os
+import time
 from datetime import datetime
 
 from database.db_manager import DatabaseManager
-from database.models import Question, ExamSession, EXAM_CONFIG
+from database.snapshot import ensure_database
+from database.profiling import profiler
+from database.models import Question, ExamSession, ExamState, EXAM_CONFIG
 from components.exam_selector import render_exam_selector
 from components.question_display import render_question, render_navigation
 from components.timer import render_timer, get_elapsed_time
+from components.question_navigator import build_navigator_state, render_question_navigator
 from components.results import render_results, render_history
-from components.auth_ui import render_auth_page, render_user_info
+from components.auth_ui import (
+    render_auth_page,
+    restore_session,
+    start_persistent_session,
+    sign_out
+)
 from components.profile import render_profile_page
 from components.leaderboard import render_leaderboard_page
 from components.public_profile import render_public_profile_page
 from auth import AuthManager, User
+from auth.google_oauth import get_secret
 from utils.scoring import calculate_score, calculate_domain_scores, identify_weak_domains, is_answer_correct
 
 st.set_page_config(
@@ -24,17 +35,25 @@ st.set_page_config(
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 DB_PATH = os.path.join(DATA_DIR, "questions.db")
 SEED_PATH = os.path.join(DATA_DIR, "seed_questions.json")
+# Built from SEED_PATH by scripts/build_seed_snapshot.py
+SNAPSHOT_PATH = os.path.join(DATA_DIR, "seed_questions.db")
+
+# Opt-in render timing; the sidebar panel is shown to ADMIN_EMAILS only
+# st.secrets keeps TOML types: RENDER_PROFILING may be a boolean and
+# ADMIN_EMAILS a list
+profiler.enabled = str(get_secret("RENDER_PROFILING")).lower() in ("1", "true", "yes")
+_admin_emails = get_secret("ADMIN_EMAILS")
+if isinstance(_admin_emails, str):
+    _admin_emails = _admin_emails.split(",")
+ADMIN_EMAILS = {str(email).strip().lower() for email in _admin_emails if str(email).strip()}
 
 
 @st.cache_resource
 def get_db_manager():
     """Get or create database manager instance."""
-    db = DatabaseManager(DB_PATH)
-
-    if db.get_question_count("SAA-C03") == 0 and os.path.exists(SEED_PATH):
-        db.import_questions_from_json(SEED_PATH)
-
-    return db
+    # First boot copies the prebuilt seed snapshot into place under a file lock
+    ensure_database(DB_PATH, SEED_PATH, SNAPSHOT_PATH)
+    return DatabaseManager(DB_PATH)
 
 
 @st.cache_resource
@@ -49,26 +68,20 @@ def init_session_state():
         st.session_state.page = "home"
     if "exam_config" not in st.session_state:
         st.session_state.exam_config = None
-    if "questions" not in st.session_state:
-        st.session_state.questions = []
+    if "exam" not in st.session_state:
+        st.session_state.exam = None
     if "current_question" not in st.session_state:
         st.session_state.current_question = 0
-    if "answers" not in st.session_state:
-        st.session_state.answers = {}
-    if "marked_questions" not in st.session_state:
-        st.session_state.marked_questions = set()
     if "start_time" not in st.session_state:
         st.session_state.start_time = None
     if "show_result" not in st.session_state:
         st.session_state.show_result = False
     if "submitted" not in st.session_state:
         st.session_state.submitted = False
-    if "checked_questions" not in st.session_state:
-        st.session_state.checked_questions = set()
-    if "rated_questions" not in st.session_state:
-        st.session_state.rated_questions = set()
     if "show_submit_confirm" not in st.session_state:
         st.session_state.show_submit_confirm = False
+    if "exam_attempt_id" not in st.session_state:
+        st.session_state.exam_attempt_id = None
     # Authentication state
     if "user" not in st.session_state:
         st.session_state.user = None
@@ -83,31 +96,93 @@ def start_exam(db: DatabaseManager, config: dict):
     use_spaced_repetition = config.get("spaced_repetition", False)
     user_id = st.session_state.user_id or 1
 
+    # Question content is shared process-wide; the session keeps only ids
     if use_spaced_repetition:
         # Use spaced repetition algorithm to select questions
         questions = db.get_questions_for_review(exam_type, limit=num_questions, user_id=user_id)
+        db.catalog.put_many(questions)
+        question_ids = [q.id for q in questions]
     else:
-        questions = db.get_questions_by_exam(exam_type, limit=num_questions)
-        questions.sort(key=lambda q: (q.difficulty, q.id))
+        question_ids = db.get_question_ids_by_exam(exam_type, limit=num_questions)
+        db.catalog.get_many(question_ids)
 
     st.session_state.exam_config = config
-    st.session_state.questions = questions
+    st.session_state.exam = ExamState.new(question_ids)
     st.session_state.current_question = 0
-    st.session_state.answers = {}
-    st.session_state.marked_questions = set()
     st.session_state.start_time = datetime.now()
     st.session_state.show_result = False
     st.session_state.submitted = False
-    st.session_state.checked_questions = set()
-    st.session_state.rated_questions = set()
     st.session_state.show_submit_confirm = False
+    st.session_state.exam_attempt_id = db.start_exam_progress(user_id, config, question_ids)
+    st.session_state.last_checkpoint = time.monotonic()
+    st.session_state.pending_resume = None
     st.session_state.page = "exam"
 
 
+def resume_exam(db: DatabaseManager, progress: dict):
+    """Restore an unfinished exam from its checkpoint."""
+    exam = progress["exam"]
+    db.catalog.get_many(exam.question_ids)
+
+    st.session_state.exam_config = progress["config"]
+    st.session_state.exam = exam
+    st.session_state.current_question = progress["current_question"]
+    # The exam clock keeps running while disconnected
+    st.session_state.start_time = progress["started_at"]
+    st.session_state.show_result = False
+    st.session_state.submitted = False
+    st.session_state.show_submit_confirm = False
+    st.session_state.exam_attempt_id = progress["attempt_id"]
+    st.session_state.last_checkpoint = time.monotonic()
+    st.session_state.pending_resume = None
+    st.session_state.page = "exam"
+
+
+# Changes are coalesced in ExamState and written at most this often
+CHECKPOINT_INTERVAL_SECONDS = 5
+
+
+def checkpoint_exam(db: DatabaseManager):
+    """Persist exam changes since the last checkpoint, rate limited."""
+    exam = st.session_state.exam
+    attempt_id = st.session_state.exam_attempt_id
+    if not exam or not attempt_id or st.session_state.submitted:
+        return
+
+    # The clock needs no checkpoints: a resumed exam runs from its start time
+    if not exam.changed:
+        return
+    if time.monotonic() - st.session_state.get("last_checkpoint", 0) < CHECKPOINT_INTERVAL_SECONDS:
+        return
+
+    db.save_exam_progress(
+        st.session_state.user_id or 1,
+        attempt_id,
+        exam.pop_changes(),
+        st.session_state.current_question
+    )
+    st.session_state.last_checkpoint = time.monotonic()
+
+
+def end_exam_progress(db: DatabaseManager):
+    """Drop the checkpoints of the current exam once it is submitted or abandoned."""
+    if st.session_state.exam_attempt_id:
+        db.clear_exam_progress(st.session_state.user_id or 1, st.session_state.exam_attempt_id)
+        st.session_state.exam_attempt_id = None
+
+
+def get_exam_questions(db: DatabaseManager) -> list:
+    """Resolve the current exam's question ids through the shared catalog."""
+    exam = st.session_state.exam
+    if not exam:
+        return []
+    return db.catalog.get_many(exam.question_ids)
+
+
 def submit_exam(db: DatabaseManager):
     """Submit the exam and save results."""
-    questions = st.session_state.questions
-    answers = st.session_state.answers
+    questions = get_exam_questions(db)
+    answers = st.session_state.exam.answers_by_id()
     config = st.session_state.exam_config
     user_id = st.session_state.user_id or 1
 
@@ -128,255 +203,285 @@ def submit_exam(db: DatabaseManager):
     )
 
     db.save_exam_session(session, user_id=user_id)
+    end_exam_progress(db)
 
     st.session_state.submitted = True
     st.session_state.page = "results"
 
 
+# The exam page is split into fragments so an interaction reruns only its own
+# region. Anything that changes the current question or show_result reruns the
+# whole app, since every region depends on those.
+STATUS_REFRESH_SECONDS = 10
+
+
+@st.fragment(run_every=STATUS_REFRESH_SECONDS)
+@profiler.timed("render_exam_status")
+def render_exam_status(db: DatabaseManager, config: dict):
+    """
+    Timer and answered count. The timer component reruns this fragment when
+    time runs out; the periodic refresh keeps the answered count current.
+    """
+    exam = st.session_state.exam
+
+    # The periodic refresh bounds how long a change can stay unsaved
+    checkpoint_exam(db)
+
+    if config.get("timed") and config.get("time_minutes", 0) > 0:
+        time_expired, elapsed = render_timer(
+            st.session_state.start_time,
+            config["time_minutes"]
+        )
+        if time_expired and not st.session_state.submitted:
+            submit_exam(db)
+            st.rerun(scope="app")
+
+    st.markdown("---")
+
+    answered = exam.answered_count
+    st.progress(answered / len(exam))
+    st.caption(f"Answered: {answered}/{len(exam)}")
+
+
+@st.fragment
+@profiler.timed("render_question_panel")
+def render_question_panel(db: DatabaseManager, question: Question, current_idx: int):
+    """Question, answer options and the question action buttons."""
+    exam = st.session_state.exam
+    total = len(exam)
+
+    current_answer = exam.get_answer(current_idx)
+    is_marked = exam.has_flag(current_idx, ExamState.FLAG_MARKED)
+
+    selected_answer, _ = render_question(
+        question=question,
+        question_number=current_idx + 1,
+        total_questions=total,
+        current_answer=current_answer,
+        show_result=st.session_state.show_result,
+        marked_for_review=is_marked
+    )
+
+    if selected_answer and not st.session_state.show_result:
+        exam.set_answer(current_idx, selected_answer)
+        checkpoint_exam(db)
+
+    st.markdown("---")
+
+    col_a, col_b, col_c, col_d = st.columns(4)
+
+    with col_a:
+        if st.button("Previous", disabled=current_idx == 0, use_container_width=True):
+            st.session_state.show_result = False
+            st.session_state.current_question = max(0, current_idx - 1)
+            st.rerun(scope="app")
+
+    with col_b:
+        if st.button("Next", disabled=current_idx >= total - 1, use_container_width=True):
+            st.session_state.show_result = False
+            st.session_state.current_question = min(total - 1, current_idx + 1)
+            st.rerun(scope="app")
+
+    with col_c:
+        mark_label = "Unmark" if is_marked else "Mark"
+        if st.button(mark_label, use_container_width=True):
+            exam.set_flag(current_idx, ExamState.FLAG_MARKED, not is_marked)
+            st.rerun(scope="app")
+
+    with col_d:
+        if not st.session_state.show_result:
+            if st.button("Check Answer", use_container_width=True,
+                        disabled=exam.get_answer(current_idx) is None):
+                st.session_state.show_result = True
+                exam.set_flag(current_idx, ExamState.FLAG_CHECKED)
+                st.rerun(scope="app")
+        else:
+            if st.button("Hide Answer", use_container_width=True):
+                st.session_state.show_result = False
+                st.rerun(scope="app")
+
+
+def _rate_question(db: DatabaseManager, auth_manager, question_id: int, current_idx: int,
+                   rating: int, was_correct: bool, xp: int):
+    """Rating button callback; runs before the fragment redraws."""
+    user_id = st.session_state.user_id or 1
+    db.update_question_stats(question_id, was_correct, rating, user_id=user_id)
+    if was_correct:
+        auth_manager.add_experience(user_id, xp)
+    st.session_state.exam.set_flag(current_idx, ExamState.FLAG_RATED)
+
+
+@st.fragment
+@profiler.timed("render_rating_bar")
+def render_rating_bar(db: DatabaseManager, auth_manager, question: Question, current_idx: int):
+    """Confidence rating for spaced repetition, shown after checking an answer."""
+    exam = st.session_state.exam
+
+    if exam.has_flag(current_idx, ExamState.FLAG_RATED):
+        st.success("Rating saved for spaced repetition!")
+        return
+
+    user_answer = exam.get_answer(current_idx) or ''
+    was_correct = is_answer_correct(user_answer, question.correct_answer)
+
+    st.markdown("---")
+    st.markdown("**Rate your confidence:** _(for spaced repetition)_")
+
+    # Show XP info
+    if was_correct:
+        st.caption(f"Correct! You'll earn XP based on your rating.")
+    else:
+        st.caption("Incorrect - No XP awarded. Keep practicing!")
+
+    rate_cols = st.columns(4)
+
+    # XP awards: correct answers get XP, rating affects bonus
+    # Again: +2 XP, Hard: +5 XP, Good: +10 XP, Easy: +15 XP
+    xp_rewards = {1: 2, 2: 5, 3: 10, 4: 15}
+    ratings = [
+        (1, "Again", "Review again soon"),
+        (2, "Hard", "Was difficult, review sooner"),
+        (3, "Good", "Normal review interval"),
+        (4, "Easy", "Too easy, review later"),
+    ]
+
+    for col, (rating, label, hint) in zip(rate_cols, ratings):
+        with col:
+            st.button(label, key=f"rate_{rating}_{question.id}", use_container_width=True,
+                      help=f"{hint} (+{xp_rewards[rating]} XP if correct)",
+                      on_click=_rate_question,
+                      args=(db, auth_manager, question.id, current_idx, rating,
+                            was_correct, xp_rewards[rating]))
+
+
+@st.fragment
+@profiler.timed("render_navigator_panel")
+def render_navigator_panel(db: DatabaseManager, current_idx: int):
+    """Question grid; jumping to a question reruns the whole page."""
+    st.markdown("### Question Navigator")
+
+    navigator_state = build_navigator_state(st.session_state.exam, db.catalog)
+    clicked = render_question_navigator(navigator_state, current_idx)
+    if clicked is not None and clicked != current_idx:
+        st.session_state.show_result = False
+        st.session_state.current_question = clicked
+        st.rerun(scope="app")
+
+
+def _open_submit_confirm():
+    """Submit button callback: ask first if questions are still unanswered."""
+    exam = st.session_state.exam
+    st.session_state.show_submit_confirm = exam.answered_count < len(exam)
+
+
+def _close_submit_confirm():
+    st.session_state.show_submit_confirm = False
+
+
+@st.fragment
+@profiler.timed("render_submit_bar")
+def render_submit_bar(db: DatabaseManager):
+    """Submit button and the unanswered-questions confirmation."""
+    exam = st.session_state.exam
+    unanswered = len(exam) - exam.answered_count
+
+    if not st.session_state.show_submit_confirm:
+        # With unanswered questions the callback switches to the confirmation
+        # instead, so a click only reaches this branch when everything is answered
+        if st.button("Submit Exam", type="primary", use_container_width=True,
+                     on_click=_open_submit_confirm):
+            submit_exam(db)
+            st.rerun(scope="app")
+    else:
+        st.warning(f"You have {unanswered} unanswered questions. Are you sure you want to submit?")
+        col_yes, col_no = st.columns(2)
+        with col_yes:
+            if st.button("Yes, Submit", type="primary", use_container_width=True):
+                st.session_state.show_submit_confirm = False
+                submit_exam(db)
+                st.rerun(scope="app")
+        with col_no:
+            st.button("No, Continue", use_container_width=True, on_click=_close_submit_confirm)
+
+
+@profiler.timed("render_exam_page")
 def render_exam_page(db: DatabaseManager, auth_manager):
     """Render the exam taking page."""
     config = st.session_state.exam_config
-    questions = st.session_state.questions
+    exam = st.session_state.exam
     current_idx = st.session_state.current_question
 
-    if not questions:
+    question = db.catalog.get(exam.question_ids[current_idx]) if exam else None
+
+    if not question:
         st.error("No questions available. Please return to home.")
         if st.button("Return to Home"):
             st.session_state.page = "home"
             st.rerun()
         return
 
-    question = questions[current_idx]
-    total = len(questions)
+    checkpoint_exam(db)
 
     col1, col2 = st.columns([3, 1])
 
     with col2:
-        if config.get("timed") and config.get("time_minutes", 0) > 0:
-            time_expired, elapsed = render_timer(
-                st.session_state.start_time,
-                config["time_minutes"]
-            )
-            if time_expired and not st.session_state.submitted:
-                submit_exam(db)
-                st.rerun()
-
-        st.markdown("---")
-
-        progress = len(st.session_state.answers) / total
-        st.progress(progress)
-        st.caption(f"Answered: {len(st.session_state.answers)}/{total}")
+        render_exam_status(db, config)
 
         if st.button("End Exam", type="secondary", use_container_width=True):
+            end_exam_progress(db)
             st.session_state.page = "home"
             st.rerun()
 
     with col1:
-        current_answer = st.session_state.answers.get(question.id)
-        is_marked = (current_idx + 1) in st.session_state.marked_questions
-
-        selected_answer, _ = render_question(
-            question=question,
-            question_number=current_idx + 1,
-            total_questions=total,
-            current_answer=current_answer,
-            show_result=st.session_state.show_result,
-            marked_for_review=is_marked
-        )
-
-        if selected_answer and not st.session_state.show_result:
-            st.session_state.answers[question.id] = selected_answer
-
-        st.markdown("---")
-
-        col_a, col_b, col_c, col_d = st.columns(4)
-
-        with col_a:
-            if st.button("Previous", disabled=current_idx == 0, use_container_width=True):
-                st.session_state.show_result = False
-                st.session_state.current_question = max(0, current_idx - 1)
-                st.rerun()
-
-        with col_b:
-            if st.button("Next", disabled=current_idx >= total - 1, use_container_width=True):
-                st.session_state.show_result = False
-                st.session_state.current_question = min(total - 1, current_idx + 1)
-                st.rerun()
-
-        with col_c:
-            q_num = current_idx + 1
-            is_marked = q_num in st.session_state.marked_questions
-            mark_label = "Unmark" if is_marked else "Mark"
-            if st.button(mark_label, use_container_width=True):
-                if is_marked:
-                    st.session_state.marked_questions.discard(q_num)
-                else:
-                    st.session_state.marked_questions.add(q_num)
-                st.rerun()
-
-        with col_d:
-            if not st.session_state.show_result:
-                if st.button("Check Answer", use_container_width=True,
-                            disabled=question.id not in st.session_state.answers):
-                    st.session_state.show_result = True
-                    st.session_state.checked_questions.add(question.id)
-                    st.rerun()
-            else:
-                if st.button("Hide Answer", use_container_width=True):
-                    st.session_state.show_result = False
-                    st.rerun()
+        render_question_panel(db, question, current_idx)
 
         # Show rating buttons after checking answer (for spaced repetition)
-        if st.session_state.show_result and question.id not in st.session_state.rated_questions:
-            user_answer = st.session_state.answers.get(question.id, '')
-            was_correct = is_answer_correct(user_answer, question.correct_answer)
+        if st.session_state.show_result:
+            render_rating_bar(db, auth_manager, question, current_idx)
 
-            st.markdown("---")
-            st.markdown("**Rate your confidence:** _(for spaced repetition)_")
-
-            # Show XP info
-            if was_correct:
-                base_xp = 10 + (question.difficulty * 2)
-                st.caption(f"Correct! You'll earn XP based on your rating.")
-            else:
-                st.caption("Incorrect - No XP awarded. Keep practicing!")
+        st.markdown("---")
 
-            rate_cols = st.columns(4)
+        render_navigator_panel(db, current_idx)
 
-            user_id = st.session_state.user_id or 1
+        st.markdown("---")
 
-            # XP awards: correct answers get XP, rating affects bonus
-            # Again: +2 XP, Hard: +5 XP, Good: +10 XP, Easy: +15 XP
-            xp_rewards = {1: 2, 2: 5, 3: 10, 4: 15}
-
-            with rate_cols[0]:
-                if st.button("Again", key=f"rate_1_{question.id}", use_container_width=True,
-                            help="Review again soon (+2 XP if correct)"):
-                    db.update_question_stats(question.id, was_correct, 1, user_id=user_id)
-                    if was_correct:
-                        auth_manager.add_experience(user_id, xp_rewards[1])
-                    st.session_state.rated_questions.add(question.id)
-                    st.rerun()
-
-            with rate_cols[1]:
-                if st.button("Hard", key=f"rate_2_{question.id}", use_container_width=True,
-                            help="Was difficult, review sooner (+5 XP if correct)"):
-                    db.update_question_stats(question.id, was_correct, 2, user_id=user_id)
-                    if was_correct:
-                        auth_manager.add_experience(user_id, xp_rewards[2])
-                    st.session_state.rated_questions.add(question.id)
-                    st.rerun()
-
-            with rate_cols[2]:
-                if st.button("Good", key=f"rate_3_{question.id}", use_container_width=True,
-                            help="Normal review interval (+10 XP if correct)"):
-                    db.update_question_stats(question.id, was_correct, 3, user_id=user_id)
-                    if was_correct:
-                        auth_manager.add_experience(user_id, xp_rewards[3])
-                    st.session_state.rated_questions.add(question.id)
-                    st.rerun()
-
-            with rate_cols[3]:
-                if st.button("Easy", key=f"rate_4_{question.id}", use_container_width=True,
-                            help="Too easy, review later (+15 XP if correct)"):
-                    db.update_question_stats(question.id, was_correct, 4, user_id=user_id)
-                    if was_correct:
-                        auth_manager.add_experience(user_id, xp_rewards[4])
-                    st.session_state.rated_questions.add(question.id)
-                    st.rerun()
-
-        elif st.session_state.show_result and question.id in st.session_state.rated_questions:
-            st.success("Rating saved for spaced repetition!")
+        render_submit_bar(db)
 
-        st.markdown("---")
 
-        st.markdown("### Question Navigator")
-
-        cols = st.columns(13)
-        for i in range(total):
-            q_num = i + 1
-            col_idx = i % 13
-
-            q = questions[i]
-            is_answered = q.id in st.session_state.answers
-            is_checked = q.id in st.session_state.checked_questions
-            is_current = i == current_idx
-            is_marked_q = q_num in st.session_state.marked_questions
-
-            # Check if answer is correct (only matters if checked)
-            user_answer = st.session_state.answers.get(q.id, '')
-            is_correct = is_answer_correct(user_answer, q.correct_answer) if user_answer else False
-
-            with cols[col_idx]:
-                # Determine background color based on answer status
-                if is_marked_q:
-                    # Marked questions shown in orange
-                    bg_color = "orange"
-                    text_color = "black"
-                elif is_checked:
-                    # Only show correct/incorrect after "Check Answer" clicked
-                    if is_correct:
-                        # Correct answer: green
-                        bg_color = "#28a745"
-                        text_color = "white"
-                    else:
-                        # Wrong answer: red
-                        bg_color = "#dc3545"
-                        text_color = "white"
-                elif is_answered:
-                    # Answered but not yet checked: blue
-                    bg_color = "#007bff"
-                    text_color = "white"
-                else:
-                    # Not answered: gray
-                    bg_color = "#6c757d"
-                    text_color = "white"
-
-                # Add border for current question
-                border_style = "border: 3px solid #007bff;" if is_current else ""
-
-                st.markdown(
-                    f"<div style='text-align:center;background-color:{bg_color};color:{text_color};"
-                    f"padding:5px;border-radius:5px;{border_style}'>"
-                    f"<b>{q_num}</b></div>",
-                    unsafe_allow_html=True
-                )
-
-                if st.button(" ", key=f"nav_{q_num}", use_container_width=True):
-                    st.session_state.show_result = False
-                    st.session_state.current_question = i
-                    st.rerun()
+def render_resume_prompt(db: DatabaseManager, user_id: int):
+    """Offer to resume an exam left unfinished by a refresh, disconnect or restart."""
+    # Looked up once per session (and per user) rather than on every rerun
+    pending = st.session_state.get("pending_resume", False)
+    if pending is False or (pending and pending["user_id"] != user_id):
+        pending = db.get_exam_progress(user_id)
+        st.session_state.pending_resume = pending
+    if not pending:
+        return
 
-        st.markdown("---")
+    exam = pending["exam"]
+    exam_name = EXAM_CONFIG.get(pending["config"]["exam_type"], {}).get("name", pending["config"]["exam_type"])
+    st.info(f"You have an unfinished {exam_name} exam: "
+            f"{exam.answered_count}/{len(exam)} answered, question {pending['current_question'] + 1}.")
 
-        unanswered = total - len(st.session_state.answers)
+    col_resume, col_discard = st.columns(2)
+    with col_resume:
+        if st.button("Resume Exam", type="primary", use_container_width=True):
+            resume_exam(db, pending)
+            st.rerun()
+    with col_discard:
+        if st.button("Discard", use_container_width=True):
+            db.clear_exam_progress(user_id, pending["attempt_id"])
+            st.session_state.pending_resume = None
+            st.rerun()
 
-        if not st.session_state.show_submit_confirm:
-            if st.button("Submit Exam", type="primary", use_container_width=True):
-                if unanswered > 0:
-                    st.session_state.show_submit_confirm = True
-                    st.rerun()
-                else:
-                    submit_exam(db)
-                    st.rerun()
-        else:
-            st.warning(f"You have {unanswered} unanswered questions. Are you sure you want to submit?")
-            col_yes, col_no = st.columns(2)
-            with col_yes:
-                if st.button("Yes, Submit", type="primary", use_container_width=True):
-                    st.session_state.show_submit_confirm = False
-                    submit_exam(db)
-                    st.rerun()
-            with col_no:
-                if st.button("No, Continue", use_container_width=True):
-                    st.session_state.show_submit_confirm = False
-                    st.rerun()
+    st.markdown("---")
 
 
+@profiler.timed("render_results_page")
 def render_results_page(db: DatabaseManager):
     """Render the results page."""
-    questions = st.session_state.questions
-    answers = st.session_state.answers
+    questions = get_exam_questions(db)
+    answers = st.session_state.exam.answers_by_id()
     config = st.session_state.exam_config
     time_spent = get_elapsed_time(st.session_state.start_time)
 
@@ -403,6 +508,39 @@ def render_results_page(db: DatabaseManager):
             render_history(sessions)
 
 
+def render_profiling_panel():
+    """Admin-only table of recent render timings, plus a JSON dump."""
+    report = profiler.snapshot()
+    with st.expander("⏱ Render Timings"):
+        if not report:
+            st.caption("No reruns recorded yet.")
+            return
+
+        rows = ["| Region | Runs | Wall p50/p95/p99 (ms) | DB calls p50/p95 | DB p50/p95/p99 (ms) |",
+                "|---|---|---|---|---|"]
+        for label, entry in report.items():
+            wall, calls, db_ms = entry["wall_ms"], entry["db_calls"], entry["db_ms"]
+            rows.append(
+                f"| {label} | {entry['runs']} "
+                f"| {wall['p50']:.1f} / {wall['p95']:.1f} / {wall['p99']:.1f} "
+                f"| {calls['p50']:.0f} / {calls['p95']:.0f} "
+                f"| {db_ms['p50']:.1f} / {db_ms['p95']:.1f} / {db_ms['p99']:.1f} |"
+            )
+        st.markdown("\n".join(rows))
+
+        st.download_button(
+            "Download JSON",
+            data=json.dumps(report, indent=2),
+            file_name="render_timings.json",
+            mime="application/json",
+            use_container_width=True
+        )
+        if st.button("Reset", use_container_width=True):
+            profiler.reset()
+            st.rerun()
+
+
+@profiler.timed("main")
 def main():
     """Main application entry point."""
     init_session_state()
@@ -410,12 +548,20 @@ def main():
     db = get_db_manager()
     auth_manager = get_auth_manager()
 
+    # Returning browsers are re-authenticated from their session token
+    if st.session_state.user is None:
+        user = restore_session(auth_manager)
+        if user:
+            st.session_state.user = user
+            st.session_state.user_id = user.id
+
     # Check if user is authenticated
     if st.session_state.user is None:
         user = render_auth_page(auth_manager)
         if user:
             st.session_state.user = user
             st.session_state.user_id = user.id
+            start_persistent_session(auth_manager, user)
             st.rerun()
         return
 
@@ -431,10 +577,7 @@ def main():
         with header_col2:
             st.write("")  # Spacer
             if st.button("🚪", help="Sign Out", use_container_width=True):
-                if 'user' in st.session_state:
-                    del st.session_state['user']
-                if 'user_id' in st.session_state:
-                    del st.session_state['user_id']
+                sign_out(auth_manager)
                 st.rerun()
 
         st.markdown("---")
@@ -472,6 +615,10 @@ def main():
             st.progress(progress["avg_success_rate"] / 100)
             st.caption(f"Success rate: {progress['avg_success_rate']:.1f}%")
 
+        if profiler.enabled and (user.email or "").lower() in ADMIN_EMAILS:
+            st.markdown("---")
+            render_profiling_panel()
+
         st.markdown("---")
         st.markdown("### About")
         st.markdown("""
@@ -489,6 +636,8 @@ def main():
         st.caption("© Practice Exams 2026")
 
     if st.session_state.page == "home":
+        render_resume_prompt(db, user_id)
+
         # Get question counts for all exam types
         question_counts = {
             exam_type: db.get_question_count(exam_type)
@@ -506,13 +655,16 @@ def main():
         render_results_page(db)
 
     elif st.session_state.page == "profile":
-        render_profile_page(user, auth_manager)
+        with profiler.measure("render_profile_page"):
+            render_profile_page(user, auth_manager)
 
     elif st.session_state.page == "leaderboard":
-        render_leaderboard_page(user, auth_manager)
+        with profiler.measure("render_leaderboard_page"):
+            render_leaderboard_page(user, auth_manager)
 
     elif st.session_state.page == "public_profile":
-        render_public_profile_page(user, auth_manager)
+        with profiler.measure("render_public_profile_page"):
+            render_public_profile_page(user, auth_manager)
 
 
 if __name__ == "__main__":
@@ -2,84 +2,58 @@ import sqlite3
 import bcrypt
 import re
 import os
-from datetime import datetime
+import hashlib
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
 from typing import Optional, Tuple, List, Dict, Any
 from .models import User, Certification
+from .rate_limiter import TokenBucketLimiter, EMAIL_POLICY, email_limit, client_limit
+from database.migrations import migrate
+from database.coherence import ChangeWatcher, SESSIONS_SCOPE, record_change
+from database.profiling import profiler
+
+
+# Default lifetime of a persistent login session
+SESSION_TTL_DAYS = 30
+
+# XP ledger tuning: events older than XP_COMPACT_AFTER_MINUTES are folded
+# into users.experience
+XP_COMPACT_INTERVAL_SECONDS = 3600
+XP_COMPACT_AFTER_MINUTES = 60
+XP_RETAIN_DAYS = 90
+
+# Total XP = compacted total + events appended after the compaction watermark
+LIVE_EXPERIENCE_SQL = '''
+    (COALESCE(u.experience, 0) + COALESCE((
+        SELECT SUM(x.points) FROM xp_events x
+        WHERE x.user_id = u.id
+        AND x.id > (SELECT last_event_id FROM xp_compaction WHERE id = 1)
+    ), 0))
+'''
 
 
 class AuthManager:
     def __init__(self, db_path: str):
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # token_hash -> (user_id, expires_at), shared by all script threads
+        self._session_cache: Dict[str, Tuple[int, datetime]] = {}
+        self._session_lock = threading.Lock()
+        self._xp_last_compaction = 0.0
         self._init_database()
+        # Revocations by other processes must evict cached sessions here too
+        self.watcher = ChangeWatcher(db_path)
+        self.login_limiter = TokenBucketLimiter(db_path)
 
     def _get_connection(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
+        conn = profiler.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
 
     def _init_database(self):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        # Users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                email TEXT UNIQUE NOT NULL,
-                username TEXT NOT NULL,
-                password_hash TEXT,
-                auth_provider TEXT DEFAULT 'email',
-                created_at DATETIME NOT NULL,
-                last_login DATETIME
-            )
-        ''')
-
-        # Migration: Add new user profile columns
-        cursor.execute("PRAGMA table_info(users)")
-        user_columns = [col[1] for col in cursor.fetchall()]
-
-        if 'nickname' not in user_columns:
-            cursor.execute('ALTER TABLE users ADD COLUMN nickname TEXT')
-        if 'phone' not in user_columns:
-            cursor.execute('ALTER TABLE users ADD COLUMN phone TEXT')
-        if 'show_in_leaderboard' not in user_columns:
-            cursor.execute('ALTER TABLE users ADD COLUMN show_in_leaderboard INTEGER DEFAULT 0')
-        if 'experience' not in user_columns:
-            cursor.execute('ALTER TABLE users ADD COLUMN experience INTEGER DEFAULT 0')
-        if 'credly_url' not in user_columns:
-            cursor.execute('ALTER TABLE users ADD COLUMN credly_url TEXT')
-
-        # Certifications table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS certifications (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                name TEXT NOT NULL,
-                code TEXT NOT NULL,
-                issued_date DATETIME,
-                expiry_date DATETIME,
-                credential_id TEXT,
-                credly_badge_url TEXT,
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
-
-        # Add user_id column to existing tables if not exists
-        # Check if user_id exists in question_stats
-        cursor.execute("PRAGMA table_info(question_stats)")
-        columns = [col[1] for col in cursor.fetchall()]
-        if 'user_id' not in columns:
-            cursor.execute('ALTER TABLE question_stats ADD COLUMN user_id INTEGER DEFAULT 1')
-
-        # Check if user_id exists in exam_sessions
-        cursor.execute("PRAGMA table_info(exam_sessions)")
-        columns = [col[1] for col in cursor.fetchall()]
-        if 'user_id' not in columns:
-            cursor.execute('ALTER TABLE exam_sessions ADD COLUMN user_id INTEGER DEFAULT 1')
-
-        conn.commit()
-        conn.close()
+        migrate(self.db_path)
 
     def _hash_password(self, password: str) -> str:
         """Hash a password using bcrypt."""
@@ -164,11 +138,28 @@ class AuthManager:
             conn.close()
             return False, f"Registration failed: {str(e)}", None
 
-    def login(self, email: str, password: str) -> Tuple[bool, str, Optional[User]]:
+    def _throttle_message(self, *limits) -> Optional[str]:
+        """Consume one attempt from each limit; return an error message if over budget."""
+        allowed, retry_after = self.login_limiter.check(*[l for l in limits if l])
+        if allowed:
+            return None
+        return f"Too many attempts. Please try again in {retry_after} seconds"
+
+    def get_throttle_metrics(self) -> Dict[str, int]:
+        """Login throttling counters for monitoring."""
+        return self.login_limiter.get_metrics()
+
+    def login(self, email: str, password: str,
+              client_id: Optional[str] = None) -> Tuple[bool, str, Optional[User]]:
         """
         Login with email and password.
+        Attempts are throttled per email and per client before any bcrypt work.
         Returns: (success, message, user)
         """
+        throttled = self._throttle_message(email_limit(email), client_limit(client_id))
+        if throttled:
+            return False, throttled, None
+
         conn = self._get_connection()
         cursor = conn.cursor()
 
@@ -200,6 +191,7 @@ class AuthManager:
 
         user_data['last_login'] = now
         user = User.from_dict(user_data)
+        self.login_limiter.reset(email_limit(email)[0])
 
         return True, "Login successful", user
 
@@ -255,17 +247,144 @@ class AuthManager:
                 conn.close()
                 return False, f"Registration failed: {str(e)}", None
 
+    # Persistent Session Methods
+
+    def _hash_session_token(self, token: str) -> str:
+        """Hash a session token for storage and lookup."""
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def create_session(self, user_id: int, ttl_days: int = SESSION_TTL_DAYS) -> str:
+        """
+        Create a persistent login session for a user.
+        Returns the opaque session token to hand to the browser.
+        """
+        token = secrets.token_urlsafe(32)
+        token_hash = self._hash_session_token(token)
+        now = datetime.now()
+        expires_at = now + timedelta(days=ttl_days)
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO user_sessions (token_hash, user_id, created_at, expires_at)
+            VALUES (?, ?, ?, ?)
+        ''', (token_hash, user_id, now.isoformat(), expires_at.isoformat()))
+        conn.commit()
+        conn.close()
+
+        with self._session_lock:
+            self._session_cache[token_hash] = (user_id, expires_at)
+
+        return token
+
+    def get_user_by_session(self, token: str) -> Optional[User]:
+        """
+        Resolve a session token to its user without any password verification.
+        Returns None if the token is unknown, expired or revoked.
+        """
+        if not token:
+            return None
+
+        token_hash = self._hash_session_token(token)
+        now = datetime.now()
+
+        if SESSIONS_SCOPE in self.watcher.poll():
+            with self._session_lock:
+                self._session_cache.clear()
+
+        with self._session_lock:
+            cached = self._session_cache.get(token_hash)
+
+        if cached:
+            user_id, expires_at = cached
+            if expires_at <= now:
+                self.revoke_session(token)
+                return None
+            return self.get_user_by_id(user_id)
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT u.*, s.expires_at AS session_expires_at
+            FROM user_sessions s
+            JOIN users u ON u.id = s.user_id
+            WHERE s.token_hash = ? AND s.revoked = 0 AND s.expires_at > ?
+        ''', (token_hash, now.isoformat()))
+        row = cursor.fetchone()
+        conn.close()
+
+        if not row:
+            return None
+
+        user_data = dict(row)
+        expires_at = datetime.fromisoformat(user_data.pop('session_expires_at'))
+        with self._session_lock:
+            self._session_cache[token_hash] = (user_data['id'], expires_at)
+
+        return User.from_dict(user_data)
+
+    def revoke_session(self, token: str):
+        """Revoke a single session (e.g. on sign out)."""
+        if not token:
+            return
+
+        token_hash = self._hash_session_token(token)
+        with self._session_lock:
+            self._session_cache.pop(token_hash, None)
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute('UPDATE user_sessions SET revoked = 1 WHERE token_hash = ?', (token_hash,))
+        seq = record_change(cursor, SESSIONS_SCOPE)
+        conn.commit()
+        conn.close()
+        self.watcher.acknowledge(seq)
+
+    def revoke_user_sessions(self, user_id: int):
+        """Revoke every session belonging to a user (e.g. after a password change)."""
+        with self._session_lock:
+            for token_hash in [h for h, (uid, _) in self._session_cache.items() if uid == user_id]:
+                del self._session_cache[token_hash]
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute('UPDATE user_sessions SET revoked = 1 WHERE user_id = ?', (user_id,))
+        seq = record_change(cursor, SESSIONS_SCOPE)
+        conn.commit()
+        conn.close()
+        self.watcher.acknowledge(seq)
+
+    def purge_expired_sessions(self) -> int:
+        """Delete expired and revoked sessions. Returns the number of rows removed."""
+        now = datetime.now()
+        with self._session_lock:
+            for token_hash in [h for h, (_, exp) in self._session_cache.items() if exp <= now]:
+                del self._session_cache[token_hash]
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM user_sessions WHERE revoked = 1 OR expires_at <= ?', (now.isoformat(),))
+        removed = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return removed
+
     def get_user_by_id(self, user_id: int) -> Optional[User]:
-        """Get a user by their ID."""
+        """Get a user by their ID, with experience including recent ledger events."""
         conn = self._get_connection()
         cursor = conn.cursor()
 
-        cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
+        cursor.execute(f'''
+            SELECT u.*, {LIVE_EXPERIENCE_SQL} AS live_experience
+            FROM users u WHERE u.id = ?
+        ''', (user_id,))
         row = cursor.fetchone()
         conn.close()
 
         if row:
-            return User.from_dict(dict(row))
+            user_data = dict(row)
+            user_data['experience'] = user_data.pop('live_experience')
+            return User.from_dict(user_data)
         return None
 
     def get_user_by_email(self, email: str) -> Optional[User]:
@@ -308,11 +427,16 @@ class AuthManager:
             return False, f"Failed to update profile: {str(e)}"
 
     def change_password(self, user_id: int, current_password: str,
-                       new_password: str) -> Tuple[bool, str]:
+                       new_password: str, client_id: Optional[str] = None) -> Tuple[bool, str]:
         """
         Change user password (only for email auth users).
+        Attempts are throttled per user and per client before any bcrypt work.
         Returns: (success, message)
         """
+        throttled = self._throttle_message((f"user:{user_id}", EMAIL_POLICY), client_limit(client_id))
+        if throttled:
+            return False, throttled
+
         conn = self._get_connection()
         cursor = conn.cursor()
 
@@ -352,6 +476,7 @@ class AuthManager:
 
             conn.commit()
             conn.close()
+            self.revoke_user_sessions(user_id)
             return True, "Password changed successfully"
 
         except Exception as e:
@@ -361,6 +486,7 @@ class AuthManager:
     def get_leaderboard_users(self, weekly: bool = False) -> List[Dict[str, Any]]:
         """
         Get users who have opted in to the leaderboard, along with their exam stats.
+        On the weekly board 'experience' is the XP earned in the last 7 days.
         Returns list of dicts with user info and statistics.
         """
         conn = self._get_connection()
@@ -371,23 +497,32 @@ class AuthManager:
         if weekly:
             date_filter = "AND es.date >= datetime('now', '-7 days')"
 
+        week_start = (datetime.now() - timedelta(days=7)).isoformat()
+        order_column = "weekly_experience" if weekly else "total_experience"
+
         # Get users who opted in to leaderboard with their exam statistics
         cursor.execute(f'''
             SELECT
                 u.id,
                 u.username,
                 u.nickname,
-                u.experience,
+                {LIVE_EXPERIENCE_SQL} as total_experience,
+                COALESCE(wx.points, 0) as weekly_experience,
                 COUNT(es.id) as exams_taken,
                 AVG(CAST(es.score AS FLOAT) / es.total * 100) as avg_score,
                 MAX(CAST(es.score AS FLOAT) / es.total * 100) as best_score
             FROM users u
+            LEFT JOIN (
+                SELECT user_id, SUM(points) as points FROM xp_events
+                WHERE created_at >= ?
+                GROUP BY user_id
+            ) wx ON wx.user_id = u.id
             LEFT JOIN exam_sessions es ON u.id = es.user_id {date_filter}
             WHERE u.show_in_leaderboard = 1
             GROUP BY u.id
             HAVING exams_taken > 0
-            ORDER BY u.experience DESC, avg_score DESC, best_score DESC
-        ''')
+            ORDER BY {order_column} DESC, avg_score DESC, best_score DESC
+        ''', (week_start,))
 
         rows = cursor.fetchall()
         conn.close()
@@ -395,6 +530,7 @@ class AuthManager:
         leaderboard = []
         for rank, row in enumerate(rows, 1):
             row_dict = dict(row)
+            total_experience = row_dict['total_experience'] or 0
             leaderboard.append({
                 'rank': rank,
                 'user_id': row_dict['id'],
@@ -402,7 +538,8 @@ class AuthManager:
                 'exams_taken': row_dict['exams_taken'],
                 'avg_score': row_dict['avg_score'] or 0,
                 'best_score': row_dict['best_score'] or 0,
-                'experience': row_dict['experience'] or 0
+                'experience': row_dict['weekly_experience'] if weekly else total_experience,
+                'total_experience': total_experience
             })
 
         return leaderboard
@@ -410,27 +547,100 @@ class AuthManager:
     def add_experience(self, user_id: int, points: int) -> Tuple[bool, int]:
         """
         Add experience points to a user.
+        Each award is appended to the xp_events ledger in its own small
+        transaction, so the hot users row is only written by compaction.
         Returns: (success, new_total_experience)
         """
+        conn = self._get_connection()
+        try:
+            conn.execute(
+                'INSERT INTO xp_events (user_id, points, created_at) VALUES (?, ?, ?)',
+                (user_id, points, datetime.now().isoformat())
+            )
+            conn.commit()
+        except sqlite3.Error:
+            return False, 0
+        finally:
+            conn.close()
+
+        if time.monotonic() - self._xp_last_compaction >= XP_COMPACT_INTERVAL_SECONDS:
+            self.compact_experience()
+
+        return True, self.get_experience(user_id)
+
+    def compact_experience(self, older_than_minutes: int = XP_COMPACT_AFTER_MINUTES,
+                           retain_days: int = XP_RETAIN_DAYS) -> int:
+        """
+        Fold ledger events older than `older_than_minutes` into users.experience
+        and advance the compaction watermark. Folded events are kept for
+        `retain_days` so per-period XP stays available.
+        Returns the number of events compacted.
+        """
+        self._xp_last_compaction = time.monotonic()
+        now = datetime.now()
+        cutoff = (now - timedelta(minutes=older_than_minutes)).isoformat()
+        retain_cutoff = (now - timedelta(days=retain_days)).isoformat()
+
         conn = self._get_connection()
         cursor = conn.cursor()
 
         try:
+            # Take the write lock up front so concurrent compactions serialise
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('SELECT last_event_id FROM xp_compaction WHERE id = 1')
+            watermark = cursor.fetchone()[0]
+
             cursor.execute('''
-                UPDATE users SET experience = COALESCE(experience, 0) + ? WHERE id = ?
-            ''', (points, user_id))
+                SELECT MAX(id), COUNT(*) FROM xp_events WHERE id > ? AND created_at <= ?
+            ''', (watermark, cutoff))
+            new_watermark, compacted = cursor.fetchone()
+
+            if new_watermark:
+                cursor.execute('''
+                    UPDATE users SET experience = COALESCE(experience, 0) + (
+                        SELECT SUM(x.points) FROM xp_events x
+                        WHERE x.user_id = users.id AND x.id > ? AND x.id <= ?
+                    )
+                    WHERE id IN (SELECT user_id FROM xp_events WHERE id > ? AND id <= ?)
+                ''', (watermark, new_watermark, watermark, new_watermark))
+                cursor.execute('''
+                    UPDATE xp_compaction SET last_event_id = ?, compacted_at = ? WHERE id = 1
+                ''', (new_watermark, now.isoformat()))
+                watermark = new_watermark
+            else:
+                compacted = 0
 
-            cursor.execute('SELECT experience FROM users WHERE id = ?', (user_id,))
-            row = cursor.fetchone()
-            new_exp = row['experience'] if row else 0
+            cursor.execute('DELETE FROM xp_events WHERE id <= ? AND created_at < ?',
+                           (watermark, retain_cutoff))
 
             conn.commit()
             conn.close()
-            return True, new_exp
+            return compacted
 
-        except Exception as e:
+        except Exception:
+            conn.rollback()
             conn.close()
-            return False, 0
+            return 0
+
+    def get_experience(self, user_id: int, since: Optional[datetime] = None) -> int:
+        """
+        Get a user's experience: the compacted total plus recent ledger deltas.
+        With `since`, only XP earned after it.
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        if since is None:
+            cursor.execute(f'SELECT {LIVE_EXPERIENCE_SQL} FROM users u WHERE u.id = ?', (user_id,))
+        else:
+            cursor.execute('''
+                SELECT COALESCE(SUM(points), 0) FROM xp_events WHERE user_id = ? AND created_at >= ?
+            ''', (user_id, since.isoformat()))
+
+        row = cursor.fetchone()
+        conn.close()
+
+        return row[0] if row else 0
 
     def get_user_certifications(self, user_id: int) -> List[Certification]:
         """Get all certifications for a user."""
@@ -492,15 +702,17 @@ class AuthManager:
 
     def get_public_profile(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get public profile data for a user."""
+        self.flush_experience()
+
         conn = self._get_connection()
         cursor = conn.cursor()
 
-        cursor.execute('''
+        cursor.execute(f'''
             SELECT
                 u.id,
                 u.username,
                 u.nickname,
-                u.experience,
+                {LIVE_EXPERIENCE_SQL} as experience,
                 u.credly_url,
                 u.show_in_leaderboard,
                 u.created_at,
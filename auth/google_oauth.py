@@ -1,10 +1,10 @@
 import os
 import json
+import time
+import threading
 import streamlit as st
-from google_auth_oauthlib.flow import Flow
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
-from typing import Optional, Tuple
+from google.auth import transport
+from typing import Optional, Tuple, Dict
 from urllib.parse import urlencode
 
 # OAuth configuration - check st.secrets first (Streamlit Cloud), then os.environ
@@ -30,6 +30,140 @@ SCOPES = [
     "https://www.googleapis.com/auth/userinfo.profile"
 ]
 
+# Endpoints can be overridden to point at a local stub server
+def get_token_url() -> str:
+    return get_secret("GOOGLE_TOKEN_URL", "https://oauth2.googleapis.com/token")
+
+def get_userinfo_url() -> str:
+    return get_secret("GOOGLE_USERINFO_URL", "https://www.googleapis.com/oauth2/v2/userinfo")
+
+def get_certs_url() -> str:
+    return get_secret("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
+
+# (connect, read) timeout in seconds for every Google call
+HTTP_TIMEOUT = (3.05, 10)
+
+# Used when the certs response carries no usable cache headers
+DEFAULT_CERTS_MAX_AGE = 300
+
+VALID_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+# requests and the google-auth token helpers are imported on first use, so
+# the login page does not pay for them until an OAuth callback arrives
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session() -> "requests.Session":
+    """
+    Shared, connection-pooled HTTP session for Google endpoints.
+    Connection errors are retried with backoff for every method; server
+    errors only for GETs, since an authorization code can be used once.
+    """
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=3,
+                connect=3,
+                read=2,
+                status=2,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(["GET"]),
+                respect_retry_after_header=True
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_session = session
+        return _http_session
+
+
+def _cache_lifetime(headers) -> int:
+    """Seconds a response may be cached for, from Cache-Control or Expires."""
+    cache_control = headers.get("Cache-Control", "") or headers.get("cache-control", "")
+    directives = [d.strip().lower() for d in cache_control.split(",")]
+    if "no-store" in directives or "no-cache" in directives:
+        return 0
+    for directive in directives:
+        if directive.startswith("max-age="):
+            try:
+                age = int(headers.get("Age", 0) or 0)
+                return max(0, int(directive.split("=", 1)[1]) - age)
+            except ValueError:
+                break
+
+    expires = headers.get("Expires") or headers.get("expires")
+    if expires:
+        from email.utils import parsedate_to_datetime
+        try:
+            return max(0, int(parsedate_to_datetime(expires).timestamp() - time.time()))
+        except (TypeError, ValueError):
+            return 0
+
+    return DEFAULT_CERTS_MAX_AGE
+
+
+class CachingRequest(transport.Request):
+    """
+    google-auth transport that reuses the pooled session and caches GET
+    responses (Google's signing certificates) as long as their HTTP cache
+    headers allow.
+    """
+
+    def __init__(self, session: "requests.Session"):
+        from google.auth.transport import requests as google_requests
+
+        self._request = google_requests.Request(session=session)
+        self._cache: Dict[str, Tuple[float, transport.Response]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, url, method="GET", body=None, headers=None, timeout=None, **kwargs):
+        if method != "GET" or body is not None:
+            return self._request(url, method=method, body=body, headers=headers,
+                                 timeout=timeout or HTTP_TIMEOUT, **kwargs)
+
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(url)
+            if cached and cached[0] > now:
+                self.hits += 1
+                return cached[1]
+
+        response = self._request(url, method=method, headers=headers,
+                                 timeout=timeout or HTTP_TIMEOUT, **kwargs)
+        lifetime = _cache_lifetime(response.headers) if response.status == 200 else 0
+
+        with self._lock:
+            self.misses += 1
+            if lifetime > 0:
+                self._cache[url] = (now + lifetime, response)
+            else:
+                self._cache.pop(url, None)
+
+        return response
+
+
+_cert_request: Optional[CachingRequest] = None
+
+
+def get_cert_request() -> CachingRequest:
+    """Process-wide google-auth transport with a certificate cache."""
+    global _cert_request
+    session = get_http_session()
+    with _http_session_lock:
+        if _cert_request is None:
+            _cert_request = CachingRequest(session)
+        return _cert_request
+
 
 def get_google_oauth_url(redirect_uri: str) -> Optional[str]:
     """
@@ -56,14 +190,11 @@ def exchange_code_for_token(code: str, redirect_uri: str) -> Optional[dict]:
     """
     Exchange the authorization code for tokens.
     """
-    import requests
-
     client_id = get_client_id()
     client_secret = get_client_secret()
     if not client_id or not client_secret:
         return None
 
-    token_url = "https://oauth2.googleapis.com/token"
     data = {
         "client_id": client_id,
         "client_secret": client_secret,
@@ -73,7 +204,7 @@ def exchange_code_for_token(code: str, redirect_uri: str) -> Optional[dict]:
     }
 
     try:
-        response = requests.post(token_url, data=data)
+        response = get_http_session().post(get_token_url(), data=data, timeout=HTTP_TIMEOUT)
         if response.status_code == 200:
             return response.json()
         else:
@@ -88,13 +219,10 @@ def get_user_info(access_token: str) -> Optional[dict]:
     """
     Get user info from Google using the access token.
     """
-    import requests
-
-    userinfo_url = "https://www.googleapis.com/oauth2/v2/userinfo"
     headers = {"Authorization": f"Bearer {access_token}"}
 
     try:
-        response = requests.get(userinfo_url, headers=headers)
+        response = get_http_session().get(get_userinfo_url(), headers=headers, timeout=HTTP_TIMEOUT)
         if response.status_code == 200:
             return response.json()
         else:
@@ -105,19 +233,27 @@ def get_user_info(access_token: str) -> Optional[dict]:
         return None
 
 
-def verify_id_token(token: str) -> Optional[dict]:
+def verify_id_token(token: str, show_errors: bool = True) -> Optional[dict]:
     """
-    Verify a Google ID token and return the user info.
+    Verify a Google ID token locally against the cached signing certificates
+    and return its claims.
     """
+    from google.oauth2 import id_token
+
     try:
-        idinfo = id_token.verify_oauth2_token(
+        idinfo = id_token.verify_token(
             token,
-            google_requests.Request(),
-            get_client_id()
+            get_cert_request(),
+            audience=get_client_id(),
+            certs_url=get_certs_url(),
+            clock_skew_in_seconds=10
         )
+        if idinfo.get("iss") not in VALID_ISSUERS:
+            raise ValueError(f"Wrong issuer: {idinfo.get('iss')}")
         return idinfo
     except Exception as e:
-        st.error(f"Token verification failed: {str(e)}")
+        if show_errors:
+            st.error(f"Token verification failed: {str(e)}")
         return None
 
 
@@ -144,19 +280,27 @@ def handle_google_callback() -> Optional[Tuple[str, str, str]]:
     if not tokens:
         return None
 
-    # Get user info
+    # The ID token carries the profile claims, so a verified one saves the
+    # userinfo round trip; fall back to userinfo if it is missing or invalid
+    user_info = None
+    if tokens.get("id_token"):
+        claims = verify_id_token(tokens["id_token"], show_errors=False)
+        if claims and claims.get("email") and claims.get("email_verified", True):
+            user_info = claims
+
     access_token = tokens.get("access_token")
-    if access_token:
+    if not user_info and access_token:
         user_info = get_user_info(access_token)
-        if user_info:
-            email = user_info.get("email", "")
-            name = user_info.get("name", user_info.get("given_name", "User"))
-            picture = user_info.get("picture", "")
 
-            # Clear the query params after handling
-            st.query_params.clear()
+    if user_info:
+        email = user_info.get("email", "")
+        name = user_info.get("name", user_info.get("given_name", "User"))
+        picture = user_info.get("picture", "")
+
+        # Clear the query params after handling
+        st.query_params.clear()
 
-            return email, name, picture
+        return email, name, picture
 
     return None
 
@@ -0,0 +1,157 @@
+import sqlite3
+import threading
+import time
+import atexit
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+from database.profiling import profiler
+
+
+@dataclass
+class BucketPolicy:
+    capacity: float  # Maximum burst of attempts
+    refill_per_second: float  # Attempts regained per second
+
+
+# Per-account and per-client login attempt budgets
+EMAIL_POLICY = BucketPolicy(capacity=5, refill_per_second=1 / 60)
+CLIENT_POLICY = BucketPolicy(capacity=20, refill_per_second=1 / 15)
+
+# How often dirty buckets are written back to SQLite
+PERSIST_INTERVAL_SECONDS = 5
+
+# A bucket untouched this long has refilled under every policy above, so it
+# is dropped from memory and from auth_throttle
+IDLE_SECONDS = max(p.capacity / p.refill_per_second for p in (EMAIL_POLICY, CLIENT_POLICY))
+
+
+class TokenBucketLimiter:
+    """
+    In-memory token buckets keyed by strings such as 'email:a@b.com' or
+    'client:10.0.0.1', written back to the auth_throttle table so limits
+    survive restarts. Full buckets are the same as none, so idle ones are
+    evicted whenever buckets are persisted.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        # key -> (tokens, updated_at as wall-clock seconds)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._dirty: Set[str] = set()
+        self._lock = threading.Lock()
+        self._last_persist = time.monotonic()
+        self._counters: Counter = Counter()
+        atexit.register(self.persist)
+
+    def _load(self, key: str, policy: BucketPolicy) -> Tuple[float, float]:
+        """Fetch a bucket from memory, falling back to SQLite, then to a full bucket."""
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            return bucket
+
+        conn = profiler.connect(self.db_path)
+        row = conn.execute('SELECT tokens, updated_at FROM auth_throttle WHERE key = ?', (key,)).fetchone()
+        conn.close()
+
+        bucket = (row[0], row[1]) if row else (policy.capacity, time.time())
+        self._buckets[key] = bucket
+        return bucket
+
+    def _refill(self, key: str, policy: BucketPolicy, now: float) -> float:
+        tokens, updated_at = self._load(key, policy)
+        return min(policy.capacity, tokens + max(0.0, now - updated_at) * policy.refill_per_second)
+
+    def check(self, *limits: Tuple[str, BucketPolicy]) -> Tuple[bool, int]:
+        """
+        Take one token from every (key, policy) bucket, or from none of them.
+        Returns (allowed, retry_after_seconds).
+        """
+        now = time.time()
+
+        with self._lock:
+            levels = {key: self._refill(key, policy, now) for key, policy in limits}
+
+            retry_after = 0.0
+            for key, policy in limits:
+                if levels[key] < 1:
+                    kind = key.split(':', 1)[0]
+                    self._counters[f'rejected_{kind}'] += 1
+                    retry_after = max(retry_after, (1 - levels[key]) / policy.refill_per_second)
+
+            if retry_after:
+                self._counters['rejected'] += 1
+                return False, int(retry_after) + 1
+
+            for key, _ in limits:
+                self._buckets[key] = (levels[key] - 1, now)
+                self._dirty.add(key)
+            self._counters['allowed'] += 1
+            persist_due = time.monotonic() - self._last_persist >= PERSIST_INTERVAL_SECONDS
+
+        if persist_due:
+            self.persist()
+
+        return True, 0
+
+    def reset(self, key: str):
+        """Forget a bucket, e.g. after a successful login."""
+        with self._lock:
+            self._buckets.pop(key, None)
+            self._dirty.add(key)
+
+    def _evict_idle(self, now: float) -> int:
+        """Drop buckets idle for IDLE_SECONDS. Call with the lock held."""
+        idle = [key for key, (_, updated_at) in self._buckets.items()
+                if now - updated_at >= IDLE_SECONDS and key not in self._dirty]
+        for key in idle:
+            del self._buckets[key]
+        return len(idle)
+
+    def persist(self):
+        """Write dirty buckets to SQLite, and drop idle ones from memory and SQLite."""
+        now = time.time()
+        with self._lock:
+            evicted = self._evict_idle(now)
+            self._counters['evicted'] += evicted
+            dirty = {key: self._buckets.get(key) for key in self._dirty}
+            self._dirty = set()
+            self._last_persist = time.monotonic()
+
+        if not dirty and not evicted:
+            return
+
+        conn = profiler.connect(self.db_path)
+        try:
+            conn.executemany(
+                'INSERT OR REPLACE INTO auth_throttle (key, tokens, updated_at) VALUES (?, ?, ?)',
+                [(key, b[0], b[1]) for key, b in dirty.items() if b is not None]
+            )
+            conn.executemany(
+                'DELETE FROM auth_throttle WHERE key = ?',
+                [(key,) for key, b in dirty.items() if b is None]
+            )
+            conn.execute('DELETE FROM auth_throttle WHERE updated_at <= ?', (now - IDLE_SECONDS,))
+            conn.commit()
+        except sqlite3.Error:
+            with self._lock:
+                self._dirty.update(dirty)
+        finally:
+            conn.close()
+
+    def get_metrics(self) -> Dict[str, int]:
+        """Counters for monitoring: allowed, rejected, rejected_<kind>, evicted, tracked_keys."""
+        with self._lock:
+            metrics = dict(self._counters)
+            metrics['tracked_keys'] = len(self._buckets)
+        return metrics
+
+
+def email_limit(email: str) -> Tuple[str, BucketPolicy]:
+    return f"email:{email.lower()}", EMAIL_POLICY
+
+
+def client_limit(client_id: Optional[str]) -> Optional[Tuple[str, BucketPolicy]]:
+    if not client_id:
+        return None
+    return f"client:{client_id}", CLIENT_POLICY
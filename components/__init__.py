@@ -1,17 +1,22 @@
-from .exam_selector import render_exam_selector
-from .question_display import render_question
-from .timer import render_timer
-from .results import render_results
-from .profile import render_profile_page
-from .leaderboard import render_leaderboard_page
-from .public_profile import render_public_profile_page
+import importlib
 
-__all__ = [
-    'render_exam_selector',
-    'render_question',
-    'render_timer',
-    'render_results',
-    'render_profile_page',
-    'render_leaderboard_page',
-    'render_public_profile_page'
-]
+# Submodule for each exported renderer. They are imported on first access
+# so that loading one page does not pull in every page's dependencies.
+_EXPORTS = {
+    'render_exam_selector': 'exam_selector',
+    'render_question': 'question_display',
+    'render_timer': 'timer',
+    'render_results': 'results',
+    'render_profile_page': 'profile',
+    'render_leaderboard_page': 'leaderboard',
+    'render_public_profile_page': 'public_profile'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{_EXPORTS[name]}", __name__)
+    return getattr(module, name)
@@ -5,10 +5,75 @@ from auth.google_oauth import (
     handle_google_callback,
     is_google_oauth_configured,
     render_google_oauth_setup_instructions,
-    get_redirect_uri
+    get_redirect_uri,
+    get_secret
 )
 from typing import Optional
 
+# Query parameter carrying the persistent session token across reloads
+SESSION_QUERY_PARAM = "session"
+
+
+def get_client_address() -> Optional[str]:
+    """
+    Best-effort client identifier used to throttle login attempts.
+
+    X-Forwarded-For entries left of the ones our own proxies appended are
+    whatever the client sent, so only the TRUSTED_PROXY_HOPS-th entry from
+    the right is used. With no trusted proxies (the default) the header is
+    ignored.
+    """
+    try:
+        hops = int(get_secret("TRUSTED_PROXY_HOPS", "0") or 0)
+        forwarded = st.context.headers.get("X-Forwarded-For")
+        if hops > 0 and forwarded:
+            entries = [entry.strip() for entry in forwarded.split(",")]
+            if len(entries) >= hops:
+                return entries[-hops]
+        return getattr(st.context, "ip_address", None)
+    except Exception:
+        return None
+
+
+def restore_session(auth_manager: AuthManager) -> Optional[User]:
+    """
+    Re-authenticate a returning browser from its session token.
+    Returns the user or None if there is no valid session.
+    """
+    token = st.query_params.get(SESSION_QUERY_PARAM)
+    if not token:
+        return None
+
+    user = auth_manager.get_user_by_session(token)
+    if not user:
+        # Drop stale tokens so we don't look them up on every rerun
+        del st.query_params[SESSION_QUERY_PARAM]
+        return None
+
+    st.session_state.session_token = token
+    return user
+
+
+def start_persistent_session(auth_manager: AuthManager, user: User):
+    """Issue a session token for a freshly authenticated user."""
+    token = auth_manager.create_session(user.id)
+    st.session_state.session_token = token
+    st.query_params[SESSION_QUERY_PARAM] = token
+
+
+def sign_out(auth_manager: Optional[AuthManager] = None):
+    """Clear the logged in user and revoke the persistent session."""
+    token = st.session_state.get('session_token')
+    if token and auth_manager:
+        auth_manager.revoke_session(token)
+
+    for key in ('user', 'user_id', 'session_token'):
+        if key in st.session_state:
+            del st.session_state[key]
+
+    if SESSION_QUERY_PARAM in st.query_params:
+        del st.query_params[SESSION_QUERY_PARAM]
+
 
 def render_auth_page(auth_manager: AuthManager) -> Optional[User]:
     """
@@ -91,7 +156,7 @@ def render_sign_in(auth_manager: AuthManager) -> Optional[User]:
                 st.error("Please fill in all fields")
                 return None
 
-            success, message, user = auth_manager.login(email, password)
+            success, message, user = auth_manager.login(email, password, client_id=get_client_address())
 
             if success:
                 st.success(message)
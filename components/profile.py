@@ -1,6 +1,7 @@
 import streamlit as st
 from auth import AuthManager, User
 from auth.models import AWS_CERTIFICATIONS
+from components.auth_ui import get_client_address
 from datetime import datetime
 
 
@@ -155,7 +156,8 @@ def render_profile_page(user: User, auth_manager: AuthManager):
                         success, message = auth_manager.change_password(
                             user_id=user.id,
                             current_password=current_password,
-                            new_password=new_password
+                            new_password=new_password,
+                            client_id=get_client_address()
                         )
 
                         if success:
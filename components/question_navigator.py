@@ -0,0 +1,61 @@
+import os
+import streamlit as st
+import streamlit.components.v1 as components
+from typing import Optional
+from database.models import ExamState
+from database.catalog import QuestionCatalog
+from utils.scoring import is_answer_correct
+
+# State bits per question, mirrored in frontend/question_navigator/index.html
+ANSWERED = 1
+CHECKED = 2
+CORRECT = 4
+MARKED = 8
+
+_FRONTEND_DIR = os.path.join(os.path.dirname(__file__), "frontend", "question_navigator")
+_navigator = None
+
+
+def _get_navigator():
+    """Declare the component on first use; declaring it is slow at import time."""
+    global _navigator
+    if _navigator is None:
+        _navigator = components.declare_component("question_navigator", path=_FRONTEND_DIR)
+    return _navigator
+
+
+def build_navigator_state(exam: ExamState, catalog: QuestionCatalog) -> str:
+    """Encode every question's status as one hex digit."""
+    digits = []
+    for i in range(len(exam)):
+        flags = 0
+        user_answer = exam.get_answer(i)
+        if user_answer:
+            flags |= ANSWERED
+        if exam.has_flag(i, ExamState.FLAG_CHECKED):
+            flags |= CHECKED
+            # Correctness is only shown for checked questions
+            question = catalog.get(exam.question_ids[i])
+            if user_answer and question and is_answer_correct(user_answer, question.correct_answer):
+                flags |= CORRECT
+        if exam.has_flag(i, ExamState.FLAG_MARKED):
+            flags |= MARKED
+        digits.append(format(flags, "x"))
+    return "".join(digits)
+
+
+def render_question_navigator(state: str, current: int, key: str = "question_navigator") -> Optional[int]:
+    """
+    Render the question navigator as a single component.
+    Returns the index of a newly clicked question, or None.
+    """
+    clicked = _get_navigator()(state=state, current=current, key=key, default=None)
+    if not clicked:
+        return None
+
+    # The component keeps returning its last value; only act on new clicks
+    seen_key = f"{key}_last_nonce"
+    if st.session_state.get(seen_key) == clicked["nonce"]:
+        return None
+    st.session_state[seen_key] = clicked["nonce"]
+    return clicked["index"]
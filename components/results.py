@@ -1,7 +1,4 @@
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
 from database.models import Question, ExamSession, DOMAINS, DOMAIN_WEIGHTS, EXAM_CONFIG
 from utils.scoring import calculate_domain_scores, identify_weak_domains
 from components.timer import format_time
@@ -10,6 +7,9 @@ from components.timer import format_time
 def render_results(questions: list, answers: dict, exam_type: str,
                    time_spent: int, session: ExamSession = None):
     """Render the exam results page."""
+    # pandas and plotly are slow to import; only the results page needs them
+    import pandas as pd
+    import plotly.graph_objects as go
 
     st.title("Exam Results")
     st.markdown("---")
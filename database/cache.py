@@ -0,0 +1,151 @@
+import pickle
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Partition for reads that do not depend on the user (e.g. question counts)
+SHARED = None
+
+# Defaults: ~64 KB of cached reads per user, 16 MB across all users,
+# entries live for 5 minutes
+DEFAULT_USER_BUDGET_BYTES = 64 * 1024
+DEFAULT_TOTAL_BUDGET_BYTES = 16 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 300
+
+
+class UserScopedCache:
+    """
+    Cache for derived reads, partitioned by user id.
+
+    Every partition is an LRU with its own memory budget, entries expire
+    after a TTL, and write paths invalidate whole partitions. Partitions
+    are themselves kept in LRU order: past the total budget the least
+    recently used ones are dropped, and expired entries are swept once per
+    TTL so idle users' partitions go away.
+    """
+
+    def __init__(self, budget_bytes: int = DEFAULT_USER_BUDGET_BYTES,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 total_budget_bytes: int = DEFAULT_TOTAL_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self.ttl_seconds = ttl_seconds
+        self.total_budget_bytes = max(total_budget_bytes, budget_bytes)
+        # user_id -> OrderedDict[key, (expires_at, size, value)], least recently used first
+        self._partitions: "OrderedDict[Optional[int], OrderedDict[Hashable, Tuple[float, int, Any]]]" = (
+            OrderedDict()
+        )
+        self._partition_sizes: Counter = Counter()
+        self._total_bytes = 0
+        self._next_sweep = time.monotonic() + ttl_seconds
+        self._lock = threading.Lock()
+        self._counters: Counter = Counter()
+        # Bumped by every invalidation so in-flight computes don't store stale values
+        self._generation = 0
+
+    def get_or_compute(self, user_id: Optional[int], key: Hashable,
+                       compute: Callable[[], Any], cost: int = 1) -> Any:
+        """
+        Return the cached value for (user_id, key), computing and storing it
+        on a miss. `cost` is the number of queries a hit saves.
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            partition = self._partitions.get(user_id)
+            entry = partition.get(key) if partition else None
+            if entry:
+                if entry[0] > now:
+                    partition.move_to_end(key)
+                    self._partitions.move_to_end(user_id)
+                    self._counters['hits'] += 1
+                    self._counters['queries_saved'] += cost
+                    return entry[2]
+                self._remove(user_id, key)
+                self._counters['expirations'] += 1
+            self._counters['misses'] += 1
+            generation = self._generation
+
+        value = compute()
+        self._store(user_id, key, value, now, generation)
+        return value
+
+    def _store(self, user_id: Optional[int], key: Hashable, value: Any,
+               now: float, generation: int):
+        size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        if size > self.budget_bytes:
+            return
+
+        with self._lock:
+            if generation != self._generation:
+                return
+            if key in self._partitions.get(user_id, ()):
+                self._remove(user_id, key)
+            partition = self._partitions.setdefault(user_id, OrderedDict())
+            self._partitions.move_to_end(user_id)
+            partition[key] = (now + self.ttl_seconds, size, value)
+            self._partition_sizes[user_id] += size
+            self._total_bytes += size
+
+            while self._partition_sizes[user_id] > self.budget_bytes:
+                oldest = next(iter(partition))
+                self._remove(user_id, oldest)
+                self._counters['evictions'] += 1
+
+            while self._total_bytes > self.total_budget_bytes:
+                self._drop_partition(next(iter(self._partitions)))
+                self._counters['partition_evictions'] += 1
+
+            if now >= self._next_sweep:
+                self._sweep(now)
+
+    def _sweep(self, now: float):
+        """Remove expired entries from every partition. Call with the lock held."""
+        self._next_sweep = now + self.ttl_seconds
+        for user_id in list(self._partitions):
+            expired = [key for key, entry in self._partitions[user_id].items() if entry[0] <= now]
+            for key in expired:
+                self._remove(user_id, key)
+            self._counters['expirations'] += len(expired)
+
+    def _remove(self, user_id: Optional[int], key: Hashable):
+        partition = self._partitions[user_id]
+        _, size, _ = partition.pop(key)
+        self._partition_sizes[user_id] -= size
+        self._total_bytes -= size
+        if not partition:
+            del self._partitions[user_id]
+            del self._partition_sizes[user_id]
+
+    def _drop_partition(self, user_id: Optional[int]) -> bool:
+        if self._partitions.pop(user_id, None) is None:
+            return False
+        self._total_bytes -= self._partition_sizes.pop(user_id, 0)
+        return True
+
+    def invalidate_user(self, user_id: Optional[int]):
+        """Drop every cached read for one user (or the shared partition)."""
+        with self._lock:
+            self._generation += 1
+            if self._drop_partition(user_id):
+                self._counters['invalidations'] += 1
+
+    def invalidate_all(self):
+        """Drop every partition, e.g. after the question bank changes."""
+        with self._lock:
+            self._generation += 1
+            if self._partitions:
+                self._partitions.clear()
+                self._partition_sizes.clear()
+                self._total_bytes = 0
+                self._counters['invalidations'] += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Hit/miss counters, hit rate, queries saved and current footprint."""
+        with self._lock:
+            metrics = dict(self._counters)
+            lookups = metrics.get('hits', 0) + metrics.get('misses', 0)
+            metrics['hit_rate'] = metrics.get('hits', 0) / lookups if lookups else 0.0
+            metrics['partitions'] = len(self._partitions)
+            metrics['bytes'] = self._total_bytes
+        return metrics
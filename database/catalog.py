@@ -0,0 +1,50 @@
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+from .models import Question
+
+
+class QuestionCatalog:
+    """
+    Process-wide, read-only map of question id -> Question shared by every
+    session, so exam state only needs to hold ids. Missing ids are loaded
+    in one batch through `loader`.
+    """
+
+    def __init__(self, loader: Callable[[List[int]], List[Question]],
+                 on_read: Optional[Callable[[], None]] = None):
+        self._loader = loader
+        # Called before every lookup, e.g. to drop entries changed by another process
+        self._on_read = on_read
+        self._questions: Dict[int, Question] = {}
+        self._lock = threading.Lock()
+
+    def put_many(self, questions: Iterable[Question]):
+        """Add questions that were already loaded (e.g. by an exam query)."""
+        with self._lock:
+            for question in questions:
+                self._questions[question.id] = question
+
+    def get(self, question_id: int) -> Optional[Question]:
+        found = self.get_many([question_id])
+        return found[0] if found else None
+
+    def get_many(self, question_ids: Iterable[int]) -> List[Question]:
+        """Resolve ids in order; ids that no longer exist are skipped."""
+        if self._on_read:
+            self._on_read()
+
+        question_ids = list(question_ids)
+        missing = [qid for qid in question_ids if qid not in self._questions]
+        if missing:
+            self.put_many(self._loader(missing))
+
+        questions = self._questions
+        return [questions[qid] for qid in question_ids if qid in questions]
+
+    def clear(self):
+        """Drop all entries after the question bank changes."""
+        with self._lock:
+            self._questions = {}
+
+    def __len__(self) -> int:
+        return len(self._questions)
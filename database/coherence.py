@@ -0,0 +1,122 @@
+"""
+Cross-process cache coherence.
+
+Several app processes can share one SQLite file, each with its own
+in-process caches. Every write that affects a cache records its scope
+(e.g. "questions" or "user:42") in the data_changes table, in the same
+transaction, stamped with a global sequence number. Each process keeps a
+ChangeWatcher that polls PRAGMA data_version on a dedicated connection:
+while it is unchanged nothing was committed by anyone else and the poll
+costs no table reads; when it moves, the watcher reads only the scopes
+whose sequence is past the last one it has seen. Its own changes are
+skipped, unless one may have hidden a change from elsewhere to the same
+scope.
+"""
+import sqlite3
+import threading
+import time
+from typing import List, Set
+
+QUESTIONS_SCOPE = "questions"
+SESSIONS_SCOPE = "sessions"
+
+# Polls closer together than this reuse the previous answer
+DEFAULT_POLL_INTERVAL_SECONDS = 0.5
+
+
+def user_scope(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def record_change(cursor: sqlite3.Cursor, scope: str) -> int:
+    """
+    Record a change to `scope` as part of the caller's open transaction.
+    Returns the change's sequence number.
+    """
+    cursor.execute("UPDATE data_changes SET seq = seq + 1 WHERE scope = '*'")
+    cursor.execute('''
+        INSERT OR REPLACE INTO data_changes (scope, seq)
+        SELECT ?, seq FROM data_changes WHERE scope = '*'
+    ''', (scope,))
+    cursor.execute("SELECT seq FROM data_changes WHERE scope = '*'")
+    return cursor.fetchone()[0]
+
+
+class ChangeWatcher:
+    """Reports the scopes other processes (or connections) have changed since the last poll."""
+
+    def __init__(self, db_path: str, poll_interval: float = DEFAULT_POLL_INTERVAL_SECONDS):
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self._conn = None
+        self._lock = threading.Lock()
+        self._data_version = None
+        self._last_seq = 0
+        self._last_poll = 0.0
+        # Sequence numbers of this process's own changes, already handled locally
+        self._own: Set[int] = set()
+        self.polls = 0
+        self.changes_seen = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # data_version is only meaningful on one long-lived connection
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            self._data_version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+            self._last_seq = self._conn.execute(
+                "SELECT seq FROM data_changes WHERE scope = '*'"
+            ).fetchone()[0]
+        return self._conn
+
+    def acknowledge(self, seq: int):
+        """Mark a change made by this process, so polling does not report it back."""
+        with self._lock:
+            self._own.add(seq)
+
+    def poll(self, force: bool = False) -> List[str]:
+        """Scopes changed elsewhere since the previous poll."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_poll < self.poll_interval:
+                return []
+            self._last_poll = now
+            self.polls += 1
+
+            conn = self._connect()
+            data_version = conn.execute('PRAGMA data_version').fetchone()[0]
+            if data_version == self._data_version:
+                return []
+            self._data_version = data_version
+
+            # One read transaction, so the rows and the global sequence agree
+            conn.execute('BEGIN')
+            try:
+                rows = conn.execute('''
+                    SELECT scope, seq FROM data_changes
+                    WHERE seq > ? AND scope != '*'
+                ''', (self._last_seq,)).fetchall()
+                latest = conn.execute("SELECT seq FROM data_changes WHERE scope = '*'").fetchone()[0]
+            finally:
+                conn.execute('COMMIT')
+
+            # A scope keeps only its latest seq, so a change from elsewhere is
+            # hidden when the same scope changed again later (possibly here).
+            # The first seq since the last poll that is neither ours nor still
+            # in the table is such a change: every scope whose seq is past it
+            # may be the one it touched
+            visible = {seq for _, seq in rows}
+            hidden = self._last_seq + 1
+            while hidden <= latest and (hidden in self._own or hidden in visible):
+                hidden += 1
+
+            scopes = [scope for scope, seq in rows if seq not in self._own or seq > hidden]
+            self._last_seq = max(self._last_seq, latest)
+            self._own = {seq for seq in self._own if seq > self._last_seq}
+            self.changes_seen += len(scopes)
+            return scopes
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,118 +1,218 @@
 import sqlite3
 import json
 import os
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from datetime import datetime, timedelta
-from .models import Question, ExamSession
+from .models import Question, ExamSession, ExamState
+from .migrations import migrate
+from .cache import UserScopedCache, SHARED
+from .catalog import QuestionCatalog
+from .coherence import ChangeWatcher, QUESTIONS_SCOPE, record_change, user_scope
+from .profiling import profiler
+
+# Unfinished exam attempts older than this are dropped when a new one starts
+EXAM_PROGRESS_RETAIN_HOURS = 24
 
 
 class DatabaseManager:
     def __init__(self, db_path: str = "data/questions.db"):
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # Derived per-rerun reads (progress, counts); write paths invalidate it
+        self.cache = UserScopedCache()
+        # Shared question content, so per-session exam state holds only ids
+        self.catalog = QuestionCatalog(self.get_questions_by_ids, on_read=self.sync)
         self._init_database()
+        # Notices writes by other processes sharing the file (see sync)
+        self.watcher = ChangeWatcher(db_path)
 
     def _get_connection(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
+        conn = profiler.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
 
     def _init_database(self):
+        migrate(self.db_path)
+
+    def _question_row(self, question: Question) -> tuple:
+        return (
+            question.exam_type,
+            question.domain,
+            question.difficulty,
+            question.question_text,
+            json.dumps(question.options),
+            question.correct_answer,
+            question.explanation,
+            question.reference,
+            question.question_id,
+            question.num_correct,
+            question.content_hash
+        )
+
+    def add_question(self, question: Question) -> int:
+        """
+        Insert a question unless one with the same content already exists
+        for the exam. Returns the id of the new or existing question.
+        """
         conn = self._get_connection()
         cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        changes_before = conn.total_changes
 
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS questions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                exam_type TEXT NOT NULL,
-                domain TEXT NOT NULL,
-                difficulty INTEGER NOT NULL,
-                question_text TEXT NOT NULL,
-                options TEXT NOT NULL,
-                correct_answer TEXT NOT NULL,
-                explanation TEXT,
-                reference TEXT
-            )
-        ''')
+        ids, _, _ = self._write_questions(cursor, [question], update_existing=False)
 
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS exam_sessions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                exam_type TEXT NOT NULL,
-                date DATETIME NOT NULL,
-                score INTEGER NOT NULL,
-                total INTEGER NOT NULL,
-                time_spent INTEGER NOT NULL,
-                weak_domains TEXT
-            )
-        ''')
+        self._finish_question_write(conn, cursor, conn.total_changes > changes_before)
+        return ids[0]
 
-        # Spaced repetition table - now with user_id for per-user tracking
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS question_stats (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                question_id INTEGER NOT NULL,
-                user_id INTEGER DEFAULT 1,
-                times_seen INTEGER DEFAULT 0,
-                times_correct INTEGER DEFAULT 0,
-                last_seen DATETIME,
-                ease_factor REAL DEFAULT 2.5,
-                interval_days INTEGER DEFAULT 1,
-                next_review DATETIME,
-                FOREIGN KEY (question_id) REFERENCES questions(id),
-                UNIQUE(question_id, user_id)
-            )
-        ''')
-
-        # Add user_id column to question_stats if not exists
-        cursor.execute("PRAGMA table_info(question_stats)")
-        columns = [col[1] for col in cursor.fetchall()]
-        if 'user_id' not in columns:
-            cursor.execute('ALTER TABLE question_stats ADD COLUMN user_id INTEGER DEFAULT 1')
-
-        # Add user_id column to exam_sessions if not exists
-        cursor.execute("PRAGMA table_info(exam_sessions)")
-        columns = [col[1] for col in cursor.fetchall()]
-        if 'user_id' not in columns:
-            cursor.execute('ALTER TABLE exam_sessions ADD COLUMN user_id INTEGER DEFAULT 1')
-
-        # Add question_id and num_correct columns to questions if not exists
-        cursor.execute("PRAGMA table_info(questions)")
-        columns = [col[1] for col in cursor.fetchall()]
-        if 'question_id' not in columns:
-            cursor.execute('ALTER TABLE questions ADD COLUMN question_id TEXT DEFAULT ""')
-        if 'num_correct' not in columns:
-            cursor.execute('ALTER TABLE questions ADD COLUMN num_correct INTEGER DEFAULT 1')
+    def add_questions(self, questions: Iterable[Question]) -> int:
+        """
+        Insert many questions in a single transaction, skipping any whose
+        content is already stored. Returns the number inserted.
+        """
+        inserted, _ = self._store_questions(questions, update_existing=False)
+        return inserted
 
-        conn.commit()
-        conn.close()
+    def upsert_questions(self, questions: Iterable[Question]) -> Tuple[int, int]:
+        """
+        Like add_questions, but questions already stored get their metadata
+        (domain, difficulty, explanation, reference, ids) refreshed.
+        Returns (inserted, updated).
+        """
+        return self._store_questions(questions, update_existing=True)
+
+    def _store_questions(self, questions: Iterable[Question], update_existing: bool) -> Tuple[int, int]:
+        questions = list(questions)
+        if not questions:
+            return 0, 0
 
-    def add_question(self, question: Question) -> int:
         conn = self._get_connection()
         cursor = conn.cursor()
+        # Take the write lock first so the existing-hash read stays valid
+        cursor.execute('BEGIN IMMEDIATE')
+        changes_before = conn.total_changes
 
-        cursor.execute('''
+        _, inserted_ids, _ = self._write_questions(cursor, questions, update_existing)
+
+        changed = conn.total_changes - changes_before
+        self._finish_question_write(conn, cursor, changed > 0)
+        return len(inserted_ids), changed - len(inserted_ids)
+
+    def _write_questions(self, cursor: sqlite3.Cursor, questions: List[Question],
+                         update_existing: bool, staged: bool = False) -> Tuple[List[int], List[int], List[int]]:
+        """
+        Insert the questions whose content is new, inside the caller's
+        transaction. Known questions are skipped (or have their metadata
+        refreshed) and revived if they had been retired. When staged, new
+        questions are inserted retired and retired ones are left as they
+        are, for the caller to revive both later.
+        Returns (id of every question in order, ids inserted, ids revived).
+        """
+        rows = [self._question_row(question) for question in questions]
+        exam_types = {question.exam_type for question in questions}
+        existing: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        # Only this batch's hashes are looked up, so writing a large import
+        # in batches does not rescan the whole table for each one
+        for exam_type in exam_types:
+            hashes = list({row[-1] for question, row in zip(questions, rows) if question.exam_type == exam_type})
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                placeholders = ','.join('?' for _ in chunk)
+                cursor.execute(f'''
+                    SELECT content_hash, id, retired FROM questions
+                    WHERE exam_type = ? AND content_hash IN ({placeholders})
+                ''', [exam_type] + chunk)
+                existing.update(((exam_type, row[0]), (row[1], row[2])) for row in cursor.fetchall())
+
+        new_rows = {}
+        revive_ids = set()
+        update_rows = []
+        for question, row in zip(questions, rows):
+            key = (question.exam_type, row[-1])
+            if key in existing:
+                question_id, retired = existing[key]
+                if retired:
+                    revive_ids.add(question_id)
+                if update_existing:
+                    update_rows.append((
+                        question.domain, question.difficulty, question.explanation, question.reference,
+                        question.question_id, question.num_correct, question_id
+                    ))
+            elif key not in new_rows:
+                # Later copies in the same batch are duplicates too
+                new_rows[key] = row
+
+        cursor.executemany('''
             INSERT INTO questions (exam_type, domain, difficulty, question_text,
                                    options, correct_answer, explanation, reference,
-                                   question_id, num_correct)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            question.exam_type,
-            question.domain,
-            question.difficulty,
-            question.question_text,
-            json.dumps(question.options),
-            question.correct_answer,
-            question.explanation,
-            question.reference,
-            question.question_id,
-            question.num_correct
-        ))
-
-        question_id = cursor.lastrowid
+                                   question_id, num_correct, content_hash, retired)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [row + (int(staged),) for row in new_rows.values()])
+
+        if not staged:
+            cursor.executemany('UPDATE questions SET retired = 0 WHERE id = ?', [(i,) for i in revive_ids])
+        cursor.executemany('''
+            UPDATE questions
+            SET domain = ?1, difficulty = ?2, explanation = ?3, reference = ?4,
+                question_id = ?5, num_correct = ?6
+            WHERE id = ?7
+              AND (domain IS NOT ?1 OR difficulty IS NOT ?2 OR explanation IS NOT ?3
+                   OR reference IS NOT ?4 OR question_id IS NOT ?5 OR num_correct IS NOT ?6)
+        ''', update_rows)
+
+        inserted_ids = []
+        if new_rows:
+            for exam_type in exam_types:
+                hashes = [key[1] for key in new_rows if key[0] == exam_type]
+                for start in range(0, len(hashes), 500):
+                    chunk = hashes[start:start + 500]
+                    placeholders = ','.join('?' for _ in chunk)
+                    cursor.execute(f'''
+                        SELECT content_hash, id FROM questions
+                        WHERE exam_type = ? AND content_hash IN ({placeholders})
+                    ''', [exam_type] + chunk)
+                    for content_hash, question_id in cursor.fetchall():
+                        existing[(exam_type, content_hash)] = (question_id, 0)
+                        inserted_ids.append(question_id)
+
+        ids = [existing[(question.exam_type, row[-1])][0] for question, row in zip(questions, rows)]
+        return ids, sorted(inserted_ids), sorted(revive_ids)
+
+    def _finish_question_write(self, conn: sqlite3.Connection, cursor: sqlite3.Cursor, changed: bool):
+        """Commit a question write; caches are only invalidated if questions changed."""
+        # A re-import of known content changes nothing and invalidates nothing
+        seq = record_change(cursor, QUESTIONS_SCOPE) if changed else None
         conn.commit()
         conn.close()
-        return question_id
+        if changed:
+            self.watcher.acknowledge(seq)
+            self._invalidate_questions()
+
+    def _invalidate_questions(self):
+        """Drop everything derived from the question bank."""
+        self.cache.invalidate_all()
+        self.catalog.clear()
+
+    def sync(self):
+        """Invalidate the cache partitions other processes have written to."""
+        for scope in self.watcher.poll():
+            if scope == QUESTIONS_SCOPE:
+                self._invalidate_questions()
+            elif scope.startswith('user:'):
+                self.cache.invalidate_user(int(scope.split(':', 1)[1]))
+
+    def get_questions_by_ids(self, question_ids: List[int]) -> List[Question]:
+        if not question_ids:
+            return []
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        placeholders = ','.join('?' for _ in question_ids)
+        cursor.execute(f'SELECT * FROM questions WHERE id IN ({placeholders})', list(question_ids))
+        rows = cursor.fetchall()
+        conn.close()
+
+        return [Question.from_dict(dict(row)) for row in rows]
 
     def get_questions_by_exam(self, exam_type: str, limit: Optional[int] = None) -> List[Question]:
         conn = self._get_connection()
@@ -120,7 +220,7 @@ class DatabaseManager:
 
         query = '''
             SELECT * FROM questions
-            WHERE exam_type = ?
+            WHERE exam_type = ? AND retired = 0
             ORDER BY difficulty ASC, RANDOM()
         '''
         if limit:
@@ -132,6 +232,25 @@ class DatabaseManager:
 
         return [Question.from_dict(dict(row)) for row in rows]
 
+    def get_question_ids_by_exam(self, exam_type: str, limit: Optional[int] = None) -> List[int]:
+        """Same selection as get_questions_by_exam, ordered by (difficulty, id), ids only."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        query = '''
+            SELECT id, difficulty FROM questions
+            WHERE exam_type = ? AND retired = 0
+            ORDER BY difficulty ASC, RANDOM()
+        '''
+        if limit:
+            query += f' LIMIT {limit}'
+
+        cursor.execute(query, (exam_type,))
+        rows = cursor.fetchall()
+        conn.close()
+
+        return [row['id'] for row in sorted(rows, key=lambda r: (r['difficulty'], r['id']))]
+
     def get_questions_by_difficulty(self, exam_type: str, num_easy: int,
                                      num_medium: int, num_hard: int) -> List[Question]:
         conn = self._get_connection()
@@ -142,7 +261,7 @@ class DatabaseManager:
         for difficulty, count in [(1, num_easy), (2, num_medium), (3, num_hard)]:
             cursor.execute('''
                 SELECT * FROM questions
-                WHERE exam_type = ? AND difficulty = ?
+                WHERE exam_type = ? AND difficulty = ? AND retired = 0
                 ORDER BY RANDOM()
                 LIMIT ?
             ''', (exam_type, difficulty, count))
@@ -158,7 +277,7 @@ class DatabaseManager:
 
         cursor.execute('''
             SELECT * FROM questions
-            WHERE exam_type = ?
+            WHERE exam_type = ? AND retired = 0
             ORDER BY difficulty ASC
         ''', (exam_type,))
         rows = cursor.fetchall()
@@ -167,10 +286,17 @@ class DatabaseManager:
         return [Question.from_dict(dict(row)) for row in rows]
 
     def get_question_count(self, exam_type: str) -> int:
+        self.sync()
+        return self.cache.get_or_compute(
+            SHARED, ('question_count', exam_type),
+            lambda: self._query_question_count(exam_type)
+        )
+
+    def _query_question_count(self, exam_type: str) -> int:
         conn = self._get_connection()
         cursor = conn.cursor()
 
-        cursor.execute('SELECT COUNT(*) FROM questions WHERE exam_type = ?', (exam_type,))
+        cursor.execute('SELECT COUNT(*) FROM questions WHERE exam_type = ? AND retired = 0', (exam_type,))
         count = cursor.fetchone()[0]
         conn.close()
 
@@ -194,8 +320,11 @@ class DatabaseManager:
         ))
 
         session_id = cursor.lastrowid
+        seq = record_change(cursor, user_scope(user_id))
         conn.commit()
         conn.close()
+        self.watcher.acknowledge(seq)
+        self.cache.invalidate_user(user_id)
         return session_id
 
     def get_exam_sessions(self, exam_type: str, limit: int = 10, user_id: int = 1) -> List[ExamSession]:
@@ -213,18 +342,263 @@ class DatabaseManager:
 
         return [ExamSession.from_dict(dict(row)) for row in rows]
 
-    def import_questions_from_json(self, json_path: str):
+    def import_questions_from_json(self, json_path: str) -> int:
         with open(json_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
 
-        for q_data in data.get('questions', []):
-            question = Question.from_dict(q_data)
-            self.add_question(question)
+        return self.add_questions(Question.from_dict(q_data) for q_data in data.get('questions', []))
 
     def clear_questions(self, exam_type: str):
         conn = self._get_connection()
         cursor = conn.cursor()
         cursor.execute('DELETE FROM questions WHERE exam_type = ?', (exam_type,))
+        seq = record_change(cursor, QUESTIONS_SCOPE)
+        conn.commit()
+        conn.close()
+        self.watcher.acknowledge(seq)
+        self._invalidate_questions()
+
+    # Import Manifest Methods (source files already imported)
+
+    def get_import_manifest(self) -> Dict[str, dict]:
+        """Manifest entries by source path, with their id lists decoded."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM import_manifest')
+        rows = cursor.fetchall()
+        conn.close()
+
+        manifest = {}
+        for row in rows:
+            entry = dict(row)
+            entry['question_ids'] = json.loads(entry['question_ids'])
+            entry['owned_ids'] = json.loads(entry['owned_ids'])
+            manifest[entry['path']] = entry
+        return manifest
+
+    def touch_import_source(self, path: str, size: int, mtime: float):
+        """Record the new size and mtime of a source whose content did not change."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute('UPDATE import_manifest SET size = ?, mtime = ? WHERE path = ?', (size, mtime, path))
+        conn.commit()
+        conn.close()
+
+    def rename_import_source(self, old_path: str, new_path: str) -> bool:
+        """Move a manifest entry to a new key, unless that key is already taken."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE import_manifest SET path = ?
+            WHERE path = ? AND NOT EXISTS (SELECT 1 FROM import_manifest WHERE path = ?)
+        ''', (new_path, old_path, new_path))
+        renamed = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return renamed
+
+    def import_source(self, path: str, questions: Iterable[Question], size: int, mtime: float,
+                      digest: str, parser_version: int, batch_size: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Store the questions parsed from one source file and record the file in
+        the manifest. Questions the file added earlier but no longer produces
+        are retired. With a batch_size, questions are taken from the iterable
+        and written that many at a time, so only their ids are held for the
+        whole source.
+
+        Each batch is written in its own short transaction, taken only once
+        the batch has been produced, so parsing a large source never holds
+        the write lock. New questions are written retired; one last
+        transaction revives them together with the manifest entry, so an
+        import that fails or is killed part way leaves nothing visible, and
+        the next import of the file revives what it wrote.
+        Returns (inserted, retired).
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        produced, inserted, revived = set(), set(), set()
+        try:
+            for batch in _batches(questions, batch_size):
+                cursor.execute('BEGIN IMMEDIATE')
+                ids, inserted_ids, revived_ids = self._write_questions(
+                    cursor, batch, update_existing=False, staged=True
+                )
+                conn.commit()
+                produced.update(ids)
+                inserted.update(inserted_ids)
+                revived.update(revived_ids)
+
+            cursor.execute('BEGIN IMMEDIATE')
+            manifest = self._load_manifest(cursor)
+            previous = manifest.pop(path, None)
+        except BaseException:
+            conn.rollback()
+            conn.close()
+            raise
+
+        owned = inserted | revived
+        cursor.executemany('UPDATE questions SET retired = 0 WHERE id = ?', [(i,) for i in sorted(owned)])
+        orphaned = set()
+        if previous:
+            owned |= set(previous['owned_ids']) & produced
+            orphaned = set(previous['owned_ids']) - produced
+        retired = self._retire_orphans(cursor, orphaned, manifest)
+
+        cursor.execute('''
+            INSERT OR REPLACE INTO import_manifest
+                (path, size, mtime, digest, parser_version, question_ids, owned_ids, imported_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (path, size, mtime, digest, parser_version,
+              json.dumps(sorted(produced)), json.dumps(sorted(owned)), datetime.now().isoformat()))
+
+        self._finish_question_write(conn, cursor, bool(inserted or revived or retired))
+        return len(inserted), retired
+
+    def retire_import_source(self, path: str) -> int:
+        """Forget a source file that disappeared and retire the questions only it produced."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+
+        manifest = self._load_manifest(cursor)
+        previous = manifest.pop(path, None)
+        if previous is None:
+            conn.rollback()
+            conn.close()
+            return 0
+
+        retired = self._retire_orphans(cursor, set(previous['owned_ids']), manifest)
+        cursor.execute('DELETE FROM import_manifest WHERE path = ?', (path,))
+
+        self._finish_question_write(conn, cursor, retired > 0)
+        return retired
+
+    def _load_manifest(self, cursor: sqlite3.Cursor) -> Dict[str, dict]:
+        cursor.execute('SELECT path, question_ids, owned_ids FROM import_manifest')
+        return {
+            row[0]: {'question_ids': json.loads(row[1]), 'owned_ids': json.loads(row[2])}
+            for row in cursor.fetchall()
+        }
+
+    def _retire_orphans(self, cursor: sqlite3.Cursor, orphaned: set, others: Dict[str, dict]) -> int:
+        """
+        Retire questions a source gave up, unless another source still
+        produces them; that source then takes ownership. Returns the number retired.
+        """
+        for path, entry in others.items():
+            kept = orphaned.intersection(entry['question_ids'])
+            if kept:
+                cursor.execute('UPDATE import_manifest SET owned_ids = ? WHERE path = ?',
+                               (json.dumps(sorted(kept.union(entry['owned_ids']))), path))
+                orphaned -= kept
+
+        cursor.executemany('UPDATE questions SET retired = 1 WHERE id = ? AND retired = 0',
+                           [(question_id,) for question_id in orphaned])
+        return max(cursor.rowcount, 0) if orphaned else 0
+
+    # Exam Progress Methods (checkpoints of in-progress exams)
+
+    def start_exam_progress(self, user_id: int, config: dict, question_ids: List[int]) -> int:
+        """
+        Record a new attempt. Other unfinished attempts of the user (e.g. in
+        another tab) are kept unless they started over a day ago.
+        Returns the attempt id.
+        """
+        now = datetime.now()
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            DELETE FROM exam_progress WHERE user_id = ? AND attempt_id IN (
+                SELECT id FROM exam_progress WHERE user_id = ? AND kind = 'start' AND created_at < ?
+            )
+        ''', (user_id, user_id, (now - timedelta(hours=EXAM_PROGRESS_RETAIN_HOURS)).isoformat()))
+        cursor.execute('''
+            INSERT INTO exam_progress (user_id, attempt_id, kind, position, value, payload, created_at)
+            VALUES (?, 0, 'start', 0, 0, ?, ?)
+        ''', (
+            user_id,
+            json.dumps({'config': config, 'question_ids': list(question_ids)}),
+            now.isoformat()
+        ))
+        attempt_id = cursor.lastrowid
+        cursor.execute('UPDATE exam_progress SET attempt_id = ? WHERE id = ?', (attempt_id, attempt_id))
+
+        conn.commit()
+        conn.close()
+        return attempt_id
+
+    def save_exam_progress(self, user_id: int, attempt_id: int, changes: Dict[int, Tuple[int, int]],
+                           current_question: int):
+        """
+        Append one row per changed position and record the current question.
+        `changes` maps position -> (answer mask, flags), as from ExamState.pop_changes.
+        """
+        now = datetime.now().isoformat()
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        cursor.executemany('''
+            INSERT INTO exam_progress (user_id, attempt_id, kind, position, value, created_at)
+            VALUES (?, ?, 'question', ?, ?, ?)
+        ''', [
+            (user_id, attempt_id, position, answer | (flags << 8), now)
+            for position, (answer, flags) in changes.items()
+        ])
+        cursor.execute('''
+            UPDATE exam_progress SET position = ?
+            WHERE id = ? AND user_id = ?
+        ''', (current_question, attempt_id, user_id))
+
+        conn.commit()
+        conn.close()
+
+    def get_exam_progress(self, user_id: int) -> Optional[dict]:
+        """
+        Rebuild the user's unfinished exam, if any, from its latest attempt
+        in a single indexed read. Later rows for a position override earlier ones.
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT id, kind, position, value, payload, created_at FROM exam_progress
+            WHERE user_id = ? AND attempt_id = (
+                SELECT MAX(attempt_id) FROM exam_progress WHERE user_id = ?
+            )
+            ORDER BY id
+        ''', (user_id, user_id))
+        rows = cursor.fetchall()
+        conn.close()
+
+        if not rows or rows[0]['kind'] != 'start':
+            return None
+
+        start = rows[0]
+        payload = json.loads(start['payload'])
+        exam = ExamState.new(payload['question_ids'])
+
+        for row in rows[1:]:
+            position = row['position']
+            if 0 <= position < len(exam):
+                exam.answers[position] = row['value'] & 0xFF
+                exam.flags[position] = row['value'] >> 8
+
+        return {
+            'attempt_id': start['id'],
+            'user_id': user_id,
+            'config': payload['config'],
+            'exam': exam,
+            'current_question': min(start['position'], max(len(exam) - 1, 0)),
+            'started_at': datetime.fromisoformat(start['created_at'])
+        }
+
+    def clear_exam_progress(self, user_id: int, attempt_id: int):
+        """Forget an attempt's checkpoints once the exam is submitted or abandoned."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM exam_progress WHERE user_id = ? AND attempt_id = ?', (user_id, attempt_id))
         conn.commit()
         conn.close()
 
@@ -299,8 +673,11 @@ class DatabaseManager:
             ''', (question_id, user_id, 1 if was_correct else 0, now.isoformat(),
                   interval, next_review.isoformat()))
 
+        seq = record_change(cursor, user_scope(user_id))
         conn.commit()
         conn.close()
+        self.watcher.acknowledge(seq)
+        self.cache.invalidate_user(user_id)
 
     def get_questions_for_review(self, exam_type: str, limit: int = 65, user_id: int = 1) -> List[Question]:
         """
@@ -316,7 +693,7 @@ class DatabaseManager:
         cursor.execute('''
             SELECT q.* FROM questions q
             LEFT JOIN question_stats qs ON q.id = qs.question_id AND qs.user_id = ?
-            WHERE q.exam_type = ?
+            WHERE q.exam_type = ? AND q.retired = 0
             AND (qs.next_review IS NULL OR qs.next_review <= ?)
             ORDER BY
                 CASE WHEN qs.next_review IS NULL THEN 1 ELSE 0 END,
@@ -337,7 +714,7 @@ class DatabaseManager:
             cursor.execute(f'''
                 SELECT q.* FROM questions q
                 LEFT JOIN question_stats qs ON q.id = qs.question_id AND qs.user_id = ?
-                WHERE q.exam_type = ?
+                WHERE q.exam_type = ? AND q.retired = 0
                 AND q.id NOT IN ({placeholders})
                 ORDER BY
                     CASE WHEN qs.id IS NULL THEN 0 ELSE 1 END,
@@ -370,12 +747,20 @@ class DatabaseManager:
         return None
 
     def get_learning_progress(self, exam_type: str, user_id: int = 1) -> dict:
-        """Get overall learning progress statistics for a user."""
+        """Get overall learning progress statistics for a user (cached per user)."""
+        self.sync()
+        return self.cache.get_or_compute(
+            user_id, ('learning_progress', exam_type),
+            lambda: self._query_learning_progress(exam_type, user_id),
+            cost=5
+        )
+
+    def _query_learning_progress(self, exam_type: str, user_id: int) -> dict:
         conn = self._get_connection()
         cursor = conn.cursor()
 
         # Total questions
-        cursor.execute('SELECT COUNT(*) FROM questions WHERE exam_type = ?', (exam_type,))
+        cursor.execute('SELECT COUNT(*) FROM questions WHERE exam_type = ? AND retired = 0', (exam_type,))
         total = cursor.fetchone()[0]
 
         # Questions seen at least once by this user
@@ -383,7 +768,7 @@ class DatabaseManager:
             SELECT COUNT(DISTINCT qs.question_id)
             FROM question_stats qs
             JOIN questions q ON qs.question_id = q.id
-            WHERE q.exam_type = ? AND qs.user_id = ?
+            WHERE q.exam_type = ? AND q.retired = 0 AND qs.user_id = ?
         ''', (exam_type, user_id))
         seen = cursor.fetchone()[0]
 
@@ -393,7 +778,7 @@ class DatabaseManager:
             SELECT COUNT(*)
             FROM question_stats qs
             JOIN questions q ON qs.question_id = q.id
-            WHERE q.exam_type = ? AND qs.user_id = ? AND qs.next_review <= ?
+            WHERE q.exam_type = ? AND q.retired = 0 AND qs.user_id = ? AND qs.next_review <= ?
         ''', (exam_type, user_id, now))
         due = cursor.fetchone()[0]
 
@@ -402,7 +787,7 @@ class DatabaseManager:
             SELECT COUNT(*)
             FROM question_stats qs
             JOIN questions q ON qs.question_id = q.id
-            WHERE q.exam_type = ? AND qs.user_id = ? AND qs.interval_days > 21
+            WHERE q.exam_type = ? AND q.retired = 0 AND qs.user_id = ? AND qs.interval_days > 21
         ''', (exam_type, user_id))
         mastered = cursor.fetchone()[0]
 
@@ -411,7 +796,7 @@ class DatabaseManager:
             SELECT AVG(CAST(qs.times_correct AS FLOAT) / NULLIF(qs.times_seen, 0))
             FROM question_stats qs
             JOIN questions q ON qs.question_id = q.id
-            WHERE q.exam_type = ? AND qs.user_id = ? AND qs.times_seen > 0
+            WHERE q.exam_type = ? AND q.retired = 0 AND qs.user_id = ? AND qs.times_seen > 0
         ''', (exam_type, user_id))
         avg_success = cursor.fetchone()[0] or 0
 
@@ -425,3 +810,20 @@ class DatabaseManager:
             "mastered": mastered,
             "avg_success_rate": avg_success * 100
         }
+
+
+def _batches(items: Iterable, size: Optional[int]) -> Iterable[list]:
+    """Lists of up to `size` items (all of them at once without a size), skipping empty ones."""
+    if not size:
+        items = list(items)
+        if items:
+            yield items
+        return
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
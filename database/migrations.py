@@ -0,0 +1,335 @@
+"""
+Versioned schema migrations shared by DatabaseManager and AuthManager.
+
+Each migration runs exactly once per database. Applied versions are
+recorded in the schema_version table, so a normal startup is a single
+version check. Pending migrations run inside an EXCLUSIVE transaction,
+which doubles as the cross-process lock when several workers start at once.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Set, Tuple
+
+from .models import compute_content_hash
+
+logger = logging.getLogger(__name__)
+
+
+def _add_column_if_missing(cursor: sqlite3.Cursor, table: str, column: str, definition: str):
+    """Add a column to a table unless a pre-migration database already has it."""
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in [col[1] for col in cursor.fetchall()]:
+        cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+
+
+def _migration_001_baseline(cursor: sqlite3.Cursor):
+    """Core tables, including columns that older databases added ad hoc."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS questions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            exam_type TEXT NOT NULL,
+            domain TEXT NOT NULL,
+            difficulty INTEGER NOT NULL,
+            question_text TEXT NOT NULL,
+            options TEXT NOT NULL,
+            correct_answer TEXT NOT NULL,
+            explanation TEXT,
+            reference TEXT
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS exam_sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            exam_type TEXT NOT NULL,
+            date DATETIME NOT NULL,
+            score INTEGER NOT NULL,
+            total INTEGER NOT NULL,
+            time_spent INTEGER NOT NULL,
+            weak_domains TEXT
+        )
+    ''')
+
+    # Spaced repetition table - with user_id for per-user tracking
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS question_stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            question_id INTEGER NOT NULL,
+            user_id INTEGER DEFAULT 1,
+            times_seen INTEGER DEFAULT 0,
+            times_correct INTEGER DEFAULT 0,
+            last_seen DATETIME,
+            ease_factor REAL DEFAULT 2.5,
+            interval_days INTEGER DEFAULT 1,
+            next_review DATETIME,
+            FOREIGN KEY (question_id) REFERENCES questions(id),
+            UNIQUE(question_id, user_id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT UNIQUE NOT NULL,
+            username TEXT NOT NULL,
+            password_hash TEXT,
+            auth_provider TEXT DEFAULT 'email',
+            created_at DATETIME NOT NULL,
+            last_login DATETIME
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS certifications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            code TEXT NOT NULL,
+            issued_date DATETIME,
+            expiry_date DATETIME,
+            credential_id TEXT,
+            credly_badge_url TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+
+    _add_column_if_missing(cursor, 'question_stats', 'user_id', 'INTEGER DEFAULT 1')
+    _add_column_if_missing(cursor, 'exam_sessions', 'user_id', 'INTEGER DEFAULT 1')
+    _add_column_if_missing(cursor, 'questions', 'question_id', 'TEXT DEFAULT ""')
+    _add_column_if_missing(cursor, 'questions', 'num_correct', 'INTEGER DEFAULT 1')
+    _add_column_if_missing(cursor, 'users', 'nickname', 'TEXT')
+    _add_column_if_missing(cursor, 'users', 'phone', 'TEXT')
+    _add_column_if_missing(cursor, 'users', 'show_in_leaderboard', 'INTEGER DEFAULT 0')
+    _add_column_if_missing(cursor, 'users', 'experience', 'INTEGER DEFAULT 0')
+    _add_column_if_missing(cursor, 'users', 'credly_url', 'TEXT')
+
+
+def _migration_002_user_sessions(cursor: sqlite3.Cursor):
+    """Persistent login sessions (only the SHA-256 of the token is stored)."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_sessions (
+            token_hash TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            created_at DATETIME NOT NULL,
+            expires_at DATETIME NOT NULL,
+            revoked INTEGER DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_sessions_user ON user_sessions (user_id)')
+
+
+def _migration_003_xp_ledger(cursor: sqlite3.Cursor):
+    """Append-only XP ledger; users.experience holds the compacted total."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS xp_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            points INTEGER NOT NULL,
+            created_at DATETIME NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_xp_events_user ON xp_events (user_id, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_xp_events_created ON xp_events (created_at)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS xp_compaction (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            last_event_id INTEGER NOT NULL DEFAULT 0,
+            compacted_at DATETIME
+        )
+    ''')
+    cursor.execute('INSERT OR IGNORE INTO xp_compaction (id, last_event_id) VALUES (1, 0)')
+
+
+def _migration_004_auth_throttle(cursor: sqlite3.Cursor):
+    """Persisted token buckets for login attempt throttling."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS auth_throttle (
+            key TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    ''')
+
+
+def _migration_005_exam_progress(cursor: sqlite3.Cursor):
+    """Checkpoints of in-progress exams, stored as incremental diffs."""
+    # One 'start' row per attempt (its id is the attempt_id) holds the exam
+    # config and question ids and is updated in place with the current
+    # question; each 'question' row records the answer/flag bytes of one
+    # changed position.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS exam_progress (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            attempt_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            position INTEGER,
+            value INTEGER,
+            payload TEXT,
+            created_at DATETIME NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_exam_progress_attempt
+        ON exam_progress (user_id, attempt_id, id)
+    ''')
+
+
+def _migration_006_data_changes(cursor: sqlite3.Cursor):
+    """Change sequence per cache scope, for cross-process invalidation."""
+    # The '*' row holds the global sequence; see database/coherence.py
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS data_changes (
+            scope TEXT PRIMARY KEY,
+            seq INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_data_changes_seq ON data_changes (seq)')
+    cursor.execute("INSERT OR IGNORE INTO data_changes (scope, seq) VALUES ('*', 0)")
+
+
+def _migration_007_question_indexes(cursor: sqlite3.Cursor):
+    """Index for the per-exam question selection and counts."""
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_questions_exam_difficulty
+        ON questions (exam_type, difficulty)
+    ''')
+
+
+def _migration_008_question_content_hash(cursor: sqlite3.Cursor):
+    """Content hash per question, unique per exam, so re-imports can skip duplicates."""
+    _add_column_if_missing(cursor, 'questions', 'content_hash', 'TEXT')
+
+    cursor.execute('SELECT id, exam_type, question_text, options, correct_answer FROM questions ORDER BY id')
+    seen = set()
+    updates = []
+    duplicates = 0
+    for question_id, exam_type, question_text, options, correct_answer in cursor.fetchall():
+        key = (exam_type, compute_content_hash(question_text, json.loads(options), correct_answer))
+        if key in seen:
+            # Later copies keep a NULL hash: stats and history may reference them
+            duplicates += 1
+            continue
+        seen.add(key)
+        updates.append((key[1], question_id))
+    cursor.executemany('UPDATE questions SET content_hash = ? WHERE id = ?', updates)
+
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_questions_content_hash
+        ON questions (exam_type, content_hash)
+    ''')
+    if duplicates:
+        logger.info("%d duplicate questions left without a content hash", duplicates)
+
+
+def _migration_009_import_manifest(cursor: sqlite3.Cursor):
+    """Source files already imported, and a retired flag for questions whose source is gone."""
+    _add_column_if_missing(cursor, 'questions', 'retired', 'INTEGER NOT NULL DEFAULT 0')
+
+    # question_ids: JSON list of every question the file produces.
+    # owned_ids: the subset it added, which is retired when nothing produces it any more
+    # path: relative to the checkout for sources inside it (see importers.pipeline.source_key)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS import_manifest (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            digest TEXT NOT NULL,
+            parser_version INTEGER NOT NULL,
+            question_ids TEXT NOT NULL,
+            owned_ids TEXT NOT NULL,
+            imported_at DATETIME NOT NULL
+        )
+    ''')
+
+
+# Ordered list of (version, description, migration). Append only - never
+# renumber or edit a migration that has shipped.
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, "baseline schema", _migration_001_baseline),
+    (2, "user sessions", _migration_002_user_sessions),
+    (3, "xp ledger", _migration_003_xp_ledger),
+    (4, "auth throttle", _migration_004_auth_throttle),
+    (5, "exam progress", _migration_005_exam_progress),
+    (6, "data changes", _migration_006_data_changes),
+    (7, "question indexes", _migration_007_question_indexes),
+    (8, "question content hash", _migration_008_question_content_hash),
+    (9, "import manifest", _migration_009_import_manifest),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# Databases already brought up to date by this process
+_migrated_paths: Set[str] = set()
+_migrated_lock = threading.Lock()
+
+
+def _current_version(cursor: sqlite3.Cursor) -> int:
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at DATETIME NOT NULL,
+            duration_ms REAL NOT NULL
+        )
+    ''')
+    cursor.execute('SELECT MAX(version) FROM schema_version')
+    return cursor.fetchone()[0] or 0
+
+
+def migrate(db_path: str) -> int:
+    """
+    Bring the database at db_path up to LATEST_VERSION.
+    Returns the schema version after migrating.
+    """
+    with _migrated_lock:
+        if db_path in _migrated_paths:
+            return LATEST_VERSION
+
+        # isolation_level=None so we control the transaction explicitly
+        conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        cursor = conn.cursor()
+
+        try:
+            version = _current_version(cursor)
+            if version >= LATEST_VERSION:
+                _migrated_paths.add(db_path)
+                return version
+
+            # Another process may be migrating; EXCLUSIVE waits for it
+            cursor.execute('BEGIN EXCLUSIVE')
+            version = _current_version(cursor)
+
+            for number, description, migration in MIGRATIONS:
+                if number <= version:
+                    continue
+
+                started = time.perf_counter()
+                migration(cursor)
+                duration_ms = (time.perf_counter() - started) * 1000
+
+                cursor.execute('''
+                    INSERT INTO schema_version (version, description, applied_at, duration_ms)
+                    VALUES (?, ?, ?, ?)
+                ''', (number, description, datetime.now().isoformat(), duration_ms))
+                logger.info("Applied migration %03d (%s) in %.1f ms", number, description, duration_ms)
+                version = number
+
+            cursor.execute('COMMIT')
+            _migrated_paths.add(db_path)
+            return version
+
+        except Exception:
+            if conn.in_transaction:
+                cursor.execute('ROLLBACK')
+            raise
+
+        finally:
+            conn.close()
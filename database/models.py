@@ -1,7 +1,45 @@
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from datetime import datetime
+from array import array
+import hashlib
 import json
+import re
+import unicodedata
+
+# "A. ", "b) " and similar labels in front of option text
+OPTION_LABEL_PATTERN = re.compile(r'^\s*[A-Za-z][.)]\s+')
+
+
+def _normalize_content(text: str) -> str:
+    return ' '.join(unicodedata.normalize('NFKC', text or '').casefold().split())
+
+
+def compute_content_hash(question_text: str, options: List[str], correct_answer: str) -> str:
+    """
+    Fingerprint of a question's content: its text, its options and the text
+    of the correct options. Option order and labels, case and whitespace do
+    not change it, so the same question from two sources hashes the same.
+    """
+    option_texts = [_normalize_content(OPTION_LABEL_PATTERN.sub('', option, count=1)) for option in options]
+
+    correct = []
+    for letter in (correct_answer or '').split(','):
+        letter = letter.strip().upper()
+        if not letter:
+            continue
+        index = ord(letter[0]) - ord('A')
+        if len(letter) == 1 and 0 <= index < len(option_texts):
+            correct.append(option_texts[index])
+        else:
+            correct.append(_normalize_content(letter))
+
+    payload = '\x1f'.join([
+        _normalize_content(question_text),
+        '\x1e'.join(sorted(option_texts)),
+        '\x1e'.join(sorted(correct)),
+    ])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
 
 @dataclass
@@ -63,6 +101,10 @@ class Question:
             'num_correct': self.num_correct
         }
 
+    @property
+    def content_hash(self) -> str:
+        return compute_content_hash(self.question_text, self.options, self.correct_answer)
+
     @property
     def correct_answers_list(self) -> List[str]:
         """Return correct answers as a list."""
@@ -122,6 +164,76 @@ class ExamSession:
         return (self.score / self.total) * 100
 
 
+@dataclass
+class ExamState:
+    """
+    Compact state of an exam in progress: question ids plus one answer
+    bitmask and one flag byte per question. Question content is resolved
+    through the shared QuestionCatalog instead of living in session state.
+    """
+    question_ids: array  # array('l') of questions.id
+    answers: array  # array('B'), bit n set = option letter chr(65 + n) selected
+    flags: array  # array('B') of FLAG_* bits
+    # Positions changed since the last checkpoint (see pop_changes)
+    changed: Set[int] = field(default_factory=set)
+
+    FLAG_MARKED = 1
+    FLAG_CHECKED = 2
+    FLAG_RATED = 4
+
+    @classmethod
+    def new(cls, question_ids: Iterable[int]) -> 'ExamState':
+        ids = array('l', question_ids)
+        return cls(question_ids=ids, answers=array('B', bytes(len(ids))), flags=array('B', bytes(len(ids))))
+
+    def __len__(self) -> int:
+        return len(self.question_ids)
+
+    def get_answer(self, index: int) -> Optional[str]:
+        """Answer at a position as a comma-separated string (e.g. "A,C")."""
+        mask = self.answers[index]
+        if not mask:
+            return None
+        return ','.join(chr(65 + bit) for bit in range(8) if mask & (1 << bit))
+
+    def set_answer(self, index: int, answer: Optional[str]):
+        mask = 0
+        for letter in (answer or '').split(','):
+            letter = letter.strip().upper()
+            if letter and 'A' <= letter <= 'H':
+                mask |= 1 << (ord(letter) - 65)
+        if self.answers[index] != mask:
+            self.answers[index] = mask
+            self.changed.add(index)
+
+    def has_flag(self, index: int, flag: int) -> bool:
+        return bool(self.flags[index] & flag)
+
+    def set_flag(self, index: int, flag: int, value: bool = True):
+        flags = self.flags[index] | flag if value else self.flags[index] & ~flag & 0xFF
+        if self.flags[index] != flags:
+            self.flags[index] = flags
+            self.changed.add(index)
+
+    @property
+    def answered_count(self) -> int:
+        return sum(1 for mask in self.answers if mask)
+
+    def answers_by_id(self) -> Dict[int, str]:
+        """Answers keyed by question id, as expected by the scoring helpers."""
+        return {
+            qid: self.get_answer(i)
+            for i, qid in enumerate(self.question_ids)
+            if self.answers[i]
+        }
+
+    def pop_changes(self) -> Dict[int, Tuple[int, int]]:
+        """(answer mask, flags) of every position changed since the last call."""
+        changes = {i: (self.answers[i], self.flags[i]) for i in sorted(self.changed)}
+        self.changed.clear()
+        return changes
+
+
 DOMAINS = {
     "1": "Design Secure Architectures",
     "2": "Design Resilient Architectures",
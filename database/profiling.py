@@ -0,0 +1,169 @@
+"""
+Opt-in rerun profiling.
+
+When enabled, each measured region (a full app rerun, a page renderer or a
+fragment) records its wall time plus the number and total duration of SQL
+statements the rendering thread ran while it was open. The last `window`
+samples of each region are kept, so percentiles follow recent traffic.
+
+Managers open their connections through connect(), which only swaps in the
+timing connection class while profiling is enabled.
+"""
+import functools
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List
+
+DEFAULT_WINDOW = 500
+PERCENTILES = (50, 95, 99)
+# Upper bounds (ms) of the wall time histogram buckets; the last one is open
+HISTOGRAM_BOUNDS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_local = threading.local()
+
+
+class _Frame:
+    __slots__ = ('db_calls', 'db_seconds')
+
+    def __init__(self):
+        self.db_calls = 0
+        self.db_seconds = 0.0
+
+
+def _timed_call(method, *args):
+    frames = getattr(_local, 'frames', None)
+    if not frames:
+        return method(*args)
+    began = time.perf_counter()
+    try:
+        return method(*args)
+    finally:
+        elapsed = time.perf_counter() - began
+        # Nested regions (a page inside a rerun) all see the statement
+        for frame in frames:
+            frame.db_calls += 1
+            frame.db_seconds += elapsed
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    def execute(self, *args):
+        return _timed_call(super().execute, *args)
+
+    def executemany(self, *args):
+        return _timed_call(super().executemany, *args)
+
+    def executescript(self, *args):
+        return _timed_call(super().executescript, *args)
+
+
+class ProfiledConnection(sqlite3.Connection):
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def execute(self, *args):
+        return _timed_call(super().execute, *args)
+
+    def executemany(self, *args):
+        return _timed_call(super().executemany, *args)
+
+    def executescript(self, *args):
+        return _timed_call(super().executescript, *args)
+
+
+def _percentile(ordered: List[float], pct: int) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-pct * len(ordered) // 100))
+    return ordered[rank - 1]
+
+
+class RenderProfiler:
+    """Rolling per-region timings of app reruns."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.enabled = False
+        self.window = window
+        # label -> deque of (wall_ms, db_calls, db_ms)
+        self._samples: Dict[str, deque] = {}
+        self._totals: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def connect(self, db_path: str, **kwargs) -> sqlite3.Connection:
+        if self.enabled:
+            kwargs['factory'] = ProfiledConnection
+        return sqlite3.connect(db_path, **kwargs)
+
+    def measure(self, label: str):
+        """Context manager recording one sample for `label`."""
+        if not self.enabled:
+            return nullcontext()
+        return self._measure(label)
+
+    @contextmanager
+    def _measure(self, label: str):
+        frames = getattr(_local, 'frames', None)
+        if frames is None:
+            frames = _local.frames = []
+        frame = _Frame()
+        frames.append(frame)
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall_ms = (time.perf_counter() - began) * 1000
+            frames.remove(frame)
+            self.record(label, wall_ms, frame.db_calls, frame.db_seconds * 1000)
+
+    def timed(self, label: str):
+        """Decorator form of measure()."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.measure(label):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, label: str, wall_ms: float, db_calls: int, db_ms: float):
+        with self._lock:
+            samples = self._samples.get(label)
+            if samples is None:
+                samples = self._samples[label] = deque(maxlen=self.window)
+            samples.append((wall_ms, db_calls, db_ms))
+            self._totals[label] = self._totals.get(label, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Percentiles and wall time histogram per label, JSON-serialisable."""
+        with self._lock:
+            samples = {label: list(values) for label, values in self._samples.items()}
+            totals = dict(self._totals)
+
+        report = {}
+        for label, values in sorted(samples.items()):
+            entry = {'runs': totals[label], 'window': len(values)}
+            for name, column in (('wall_ms', 0), ('db_calls', 1), ('db_ms', 2)):
+                ordered = sorted(value[column] for value in values)
+                entry[name] = {f'p{pct}': round(_percentile(ordered, pct), 2) for pct in PERCENTILES}
+
+            counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+            for wall_ms, _, _ in values:
+                bucket = next((i for i, bound in enumerate(HISTOGRAM_BOUNDS_MS) if wall_ms <= bound),
+                              len(HISTOGRAM_BOUNDS_MS))
+                counts[bucket] += 1
+            labels = [f'<={bound}' for bound in HISTOGRAM_BOUNDS_MS] + [f'>{HISTOGRAM_BOUNDS_MS[-1]}']
+            entry['wall_ms_histogram'] = dict(zip(labels, counts))
+            report[label] = entry
+        return report
+
+
+# One profiler per process, shared by every session
+profiler = RenderProfiler()
@@ -0,0 +1,185 @@
+"""
+Prebuilt SQLite snapshot of the seed question bank.
+
+build_snapshot() compiles seed_questions.json into a fully migrated,
+ANALYZEd and VACUUMed database file. ensure_database() runs at startup
+under a file lock: if the app database does not exist yet, the snapshot is
+copied into place and renamed atomically; if it exists but has no seed
+questions, the snapshot is ATTACHed and its questions inserted in one
+transaction. Either way concurrent first boots import the seed once.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from .coherence import QUESTIONS_SCOPE, record_change
+from .db_manager import DatabaseManager
+from .migrations import LATEST_VERSION, migrate
+
+logger = logging.getLogger(__name__)
+
+QUESTION_COLUMNS = (
+    'exam_type, domain, difficulty, question_text, options, correct_answer, '
+    'explanation, reference, question_id, num_correct, content_hash'
+)
+
+
+@contextmanager
+def file_lock(path: str):
+    """Exclusive advisory lock on `path`, held for the duration of the block."""
+    with open(path, 'a+b') as handle:
+        if os.name == 'nt':
+            import msvcrt
+            handle.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after ~10 s; keep waiting
+                    continue
+            try:
+                yield
+            finally:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def seed_fingerprint(seed_path: str) -> str:
+    """Identifies the seed content and the schema a snapshot of it would have."""
+    with open(seed_path, 'rb') as f:
+        return f'{hashlib.sha256(f.read()).hexdigest()}:v{LATEST_VERSION}'
+
+
+def snapshot_fingerprint(snapshot_path: str) -> Optional[str]:
+    """Fingerprint of the seed a snapshot was built from, or None if unusable."""
+    if not os.path.exists(snapshot_path):
+        return None
+    try:
+        conn = sqlite3.connect(f'file:{snapshot_path}?mode=ro', uri=True)
+        try:
+            row = conn.execute("SELECT value FROM snapshot_meta WHERE key = 'seed_fingerprint'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError:
+        return None
+    return row[0] if row else None
+
+
+def build_snapshot(seed_path: str, snapshot_path: str) -> int:
+    """
+    Build the snapshot for seed_path and move it to snapshot_path atomically.
+    Returns the number of questions in it.
+    """
+    tmp_path = f'{snapshot_path}.{os.getpid()}.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    try:
+        count = DatabaseManager(tmp_path).import_questions_from_json(seed_path)
+
+        conn = sqlite3.connect(tmp_path, isolation_level=None)
+        try:
+            conn.execute('CREATE TABLE snapshot_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            conn.execute("INSERT INTO snapshot_meta (key, value) VALUES ('seed_fingerprint', ?)",
+                         (seed_fingerprint(seed_path),))
+            conn.execute('ANALYZE')
+            conn.execute('VACUUM')
+        finally:
+            conn.close()
+
+        os.replace(tmp_path, snapshot_path)
+        return count
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _has_questions(db_path: str, exam_type: str) -> bool:
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(
+            'SELECT 1 FROM questions WHERE exam_type = ? LIMIT 1', (exam_type,)
+        ).fetchone() is not None
+    finally:
+        conn.close()
+
+
+def _attach_seed(db_path: str, snapshot_path: str):
+    """Copy the snapshot's questions into an existing database in one transaction."""
+    conn = sqlite3.connect(db_path, isolation_level=None, uri=True)
+    try:
+        conn.execute('ATTACH DATABASE ? AS seed', (f'file:{snapshot_path}?mode=ro',))
+        conn.execute('BEGIN IMMEDIATE')
+        # Only exam types the database has no questions for yet
+        conn.execute(f'''
+            INSERT INTO main.questions ({QUESTION_COLUMNS})
+            SELECT {QUESTION_COLUMNS} FROM seed.questions
+            WHERE exam_type NOT IN (SELECT DISTINCT exam_type FROM main.questions)
+        ''')
+        record_change(conn.cursor(), QUESTIONS_SCOPE)
+        conn.execute('COMMIT')
+        conn.execute('DETACH DATABASE seed')
+    finally:
+        conn.close()
+
+
+def ensure_database(db_path: str, seed_path: str, snapshot_path: str, exam_type: str = 'SAA-C03') -> str:
+    """
+    Make sure db_path exists and holds the seed questions, building the
+    snapshot first if it is missing or stale. Safe to call from several
+    processes at once. Returns what was done: 'ready', 'copied' or 'attached'.
+    """
+    # Fast path: nothing to do on every start after the first
+    if os.path.exists(db_path) and os.path.getsize(db_path) > 0:
+        migrate(db_path)
+        if _has_questions(db_path, exam_type):
+            return 'ready'
+
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    with file_lock(f'{db_path}.lock'):
+        started = time.perf_counter()
+        fresh = not os.path.exists(db_path) or os.path.getsize(db_path) == 0
+        if not fresh:
+            migrate(db_path)
+            if _has_questions(db_path, exam_type):
+                # Another process seeded it while we waited for the lock
+                return 'ready'
+
+        if not os.path.exists(seed_path):
+            return 'ready'
+
+        if snapshot_fingerprint(snapshot_path) != seed_fingerprint(seed_path):
+            count = build_snapshot(seed_path, snapshot_path)
+            logger.info("Built seed snapshot with %d questions", count)
+
+        if fresh:
+            tmp_path = f'{db_path}.{os.getpid()}.tmp'
+            shutil.copyfile(snapshot_path, tmp_path)
+            # The fingerprint describes the snapshot, not the app database
+            conn = sqlite3.connect(tmp_path, isolation_level=None)
+            try:
+                conn.execute('DROP TABLE IF EXISTS snapshot_meta')
+            finally:
+                conn.close()
+            os.replace(tmp_path, db_path)
+            action = 'copied'
+        else:
+            _attach_seed(db_path, snapshot_path)
+            action = 'attached'
+
+        logger.info("Seeded %s from snapshot (%s) in %.1f ms",
+                    db_path, action, (time.perf_counter() - started) * 1000)
+        return action
@@ -3,58 +3,46 @@ Script to import Anki notes and generate exam questions from them.
 """
 import os
 import re
-import html
+import json
+import pathlib
 import random
-from database.db_manager import DatabaseManager
+import shutil
+import sqlite3
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
 from database.models import Question
+from importers.pipeline import ImportPipeline, SourceAdapter
+from utils.classifier import classifier
+from utils.distractors import DistractorEngine
+from utils.html_text import html_to_text
 
-# Domain mapping based on content keywords
-DOMAIN_KEYWORDS = {
-    "1": ["iam", "security", "encryption", "kms", "cognito", "guard duty", "policy", "role", "mfa", "access key"],
-    "2": ["rds", "aurora", "elasticache", "route 53", "multi-az", "replica", "failover", "backup", "disaster", "recovery", "high availability", "scalability", "load balancer"],
-    "3": ["ec2", "s3", "ebs", "efs", "lambda", "dynamodb", "cloudfront", "vpc", "subnet", "kinesis", "sqs", "sns", "container", "ecs", "eks"],
-    "4": ["cost", "pricing", "reserved", "spot", "savings", "budget", "architecture"]
-}
+# Bump when card parsing or question generation changes
+PARSER_VERSION = 6
 
+# Default seed for distractor choice and option order; a fixed seed keeps
+# re-imports of unchanged cards identical
+DEFAULT_SEED = 0
 
-def detect_domain(text: str) -> str:
-    """Detect domain based on content keywords."""
-    text_lower = text.lower()
+# Collection files in an .apkg, preferred first; newer packages also carry a
+# placeholder collection.anki2 that asks to upgrade Anki
+APKG_COLLECTIONS = ("collection.anki21", "collection.anki2")
+# Notes read from a package collection at a time
+NOTE_CHUNK = 1000
+# Answers kept per distractor pool; larger pools keep a seeded sample,
+# drawn as the answers stream in
+POOL_LIMIT = 10000
 
-    scores = {d: 0 for d in DOMAIN_KEYWORDS.keys()}
-    for domain, keywords in DOMAIN_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword in text_lower:
-                scores[domain] += 1
 
-    max_score = max(scores.values())
-    if max_score > 0:
-        for domain, score in scores.items():
-            if score == max_score:
-                return domain
-
-    return "3"  # Default to Domain 3
+def detect_domain(text: str) -> str:
+    """Detect domain based on content keywords."""
+    return classifier.classify(text).domain()
 
 
 def clean_html_text(text: str) -> str:
-    """Remove HTML tags and clean text."""
-    if not text:
-        return ""
-
-    # Decode HTML entities
-    text = html.unescape(text)
-
-    # Replace <br> with newlines
-    text = re.sub(r'<br\s*/?>', '\n', text, flags=re.IGNORECASE)
-
-    # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
-
-    # Clean up whitespace
-    text = re.sub(r'\n\s*\n', '\n', text)
-    text = text.strip()
-
-    return text
+    """Markdown-flavoured text of an HTML fragment; see utils.html_text."""
+    return html_to_text(text)
 
 
 def parse_cloze(text: str):
@@ -104,45 +92,203 @@ def generate_cloze_question(text: str, cloze_num: int = 1):
     return question_text, correct_answers
 
 
-def generate_mcq_from_cloze(text: str, all_answers: list):
-    """Generate MCQ options from cloze text."""
-    cloze_nums, answers_by_num = parse_cloze(text)
-    if not cloze_nums:
-        return None
-
-    # Use first cloze
-    cloze_num = cloze_nums[0]
-    question_text, correct = generate_cloze_question(text, cloze_num)
-
-    if not correct:
+class DistractorPool:
+    """
+    Cleaned candidate answers for one note type, deduplicated
+    case-insensitively and indexed. Answers are added one at a time and
+    capped at `limit` as they come: past it, a seeded reservoir sample is
+    kept, so a pool never holds more than `limit` answers whatever the deck
+    size. Distractors are the answers most similar to a card's own answer;
+    random ones only make up the numbers.
+    """
+
+    def __init__(self, answers: Iterable[str] = (), limit: Optional[int] = POOL_LIMIT,
+                 seed: int = DEFAULT_SEED):
+        self.limit = limit
+        self.answers: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._rng = random.Random(seed)
+        # Answers offered that were not already in the pool
+        self._offered = 0
+        self._engine = None
+        for answer in answers:
+            self.add(answer)
+
+    def add(self, answer: str):
+        """Offer an answer to the pool; duplicates of kept answers are ignored."""
+        key = answer.lower()
+        if not answer or key in self._index:
+            return
+        self._offered += 1
+        self._engine = None
+        if not self.limit or len(self.answers) < self.limit:
+            self._index[key] = len(self.answers)
+            self.answers.append(answer)
+            return
+        # Reservoir sampling: the new answer replaces a kept one with probability limit / offered
+        slot = self._rng.randrange(self._offered)
+        if slot < self.limit:
+            del self._index[self.answers[slot].lower()]
+            self.answers[slot] = answer
+            self._index[key] = slot
+
+    def __len__(self):
+        return len(self.answers)
+
+    def sample(self, rng: random.Random, k: int, exclude: str = "") -> List[str]:
+        """Up to k distinct answers, never `exclude` (compared case-insensitively)."""
+        excluded = self._index.get(exclude.lower())
+        available = len(self.answers) - (excluded is not None)
+        picks = rng.sample(range(len(self.answers)), min(k + (excluded is not None), len(self.answers)))
+        return [self.answers[i] for i in picks if i != excluded][:min(k, available)]
+
+    def nearest(self, answers: List[str], k: int) -> List[List[str]]:
+        """For each answer, up to k other pool answers most similar to it, in one batch."""
+        if self._engine is None:
+            self._engine = DistractorEngine(self.answers)
+        return self._engine.nearest(answers, k)
+
+    def distractors(self, rng: random.Random, k: int, answer: str, similar: List[str]) -> List[str]:
+        """`similar` topped up with random pool answers when it has fewer than k."""
+        wrong = similar[:k]
+        if len(wrong) < k:
+            taken = {a.lower() for a in wrong}
+            extra = [a for a in self.sample(rng, k + len(wrong), exclude=answer) if a.lower() not in taken]
+            wrong += extra[:k - len(wrong)]
+        return wrong
+
+
+def new_distractor_pools() -> Dict[str, DistractorPool]:
+    """Empty distractor pools by note type."""
+    # Basic++ cards have always drawn from the cloze answers too
+    return {"Cloze+": DistractorPool(), "AWS services": DistractorPool(), "Code howto": DistractorPool()}
+
+
+def add_to_distractor_pools(pools: Dict[str, DistractorPool], card: dict):
+    """Offer a card's cloze answers, or its back, to the pool of its note type."""
+    for answer in cloze_answers_of(card):
+        if usable_cloze_answer(answer):
+            pools["Cloze+"].add(answer)
+    if card["type"] in ("AWS services", "Code howto"):
+        pools[card["type"]].add(clean_html_text(card["back"]))
+
+
+def build_distractor_pools(cards: Iterable[dict]) -> Dict[str, DistractorPool]:
+    """Distractor pools by note type, built once per import; cards are read once."""
+    pools = new_distractor_pools()
+    for card in cards:
+        add_to_distractor_pools(pools, card)
+    return pools
+
+
+def usable_cloze_answer(answer: str) -> bool:
+    """Whether a cloze answer is fit to be a distractor: not very short or long."""
+    return 2 < len(answer) < 100
+
+
+def card_rng(seed: int, card: dict) -> random.Random:
+    """
+    Random source for one card. Keyed by the card's guid, so a card's
+    options do not change when other cards are added or removed.
+    """
+    return random.Random(f"{seed}:{card['guid']}")
+
+
+def card_stem(card: dict) -> Optional[dict]:
+    """
+    Question text, correct answer and explanation for a card, plus the pool
+    its distractors come from and what to offer when the pool runs short.
+    None for cards that do not make a question.
+    """
+    note_type = card["type"]
+    front = card["front"]
+    back = card["back"]
+
+    if note_type == "Basic++":
+        question_text = clean_html_text(front)
+        correct_answer = clean_html_text(back)
+
+        # Skip if answer is too long (probably not suitable for MCQ)
+        if not question_text or not correct_answer or len(correct_answer) > 200:
+            return None
+
+        return {
+            "question": question_text,
+            "answer": correct_answer,
+            "explanation": f"The correct answer is: {correct_answer}",
+            "domain": detect_domain(question_text + " " + correct_answer),
+            "pool": "Cloze+",
+            "fallback": ["None of the above"],
+        }
+
+    if note_type == "AWS services":
+        # Service name -> description
+        service_name = clean_html_text(front)
+        description = clean_html_text(back)
+        if not service_name or not description:
+            return None
+
+        return {
+            "question": f"What is AWS {service_name}?",
+            "answer": description,
+            "explanation": f"AWS {service_name}: {description}",
+            "domain": detect_domain(service_name + " " + description),
+            "pool": "AWS services",
+            "fallback": ["A deprecated AWS service"],
+        }
+
+    if note_type == "Cloze+":
+        # Fill-in-blank on the first cloze
+        cloze_nums, _ = parse_cloze(front)
+        if not cloze_nums:
+            return None
+        question_text, correct = generate_cloze_question(front, cloze_nums[0])
+        if not correct:
+            return None
+
+        correct_answer = correct[0] if len(correct) == 1 else " / ".join(correct)
+        return {
+            "question": clean_html_text(question_text),
+            "answer": correct_answer,
+            "explanation": f"The correct answer is: {correct_answer}",
+            "domain": detect_domain(front),
+            "pool": "Cloze+",
+            "fallback": ["None of the above"],
+        }
+
+    if note_type == "Code howto":
+        # CLI commands: the other cards' commands are the distractors
+        action = clean_html_text(front)
+        command = clean_html_text(back)
+        if not action or not command:
+            return None
+
+        return {
+            "question": f"Which AWS CLI command would you use to {action}?",
+            "answer": command,
+            "explanation": f"The correct command is: {command}",
+            "domain": "1",  # CLI is typically Domain 1
+            "pool": "Code howto",
+            "fallback": [f"aws help {action.split()[0]}", "aws configure", "aws sts get-caller-identity"],
+        }
+
+    return None
+
+
+def note_card(guid: str, note_type: str, front: str, back: str) -> Optional[dict]:
+    """Card dict for a note, or None for note types never imported."""
+    # Skip image occlusion cards
+    if note_type == "Image Occlusion Enhanced":
         return None
+    return {"guid": guid, "type": note_type, "front": front, "back": back}
 
-    correct_answer = correct[0] if len(correct) == 1 else " / ".join(correct)
 
-    # Generate wrong answers from pool
-    wrong_answers = [a for a in all_answers if a.lower() != correct_answer.lower()]
-    random.shuffle(wrong_answers)
-    wrong_answers = wrong_answers[:3]
-
-    # If not enough wrong answers, generate generic ones
-    while len(wrong_answers) < 3:
-        wrong_answers.append(f"None of the above")
-        break
-
-    # Shuffle options
-    options = [correct_answer] + wrong_answers
-    random.shuffle(options)
-
-    correct_letter = chr(65 + options.index(correct_answer))
-
-    formatted_options = [f"{chr(65+i)}. {opt}" for i, opt in enumerate(options)]
-
-    return {
-        "question": clean_html_text(question_text),
-        "options": formatted_options,
-        "correct": correct_letter,
-        "explanation": f"The correct answer is: {correct_answer}"
-    }
+def cloze_answers_of(card: dict) -> List[str]:
+    """Answers of every cloze deletion of a Cloze+ card."""
+    if card["type"] != "Cloze+":
+        return []
+    _, answers = parse_cloze(card["front"])
+    return [answer for ans_list in answers.values() for answer in ans_list]
 
 
 def parse_anki_file(filepath: str):
@@ -151,194 +297,207 @@ def parse_anki_file(filepath: str):
     all_cloze_answers = []  # Collect all answers for generating MCQ options
 
     with open(filepath, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-
-    # Skip metadata lines
-    data_lines = [l for l in lines if not l.startswith('#')]
-
-    for line in data_lines:
-        fields = line.strip().split('\t')
-        if len(fields) < 5:
-            continue
-
-        guid = fields[0]
-        note_type = fields[1]
-        deck = fields[2]
-        front = fields[3]
-        back = fields[4] if len(fields) > 4 else ""
-
-        # Skip image occlusion cards
-        if note_type == "Image Occlusion Enhanced":
-            continue
-
-        # Collect cloze answers
-        if note_type == "Cloze+":
-            _, answers = parse_cloze(front)
-            for ans_list in answers.values():
-                all_cloze_answers.extend(ans_list)
-
-        cards.append({
-            "guid": guid,
-            "type": note_type,
-            "front": front,
-            "back": back
-        })
-
-    return cards, list(set(all_cloze_answers))
-
-
-def generate_questions_from_cards(cards: list, all_answers: list):
-    """Generate exam questions from Anki cards."""
-    questions = []
-
-    for card in cards:
-        note_type = card["type"]
-        front = card["front"]
-        back = card["back"]
-
-        if note_type == "Basic++":
-            # Convert to MCQ
-            question_text = clean_html_text(front)
-            correct_answer = clean_html_text(back)
-
-            if not question_text or not correct_answer:
-                continue
-
-            # Skip if answer is too long (probably not suitable for MCQ)
-            if len(correct_answer) > 200:
-                continue
-
-            # Generate wrong answers
-            wrong = random.sample(all_answers, min(3, len(all_answers)))
-            wrong = [w for w in wrong if w.lower() != correct_answer.lower()][:3]
-
-            while len(wrong) < 3:
-                wrong.append("None of the above")
-                break
-
-            options = [correct_answer] + wrong
-            random.shuffle(options)
-            correct_letter = chr(65 + options.index(correct_answer))
-
-            questions.append({
-                "question": question_text,
-                "options": [f"{chr(65+i)}. {opt}" for i, opt in enumerate(options)],
-                "correct": correct_letter,
-                "explanation": f"The correct answer is: {correct_answer}",
-                "domain": detect_domain(question_text + " " + correct_answer)
-            })
-
-        elif note_type == "AWS services":
-            # Service name -> description
-            service_name = clean_html_text(front)
-            description = clean_html_text(back)
-
-            if not service_name or not description:
+        for line in f:
+            # Skip metadata lines
+            if line.startswith('#'):
                 continue
 
-            question_text = f"What is AWS {service_name}?"
-
-            # Get other service descriptions as wrong answers
-            other_services = [c for c in cards if c["type"] == "AWS services" and c["front"] != front]
-            wrong = [clean_html_text(s["back"]) for s in random.sample(other_services, min(3, len(other_services)))]
-
-            while len(wrong) < 3:
-                wrong.append("A deprecated AWS service")
-                break
-
-            options = [description] + wrong[:3]
-            random.shuffle(options)
-            correct_letter = chr(65 + options.index(description))
-
-            questions.append({
-                "question": question_text,
-                "options": [f"{chr(65+i)}. {opt}" for i, opt in enumerate(options)],
-                "correct": correct_letter,
-                "explanation": f"AWS {service_name}: {description}",
-                "domain": detect_domain(service_name + " " + description)
-            })
-
-        elif note_type == "Cloze+":
-            # Generate fill-in-blank MCQ
-            mcq = generate_mcq_from_cloze(front, all_answers)
-            if mcq:
-                questions.append({
-                    "question": mcq["question"],
-                    "options": mcq["options"],
-                    "correct": mcq["correct"],
-                    "explanation": mcq["explanation"],
-                    "domain": detect_domain(front)
-                })
-
-        elif note_type == "Code howto":
-            # Convert CLI commands to questions
-            action = clean_html_text(front)
-            command = clean_html_text(back)
-
-            if not action or not command:
+            fields = line.strip().split('\t')
+            if len(fields) < 5:
                 continue
 
-            question_text = f"Which AWS CLI command would you use to {action}?"
-
-            questions.append({
-                "question": question_text,
-                "options": [
-                    f"A. {command}",
-                    "B. aws help " + action.split()[0] if action.split() else "aws help",
-                    "C. aws configure",
-                    "D. aws sts get-caller-identity"
-                ],
-                "correct": "A",
-                "explanation": f"The correct command is: {command}",
-                "domain": "1"  # CLI is typically Domain 1
-            })
+            card = note_card(fields[0], fields[1], fields[3], fields[4])
+            if card:
+                all_cloze_answers.extend(cloze_answers_of(card))
+                cards.append(card)
+
+    # Deduplicated in first-seen order, so seeded output is reproducible
+    return cards, list(dict.fromkeys(all_cloze_answers))
+
+
+def generate_questions(cards: Iterable[dict], pools: Dict[str, DistractorPool],
+                       seed: int = DEFAULT_SEED) -> Iterator[dict]:
+    """
+    Generate exam questions from Anki cards with distractors from prebuilt
+    pools. Each pool's nearest answers are looked up for all of its cards in
+    one batch, then questions are built one at a time; cards can be fed in
+    chunks without changing the result.
+    """
+    stems = [(card, stem) for card in cards for stem in [card_stem(card)] if stem]
+
+    similar: List[List[str]] = [[] for _ in stems]
+    for name, pool in pools.items():
+        positions = [i for i, (_, stem) in enumerate(stems) if stem["pool"] == name]
+        if positions and len(pool):
+            for i, found in zip(positions, pool.nearest([stems[i][1]["answer"] for i in positions], 3)):
+                similar[i] = found
+
+    for (card, stem), found in zip(stems, similar):
+        rng = card_rng(seed, card)
+        correct_answer = stem["answer"]
+
+        wrong = pools[stem["pool"]].distractors(rng, 3, correct_answer, found)
+        taken = {a.lower() for a in wrong + [correct_answer]}
+        wrong += [a for a in stem["fallback"] if a.lower() not in taken][:3 - len(wrong)]
+
+        options = [correct_answer] + wrong
+        rng.shuffle(options)
+
+        yield {
+            "question": stem["question"],
+            "options": [f"{chr(65+i)}. {opt}" for i, opt in enumerate(options)],
+            "correct": chr(65 + options.index(correct_answer)),
+            "explanation": stem["explanation"],
+            "domain": stem["domain"]
+        }
+
+
+def generate_questions_from_cards(cards: list, seed: int = DEFAULT_SEED) -> Iterator[dict]:
+    """Generate exam questions from Anki cards, their pools built from the cards themselves."""
+    return generate_questions(cards, build_distractor_pools(cards), seed)
+
+
+@contextmanager
+def open_anki_package(path: str) -> Iterator[sqlite3.Connection]:
+    """
+    Read-only connection to the collection inside an .apkg package. The
+    collection is streamed out of the zip into a temporary file, since
+    SQLite cannot read it in place; packages from newer Anki versions
+    with only a zstd-compressed collection.anki21b are refused.
+    """
+    with zipfile.ZipFile(path) as package:
+        names = set(package.namelist())
+        member = next((name for name in APKG_COLLECTIONS if name in names), None)
+        if member is None:
+            if "collection.anki21b" in names:
+                raise ValueError("Collection is zstd-compressed (collection.anki21b); "
+                                 "export the deck with \"Support older Anki versions\" checked")
+            raise ValueError("No Anki collection in package")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            collection = os.path.join(tmp_dir, "collection.anki2")
+            with package.open(member) as source, open(collection, 'wb') as target:
+                shutil.copyfileobj(source, target, 1 << 20)
+
+            # as_uri escapes '?', '#' and '%' and handles Windows drive paths
+            conn = sqlite3.connect(f"{pathlib.Path(collection).as_uri()}?mode=ro", uri=True)
+            try:
+                yield conn
+            finally:
+                conn.close()
+
+
+def note_type_names(conn: sqlite3.Connection) -> Dict[int, str]:
+    """Note type names by id, from the notetypes table or, in older collections, col.models."""
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if "notetypes" in tables:
+        return {row[0]: row[1] for row in conn.execute("SELECT id, name FROM notetypes")}
+    models = json.loads(conn.execute("SELECT models FROM col").fetchone()[0] or "{}")
+    return {int(model_id): model["name"] for model_id, model in models.items()}
+
+
+def iter_package_cards(conn: sqlite3.Connection, chunk_size: int = NOTE_CHUNK) -> Iterator[List[dict]]:
+    """
+    Cards of a collection's notes in chunks of up to chunk_size notes, in
+    note id order. Front and back are the note's first two fields, as in
+    Anki's text export.
+    """
+    names = note_type_names(conn)
+    cursor = conn.execute("SELECT guid, mid, flds FROM notes ORDER BY id")
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        chunk = []
+        for guid, model_id, flds in rows:
+            fields = flds.split("\x1f")
+            card = note_card(guid, names.get(model_id, ""), fields[0], fields[1] if len(fields) > 1 else "")
+            if card:
+                chunk.append(card)
+        yield chunk
+
+
+class AnkiNotesAdapter(SourceAdapter):
+    """
+    Anki notes exported as tab-separated text. Distractor pools span the
+    whole file, so parse reads all cards and yields the generated question
+    dicts.
+    """
+    name = "Anki notes"
+    extensions = ('.txt',)
+    parser_version = PARSER_VERSION
+
+    def accepts(self, path: str) -> bool:
+        # Anki's text export starts with its "#separator:" header
+        if not self.claims(path):
+            return False
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.readline().startswith('#separator:')
+
+    def parse(self, path: str) -> Iterator[dict]:
+        cards, _ = parse_anki_file(path)
+        yield from generate_questions_from_cards(cards)
+
+    def normalize(self, record: dict) -> Optional[Question]:
+        return Question(
+            id=0,
+            exam_type="SAA-C03",
+            domain="",
+            difficulty=2,  # Medium by default
+            question_text=record["question"],
+            options=record["options"],
+            correct_answer=record["correct"],
+            explanation=record["explanation"],
+            reference="Source: Anki Notes"
+        )
 
-    return questions
+    def classify(self, record: dict, question: Question) -> str:
+        return record["domain"]
 
 
-def import_anki_notes(filepath: str, db_path: str):
-    """Import Anki notes into the database as exam questions."""
-    print(f"Parsing Anki file: {filepath}")
+class AnkiPackageAdapter(AnkiNotesAdapter):
+    """
+    Anki .apkg packages, read directly. Notes are streamed out of the
+    collection in chunks twice: once to fill the distractor pools and once
+    to generate questions, so only the pools (each capped at POOL_LIMIT
+    answers) and one chunk of notes are held at a time.
+    """
+    name = "Anki package"
+    extensions = ('.apkg',)
 
-    cards, all_answers = parse_anki_file(filepath)
-    print(f"Found {len(cards)} cards")
+    def accepts(self, path: str) -> bool:
+        return self.claims(path)
 
-    # Filter out very short answers
-    all_answers = [a for a in all_answers if len(a) > 2 and len(a) < 100]
-    print(f"Collected {len(all_answers)} unique answers for MCQ generation")
+    def parse(self, path: str) -> Iterator[dict]:
+        with open_anki_package(path) as conn:
+            pools = new_distractor_pools()
+            for chunk in iter_package_cards(conn):
+                for card in chunk:
+                    add_to_distractor_pools(pools, card)
 
-    questions = generate_questions_from_cards(cards, all_answers)
-    print(f"Generated {len(questions)} questions")
+            for chunk in iter_package_cards(conn):
+                yield from generate_questions(chunk, pools)
 
-    # Import to database
-    db = DatabaseManager(db_path)
-    imported = 0
 
-    for q in questions:
-        question = Question(
-            id=0,
-            exam_type="SAA-C03",
-            domain=q["domain"],
-            difficulty=2,  # Medium by default
-            question_text=q["question"],
-            options=q["options"],
-            correct_answer=q["correct"],
-            explanation=q["explanation"],
-            reference="Source: Anki Notes"
-        )
-        db.add_question(question)
-        imported += 1
-
-    print(f"\nImported {imported} questions from Anki notes")
-    print(f"Total questions in database: {db.get_question_count('SAA-C03')}")
+def import_anki_notes(filepath: str, db_path: str) -> int:
+    """
+    Import Anki notes into the database as exam questions, through the
+    import pipeline (see importers.pipeline). Skipped when the file is
+    unchanged since the last import; when it is gone, the questions only it
+    produced are retired. Returns the number of questions imported.
+    """
+    return ImportPipeline(db_path, [AnkiNotesAdapter()]).run([filepath]).imported
 
 
 if __name__ == "__main__":
+    import sys
+
     script_dir = os.path.dirname(os.path.abspath(__file__))
     anki_file = os.path.join(script_dir, "quizz_add_sources", "AWS Solutions Architect Associate.txt")
     db_path = os.path.join(script_dir, "data", "questions.db")
 
-    if os.path.exists(anki_file):
-        import_anki_notes(anki_file, db_path)
-    else:
+    if not os.path.exists(anki_file):
         print(f"Anki file not found: {anki_file}")
+        sys.exit(1)
+
+    import_anki_notes(anki_file, db_path)
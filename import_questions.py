@@ -0,0 +1,50 @@
+"""
+Import questions from any supported source into the database.
+
+Files and directories given on the command line (quizz_add_sources/ by
+default) are matched to a source adapter: saved HTML quiz pages, Anki
+text exports and .apkg packages, and seed question JSON. Every source goes
+through the same import pipeline (see importers.pipeline); --dry-run
+parses, normalizes, classifies and dedupes without writing and reports
+throughput.
+"""
+import argparse
+import os
+
+from import_anki import AnkiNotesAdapter, AnkiPackageAdapter
+from import_quizzes import QuizHtmlAdapter
+from importers import ImportPipeline, SeedJsonAdapter
+from importers.pipeline import BATCH_SIZE
+
+ADAPTERS = [QuizHtmlAdapter(), AnkiNotesAdapter(), AnkiPackageAdapter(), SeedJsonAdapter()]
+
+
+def main():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(
+        description="Import questions from quiz pages, Anki exports and packages, and seed JSON."
+    )
+    parser.add_argument('paths', nargs='*', default=[os.path.join(script_dir, "quizz_add_sources")],
+                        help="Source files or directories (default: quizz_add_sources/)")
+    parser.add_argument('--db', default=os.path.join(script_dir, "data", "questions.db"), help="Database path")
+    parser.add_argument('--dry-run', action='store_true', help="Run every stage but insert, and write nothing")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Questions per insert batch")
+    parser.add_argument('--workers', type=int, default=None, help="Processes parsing HTML quiz pages")
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help="Files parsed ahead of the writer (default: twice the workers)")
+    args = parser.parse_args()
+
+    print(f"Sources: {', '.join(args.paths)}")
+    if not args.dry_run:
+        print(f"Database path: {args.db}")
+    print()
+
+    pipeline = ImportPipeline(args.db, ADAPTERS, dry_run=args.dry_run, batch_size=args.batch_size,
+                              workers=args.workers, max_pending=args.max_pending)
+    report = pipeline.run(args.paths)
+    raise SystemExit(1 if report.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
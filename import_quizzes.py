@@ -4,73 +4,22 @@ Script to import quiz questions from HTML files into the database.
 import os
 import re
 import json
-import html
-from database.db_manager import DatabaseManager
+import mmap
+from typing import Iterator, Optional
 from database.models import Question
-
-# Mapping quiz titles to domains
-DOMAIN_MAPPING = {
-    # Domain 1: Design Secure Architectures (30%)
-    "iam": "1",
-    "security": "1",
-    "encryption": "1",
-    "cli": "1",
-
-    # Domain 2: Design Resilient Architectures (26%)
-    "high availability": "2",
-    "scalability": "2",
-    "disaster recovery": "2",
-    "migration": "2",
-    "rds": "2",
-    "aurora": "2",
-    "elasticache": "2",
-    "route 53": "2",
-
-    # Domain 3: Design High-Performing Architectures (24%)
-    "ec2": "3",
-    "s3": "3",
-    "cloudfront": "3",
-    "storage": "3",
-    "databases": "3",
-    "containers": "3",
-    "serverless": "3",
-    "lambda": "3",
-    "messaging": "3",
-    "integration": "3",
-    "data management": "3",
-    "global accelerator": "3",
-
-    # Domain 4: Design Cost-Optimized Architectures (20%)
-    "solutions architecture": "4",
-    "whitepaper": "4",
-    "architectures": "4",
-
-    # Analytics & ML - Domain 3
-    "analytics": "3",
-    "machine learning": "3",
-
-    # Monitoring - Domain 2
-    "monitoring": "2",
-    "auditing": "2",
-
-    # VPC - Domain 1
-    "vpc": "1",
-
-    # Other services - Mixed
-    "other services": "3",
-}
+from importers.pipeline import ImportPipeline, SourceAdapter
+from utils.classifier import classifier
+from utils.html_text import html_to_text
 
 
 def get_domain_from_title(title: str) -> str:
     """Determine domain based on quiz title."""
-    title_lower = title.lower()
-
-    for keyword, domain in DOMAIN_MAPPING.items():
-        if keyword in title_lower:
-            return domain
+    domain = classifier.classify(title).title_domain
+    if domain:
+        return domain
 
     # Default to domain 3 (High-Performing) for practice tests
-    if "practice test" in title_lower:
+    if "practice test" in title.lower():
         return "3"
 
     return "2"  # Default domain
@@ -101,158 +50,180 @@ def get_difficulty_from_title(title: str) -> int:
 
 
 def clean_html(text: str) -> str:
-    """Remove HTML tags and decode entities."""
-    if not text:
-        return ""
-
-    # Decode HTML entities
-    text = html.unescape(text)
-
-    # Remove HTML tags but keep content
-    text = re.sub(r'<[^>]+>', '', text)
+    """Markdown-flavoured text of an HTML fragment; see utils.html_text."""
+    return html_to_text(text)
 
-    # Clean up whitespace
-    text = ' '.join(text.split())
 
-    return text.strip()
+# Bump when parsing changes, so the next import re-reads unchanged files
+PARSER_VERSION = 3
 
+# `quizData = ` followed by the start of a JSON object; uses such as
+# `quizData.questions` elsewhere in the page do not match
+QUIZ_DATA_PATTERN = re.compile(r'\bquizData\s*=\s*(?=\{)')
+QUIZ_DATA_BYTES_PATTERN = re.compile(rb'\bquizData\s*=\s*(?=\{)')
+SCRIPT_END = b'</script'
 
-def extract_quiz_data(html_content: str) -> dict:
-    """Extract quizData JSON from HTML file."""
-    # Look for the quizData assignment
-    pattern = r'const quizData = ({.*?});'
-    match = re.search(pattern, html_content, re.DOTALL)
-
-    if not match:
-        return None
+_json_decoder = json.JSONDecoder()
 
-    json_str = match.group(1)
-
-    try:
-        return json.loads(json_str)
-    except json.JSONDecodeError as e:
-        print(f"JSON parse error: {e}")
-        return None
 
+def iter_quiz_data(html_content: str):
+    """
+    Yield every quizData object assigned in the page, in order.
 
-def parse_questions(quiz_data: dict, source_file: str) -> list:
-    """Parse questions from quiz data."""
-    questions = []
-
-    quiz_title = quiz_data.get('quiz_title', 'Unknown Quiz')
-    domain = get_domain_from_title(quiz_title)
-    difficulty = get_difficulty_from_title(quiz_title)
-
-    for q in quiz_data.get('questions', []):
-        prompt = q.get('prompt', {})
-
-        # Get question text
-        question_text = clean_html(prompt.get('question', ''))
-        if not question_text:
-            continue
-
-        # Get answers
-        raw_answers = prompt.get('answers', [])
-        options = []
-        for i, ans in enumerate(raw_answers):
-            letter = chr(65 + i)  # A, B, C, D...
-            clean_ans = clean_html(ans)
-            options.append(f"{letter}. {clean_ans}")
-
-        if not options:
-            continue
+    Each block is decoded with JSONDecoder.raw_decode starting at its
+    opening brace, so exactly one JSON value is consumed and '};' inside
+    a string cannot end it early.
+    """
+    pos = 0
+    while True:
+        match = QUIZ_DATA_PATTERN.search(html_content, pos)
+        if not match:
+            return
 
-        # Get correct answer
-        correct_responses = q.get('correct_response', [])
-        if correct_responses:
-            correct_answer = correct_responses[0].upper()
-        else:
+        try:
+            quiz_data, pos = _json_decoder.raw_decode(html_content, match.end())
+        except json.JSONDecodeError as e:
+            print(f"JSON parse error: {e}")
+            pos = match.end()
             continue
 
-        # Get explanation
-        explanation = ""
-        feedbacks = prompt.get('feedbacks', [])
-
-        # Try to get the explanation for the correct answer
-        if feedbacks:
-            correct_idx = ord(correct_answer) - ord('A')
-            if correct_idx < len(feedbacks) and feedbacks[correct_idx]:
-                explanation = clean_html(feedbacks[correct_idx])
-
-        # Also check for general explanation
-        if not explanation and prompt.get('explanation'):
-            explanation = clean_html(prompt.get('explanation'))
-
-        # If still no explanation, combine all feedbacks
-        if not explanation and feedbacks:
-            all_feedbacks = [clean_html(f) for f in feedbacks if f]
-            if all_feedbacks:
-                explanation = " | ".join(all_feedbacks)
-
-        question = Question(
-            id=0,
-            exam_type="SAA-C03",
-            domain=domain,
-            difficulty=difficulty,
-            question_text=question_text,
-            options=options,
-            correct_answer=correct_answer,
-            explanation=explanation or "No explanation provided.",
-            reference=f"Source: {quiz_title}"
-        )
-
-        questions.append(question)
-
-    return questions
-
-
-def import_html_quizzes(source_dir: str, db_path: str):
-    """Import all HTML quiz files from a directory."""
-    db = DatabaseManager(db_path)
-
-    # Get all HTML files
-    html_files = []
-    for filename in os.listdir(source_dir):
-        if filename.endswith('.html'):
-            html_files.append(os.path.join(source_dir, filename))
-
-    print(f"Found {len(html_files)} HTML files to process")
-
-    total_imported = 0
+        yield quiz_data
 
-    for filepath in html_files:
-        filename = os.path.basename(filepath)
-        print(f"\nProcessing: {filename}")
 
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-
-            quiz_data = extract_quiz_data(html_content)
+def extract_quiz_data(html_content: str) -> dict:
+    """Extract the first quizData JSON object from HTML content."""
+    return next(iter_quiz_data(html_content), None)
+
+
+def read_quiz_blocks(filepath: str) -> list:
+    """
+    All quizData objects in an HTML file. The file is memory-mapped and
+    searched in place; only each block's <script> element, from the
+    quizData marker to the closing </script> (which JSON inside a script
+    cannot contain), is copied out and decoded.
+    """
+    blocks = []
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = 0
+            while True:
+                match = QUIZ_DATA_BYTES_PATTERN.search(mm, pos)
+                if not match:
+                    break
+                end = mm.find(SCRIPT_END, match.end())
+                if end < 0:
+                    end = len(mm)
+                blocks.extend(iter_quiz_data(mm[match.start():end].decode('utf-8')))
+                pos = end
+
+    return blocks
+
+
+def quiz_question(q: dict, domain: str, difficulty: int, quiz_title: str) -> Optional[Question]:
+    """Question for one entry of a quiz's questions, or None if it is incomplete."""
+    prompt = q.get('prompt', {})
+
+    # Get question text
+    question_text = clean_html(prompt.get('question', ''))
+    if not question_text:
+        return None
 
-            if not quiz_data:
-                print(f"  Could not extract quiz data from {filename}")
-                continue
+    # Get answers
+    raw_answers = prompt.get('answers', [])
+    options = []
+    for i, ans in enumerate(raw_answers):
+        letter = chr(65 + i)  # A, B, C, D...
+        clean_ans = clean_html(ans)
+        options.append(f"{letter}. {clean_ans}")
 
-            quiz_title = quiz_data.get('quiz_title', 'Unknown')
-            print(f"  Quiz: {quiz_title}")
+    if not options:
+        return None
 
-            questions = parse_questions(quiz_data, filename)
-            print(f"  Found {len(questions)} questions")
+    # Get correct answer
+    correct_responses = q.get('correct_response', [])
+    if correct_responses:
+        correct_answer = correct_responses[0].upper()
+    else:
+        return None
 
-            # Import questions
-            for q in questions:
-                db.add_question(q)
+    # Get explanation
+    explanation = ""
+    feedbacks = prompt.get('feedbacks', [])
+
+    # Try to get the explanation for the correct answer
+    if feedbacks:
+        correct_idx = ord(correct_answer) - ord('A')
+        if correct_idx < len(feedbacks) and feedbacks[correct_idx]:
+            explanation = clean_html(feedbacks[correct_idx])
+
+    # Also check for general explanation
+    if not explanation and prompt.get('explanation'):
+        explanation = clean_html(prompt.get('explanation'))
+
+    # If still no explanation, combine all feedbacks
+    if not explanation and feedbacks:
+        all_feedbacks = [clean_html(f) for f in feedbacks if f]
+        if all_feedbacks:
+            explanation = " | ".join(all_feedbacks)
+
+    return Question(
+        id=0,
+        exam_type="SAA-C03",
+        domain=domain,
+        difficulty=difficulty,
+        question_text=question_text,
+        options=options,
+        correct_answer=correct_answer,
+        explanation=explanation or "No explanation provided.",
+        reference=f"Source: {quiz_title}"
+    )
 
-            total_imported += len(questions)
-            print(f"  Imported {len(questions)} questions")
 
-        except Exception as e:
-            print(f"  Error processing {filename}: {e}")
+def parse_questions(quiz_data: dict, source_file: str) -> list:
+    """Parse questions from quiz data."""
+    quiz_title = quiz_data.get('quiz_title', 'Unknown Quiz')
+    domain = get_domain_from_title(quiz_title)
+    difficulty = get_difficulty_from_title(quiz_title)
 
-    print(f"\n{'='*50}")
-    print(f"Total questions imported: {total_imported}")
-    print(f"Total questions in database: {db.get_question_count('SAA-C03')}")
+    questions = (quiz_question(q, domain, difficulty, quiz_title) for q in quiz_data.get('questions', []))
+    return [question for question in questions if question]
+
+
+class QuizHtmlAdapter(SourceAdapter):
+    """Saved HTML quiz pages; records are (quiz title, question entry) pairs."""
+    name = "HTML quiz"
+    extensions = ('.html',)
+    parser_version = PARSER_VERSION
+    parallel = True
+
+    def parse(self, path: str) -> Iterator[tuple]:
+        blocks = read_quiz_blocks(path)
+        if not blocks:
+            raise ValueError("Could not extract quiz data")
+        for quiz_data in blocks:
+            quiz_title = quiz_data.get('quiz_title', 'Unknown Quiz')
+            for q in quiz_data.get('questions', []):
+                yield quiz_title, q
+
+    def normalize(self, record: tuple) -> Optional[Question]:
+        quiz_title, q = record
+        return quiz_question(q, "", get_difficulty_from_title(quiz_title), quiz_title)
+
+    def classify(self, record: tuple, question: Question) -> str:
+        return get_domain_from_title(record[0])
+
+
+def import_html_quizzes(source_dir: str, db_path: str, workers: Optional[int] = None) -> int:
+    """
+    Import all HTML quiz files from a directory through the import pipeline
+    (see importers.pipeline). Unchanged files are skipped, questions already
+    stored are not duplicated and those of changed or removed files are
+    retired. Returns the number of questions imported.
+    """
+    pipeline = ImportPipeline(db_path, [QuizHtmlAdapter()], workers=workers)
+    return pipeline.run([source_dir]).imported
 
 
 if __name__ == "__main__":
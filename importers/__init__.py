@@ -0,0 +1,4 @@
+from .pipeline import ImportPipeline, ImportReport, SourceAdapter, StageStats
+from .seed_json import SeedJsonAdapter
+
+__all__ = ['ImportPipeline', 'ImportReport', 'SourceAdapter', 'StageStats', 'SeedJsonAdapter']
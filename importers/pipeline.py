@@ -0,0 +1,459 @@
+"""
+Staged import pipeline shared by every question source.
+
+A SourceAdapter knows one kind of source file: which files are its own,
+how to parse one into raw records and how to turn a record into a
+Question. ImportPipeline runs every source through the same chain of
+generator stages:
+
+    parse -> normalize -> classify -> dedupe -> insert
+
+Each stage pulls one item at a time from the one before it, so nothing
+runs ahead of the database writer: questions are written in batches of
+batch_size, each in its own short transaction taken once the batch is
+ready, and the source's manifest entry in a last one (see
+DatabaseManager.import_source). Adapters marked parallel have their files
+parsed and normalized on a process pool, with at most max_pending files
+in flight ahead of the writer. Every stage counts what it received and
+passed on and the time spent in it; dry_run runs the same stages without
+touching the database and reports throughput.
+"""
+import hashlib
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from database.db_manager import DatabaseManager
+from database.models import Question
+from utils.classifier import classifier
+
+STAGES = ('parse', 'normalize', 'classify', 'dedupe', 'insert')
+
+# Questions per insert batch
+BATCH_SIZE = 500
+
+# Manifest keys of sources inside the checkout are relative to it, so moving
+# or re-cloning the checkout does not make every file look new
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def source_key(path: str) -> str:
+    """Manifest key of a source file: its path relative to the checkout, or absolute outside it."""
+    path = os.path.abspath(path)
+    try:
+        relative = os.path.relpath(path, PROJECT_ROOT)
+    except ValueError:
+        # Another drive on Windows
+        return path
+    if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+        return path
+    return relative.replace(os.sep, '/')
+
+
+def source_path(key: str) -> str:
+    """Path of the source file a manifest key stands for."""
+    return key if os.path.isabs(key) else os.path.join(PROJECT_ROOT, *key.split('/'))
+
+
+def file_digest(filepath: str) -> str:
+    """SHA-256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_unchanged(entry: Optional[dict], size: int, mtime: float, parser_version: int,
+                     digest: Optional[str] = None) -> bool:
+    """
+    Whether a manifest entry still describes a source file. Without a digest
+    only size and mtime are compared, which avoids reading the file at all.
+    """
+    if not entry or entry['parser_version'] != parser_version:
+        return False
+    if digest is not None:
+        return entry['digest'] == digest
+    return entry['size'] == size and entry['mtime'] == mtime
+
+
+class SourceAdapter(ABC):
+    """
+    One kind of question source. Subclasses set name, extensions and
+    parser_version (bumped whenever parsing output changes, so unchanged
+    files are re-imported) and implement parse and normalize; a subclass
+    missing either cannot be instantiated.
+    """
+    name = ""
+    extensions: Tuple[str, ...] = ()
+    parser_version = 1
+    # Parse and normalize files on the worker pool; records and questions
+    # must then be picklable
+    parallel = False
+
+    def claims(self, path: str) -> bool:
+        """Whether a path, present or not, has one of this adapter's extensions."""
+        return path.lower().endswith(self.extensions)
+
+    def accepts(self, path: str) -> bool:
+        """Whether an existing file is a source for this adapter; override to sniff content."""
+        return self.claims(path)
+
+    @abstractmethod
+    def parse(self, path: str) -> Iterator[Any]:
+        """Raw records from a source file, one per question."""
+
+    @abstractmethod
+    def normalize(self, record: Any) -> Optional[Question]:
+        """Question for a record, its text cleaned; None to drop the record."""
+
+    def classify(self, record: Any, question: Question) -> str:
+        """Domain of a question; by default the keyword domain of its text."""
+        return question.domain or classifier.classify(
+            question.question_text + ' ' + ' '.join(question.options)
+        ).domain()
+
+
+@dataclass
+class StageStats:
+    """Items a stage received and passed on, and the time spent in it."""
+    received: int = 0
+    emitted: int = 0
+    seconds: float = 0.0
+
+    def merge(self, other: 'StageStats'):
+        self.received += other.received
+        self.emitted += other.emitted
+        self.seconds += other.seconds
+
+
+def new_stats() -> Dict[str, StageStats]:
+    return {stage: StageStats() for stage in STAGES}
+
+
+def timed_source(items: Iterable, stats: StageStats) -> Iterator:
+    """Items of an iterable, timing how long each takes to produce."""
+    iterator = iter(items)
+    while True:
+        began = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            stats.seconds += time.perf_counter() - began
+            return
+        stats.seconds += time.perf_counter() - began
+        stats.received += 1
+        stats.emitted += 1
+        yield item
+
+
+def timed_stage(items: Iterable, fn: Callable[[Any], Any], stats: StageStats) -> Iterator:
+    """fn of every item, dropping None results. Only the time spent in fn is counted."""
+    for item in items:
+        stats.received += 1
+        began = time.perf_counter()
+        result = fn(item)
+        stats.seconds += time.perf_counter() - began
+        if result is not None:
+            stats.emitted += 1
+            yield result
+
+
+def parsed_records(adapter: SourceAdapter, path: str, stats: Dict[str, StageStats]) -> Iterator[tuple]:
+    """(record, question) pairs of a source: the parse and normalize stages."""
+    records = timed_source(adapter.parse(path), stats['parse'])
+    return timed_stage(
+        records, lambda record: _paired(record, adapter.normalize(record)), stats['normalize']
+    )
+
+
+def _paired(record: Any, question: Optional[Question]) -> Optional[tuple]:
+    return None if question is None else (record, question)
+
+
+def parse_source(adapter: SourceAdapter, path: str) -> dict:
+    """
+    Digest, (record, question) pairs and stage stats of one source. Runs in
+    a worker process, so it never raises: failures are returned in the
+    'error' field.
+    """
+    stats = new_stats()
+    result = {'digest': None, 'records': [], 'stats': stats, 'error': None}
+    try:
+        result['digest'] = file_digest(path)
+        result['records'] = list(parsed_records(adapter, path, stats))
+    except Exception as e:
+        result['error'] = str(e) or type(e).__name__
+    return result
+
+
+@dataclass
+class ImportReport:
+    """What one pipeline run did."""
+    imported: int = 0
+    skipped: int = 0
+    retired: int = 0
+    unchanged: int = 0
+    sources: int = 0
+    failed: List[str] = field(default_factory=list)
+    stats: Dict[str, StageStats] = field(default_factory=new_stats)
+    seconds: float = 0.0
+
+
+class ImportPipeline:
+    """Runs source files through the import stages; see the module docstring."""
+
+    def __init__(self, db_path: str, adapters: Sequence[SourceAdapter], dry_run: bool = False,
+                 batch_size: int = BATCH_SIZE, workers: Optional[int] = None,
+                 max_pending: Optional[int] = None):
+        self.db_path = db_path
+        self.adapters = list(adapters)
+        self.dry_run = dry_run
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_pending = max_pending or 2 * (workers or os.cpu_count() or 1)
+
+    def adapter_for(self, path: str) -> Optional[SourceAdapter]:
+        return next((adapter for adapter in self.adapters if adapter.accepts(path)), None)
+
+    def discover(self, paths: Iterable[str]) -> Tuple[List[Tuple[SourceAdapter, str]], List[str]]:
+        """
+        (adapter, file) for every source under the given files and
+        directories, in name order, and the paths given that do not exist.
+        """
+        sources, missing = [], []
+        for path in paths:
+            path = os.path.abspath(path)
+            if os.path.isdir(path):
+                files = sorted(os.path.join(path, name) for name in os.listdir(path))
+            elif os.path.exists(path):
+                files = [path]
+            else:
+                missing.append(path)
+                continue
+            for filepath in files:
+                adapter = self.adapter_for(filepath) if os.path.isfile(filepath) else None
+                if adapter:
+                    sources.append((adapter, filepath))
+        return sources, missing
+
+    def run(self, paths: Iterable[str]) -> ImportReport:
+        """Import every source under paths; returns the report, also printed."""
+        paths = list(paths)
+        report = ImportReport()
+        started = time.perf_counter()
+
+        db = None if self.dry_run else DatabaseManager(self.db_path)
+        manifest = db.get_import_manifest() if db else {}
+        sources, missing = self.discover(paths)
+        print(f"Found {len(sources)} source files" + (" (dry run)" if self.dry_run else ""))
+
+        pending = []
+        for adapter, filepath in sources:
+            stat = os.stat(filepath)
+            if db and source_key(filepath) not in manifest:
+                self._adopt(db, manifest, filepath)
+            if source_unchanged(manifest.get(source_key(filepath)), stat.st_size, stat.st_mtime,
+                                adapter.parser_version):
+                report.unchanged += 1
+            else:
+                pending.append((adapter, filepath, stat))
+
+        for (adapter, filepath, stat), result in self._parsed(pending):
+            print(f"\nProcessing: {os.path.basename(filepath)} ({adapter.name})")
+            report.sources += 1
+            try:
+                self._import(db, manifest, adapter, filepath, stat, result, report)
+            except Exception as e:
+                print(f"  Error importing {os.path.basename(filepath)}: {e}")
+                report.failed.append(os.path.basename(filepath))
+
+        if db:
+            self._retire_gone(db, manifest, paths, sources, missing, report)
+
+        report.seconds = time.perf_counter() - started
+        self._print_report(report)
+        if db:
+            print(f"Total questions in database: {db.get_question_count('SAA-C03')}")
+        return report
+
+    def _parsed(self, pending: list) -> Iterator[tuple]:
+        """
+        (source, parse result) in order. Parallel sources are submitted to the
+        pool at most max_pending ahead of the one being written; the others
+        are parsed lazily, in step with the writer.
+        """
+        if not any(adapter.parallel for adapter, _, _ in pending):
+            for source in pending:
+                yield source, None
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            window: deque = deque()
+            upcoming = iter(pending)
+            for source in upcoming:
+                window.append((source, pool.submit(parse_source, source[0], source[1])
+                               if source[0].parallel else None))
+                if len(window) >= self.max_pending:
+                    break
+            while window:
+                source, future = window.popleft()
+                following = next(upcoming, None)
+                if following is not None:
+                    window.append((following, pool.submit(parse_source, following[0], following[1])
+                                   if following[0].parallel else None))
+                yield source, _result(future)
+
+    def _import(self, db: Optional[DatabaseManager], manifest: Dict[str, dict], adapter: SourceAdapter,
+                filepath: str, stat: os.stat_result, result: Optional[dict], report: ImportReport):
+        """Classify, dedupe and insert one source's questions."""
+        stats = report.stats
+        if result is None:
+            # Parsed here, lazily, as the insert stage pulls questions
+            digest = file_digest(filepath) if db else None
+            records = parsed_records(adapter, filepath, stats)
+        elif result['error']:
+            print(f"  Error processing {os.path.basename(filepath)}: {result['error']}")
+            report.failed.append(os.path.basename(filepath))
+            return
+        else:
+            digest = result['digest']
+            records = iter(result['records'])
+            for stage, stage_stats in result['stats'].items():
+                stats[stage].merge(stage_stats)
+
+        key = source_key(filepath)
+        if db and key not in manifest:
+            self._adopt(db, manifest, filepath, digest)
+        if db and source_unchanged(manifest.get(key), stat.st_size, stat.st_mtime,
+                                   adapter.parser_version, digest):
+            # Touched but not modified
+            db.touch_import_source(key, stat.st_size, stat.st_mtime)
+            report.unchanged += 1
+            print("  Unchanged")
+            return
+
+        seen = set()
+
+        def classify(pair):
+            record, question = pair
+            question.domain = adapter.classify(record, question)
+            return question
+
+        def dedupe(question):
+            # Repeats within the source; the database skips known content
+            content_hash = question.content_hash
+            if content_hash in seen:
+                return None
+            seen.add(content_hash)
+            return question
+
+        questions = timed_stage(timed_stage(records, classify, stats['classify']), dedupe, stats['dedupe'])
+        upstream = [stats[stage] for stage in STAGES[:-1]]
+        before = sum(s.seconds for s in upstream)
+        received = stats['dedupe'].emitted
+        began = time.perf_counter()
+
+        if db:
+            imported, retired = db.import_source(
+                key, questions, stat.st_size, stat.st_mtime, digest, adapter.parser_version, self.batch_size
+            )
+        else:
+            for _ in questions:
+                pass
+            imported, retired = 0, 0
+
+        # The writer pulled questions through the earlier stages; only the rest is insert time
+        elapsed = time.perf_counter() - began - (sum(s.seconds for s in upstream) - before)
+        count = stats['dedupe'].emitted - received
+        stats['insert'].received += count
+        stats['insert'].emitted += imported
+        stats['insert'].seconds += max(elapsed, 0.0)
+
+        report.imported += imported
+        report.retired += retired
+        if self.dry_run:
+            print(f"  {count} questions")
+        else:
+            report.skipped += count - imported
+            print(f"  Imported {imported} questions, skipped {count - imported} duplicates, retired {retired}")
+
+    def _adopt(self, db: DatabaseManager, manifest: Dict[str, dict], filepath: str,
+               digest: Optional[str] = None):
+        """
+        Give a source without a manifest entry the entry of a file that is
+        gone but was the same source: one whose path ends with this source's
+        key (the checkout moved; entries from before keys were relative are
+        absolute) or, once the digest is known, one with the same content
+        (the file was moved or renamed).
+        """
+        key = source_key(filepath)
+        suffix = '/' + key
+        for old_key, entry in manifest.items():
+            if os.path.exists(source_path(old_key)):
+                continue
+            moved = not os.path.isabs(key) and old_key.replace(os.sep, '/').endswith(suffix)
+            if moved or (digest is not None and entry['digest'] == digest):
+                if db.rename_import_source(old_key, key):
+                    manifest[key] = manifest.pop(old_key)
+                    print(f"  Manifest entry moved from {old_key}")
+                return
+
+    def _retire_gone(self, db: DatabaseManager, manifest: Dict[str, dict], paths: List[str],
+                     sources: list, missing: List[str], report: ImportReport):
+        """
+        Retire sources in the manifest that were given, or sat in a directory
+        given, and are gone. An absolute entry left behind by a checkout that
+        moved counts as sitting in a directory given when it ends with that
+        directory's key.
+        """
+        present = {source_key(filepath) for _, filepath in sources}
+        missing = {os.path.abspath(path) for path in missing}
+        directories = {os.path.abspath(p) for p in paths if os.path.isdir(p)}
+        directory_suffixes = tuple('/' + source_key(d) for d in directories if not os.path.isabs(source_key(d)))
+        for key in sorted(manifest):
+            filepath = source_path(key)
+            if key in present or os.path.exists(filepath):
+                continue
+            directory = os.path.dirname(filepath)
+            in_directory = (
+                directory in directories
+                or (os.path.isabs(key) and directory.replace(os.sep, '/').endswith(directory_suffixes))
+            ) and any(adapter.claims(filepath) for adapter in self.adapters)
+            if in_directory or filepath in missing:
+                retired = db.retire_import_source(key)
+                report.retired += retired
+                print(f"\nRemoved: {os.path.basename(filepath)} (retired {retired} questions)")
+
+    def _print_report(self, report: ImportReport):
+        print(f"\n{'='*50}")
+        print(f"{'Stage':<10} {'in':>8} {'out':>8} {'time':>10} {'per second':>12}")
+        for stage in STAGES:
+            s = report.stats[stage]
+            rate = f"{s.received / s.seconds:,.0f}" if s.seconds else "-"
+            print(f"{stage:<10} {s.received:>8} {s.emitted:>8} {s.seconds * 1000:>7.1f} ms {rate:>12}")
+        print()
+        if not self.dry_run:
+            print(f"Total questions imported: {report.imported}")
+            print(f"Duplicates skipped: {report.skipped}")
+            print(f"Questions retired: {report.retired}")
+        print(f"Unchanged files skipped: {report.unchanged}")
+        questions = report.stats['dedupe'].emitted
+        print(f"Elapsed: {report.seconds:.2f} s ({questions / report.seconds if report.seconds else 0:.0f} "
+              f"questions/s, {report.sources} files)")
+        if report.failed:
+            print(f"Failed files ({len(report.failed)}): {', '.join(report.failed)}")
+
+
+def _result(future: Optional[Future]) -> Optional[dict]:
+    if future is None:
+        return None
+    try:
+        return future.result()
+    except Exception as e:
+        # The worker itself died (e.g. the pool broke)
+        return {'digest': None, 'records': [], 'stats': new_stats(), 'error': str(e) or type(e).__name__}
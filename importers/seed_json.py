@@ -0,0 +1,28 @@
+"""
+Seed question bank files: JSON with a "questions" list of Question dicts,
+as written by the seed scripts in scripts/.
+"""
+import json
+from typing import Iterator, Optional
+
+from database.models import Question
+from .pipeline import SourceAdapter
+
+
+class SeedJsonAdapter(SourceAdapter):
+    name = "seed JSON"
+    extensions = ('.json',)
+    parser_version = 1
+
+    def parse(self, path: str) -> Iterator[dict]:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        yield from data if isinstance(data, list) else data.get('questions', [])
+
+    def normalize(self, record: dict) -> Optional[Question]:
+        question = Question.from_dict(record)
+        if not question.question_text or not question.options:
+            return None
+        question.id = 0
+        question.exam_type = question.exam_type or "SAA-C03"
+        return question
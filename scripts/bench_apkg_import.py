@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark for importing Anki .apkg packages.
+
+Builds a package (a zip holding a collection.anki2 SQLite file, note types
+in col.models) and an equivalent text export from the notes of the Anki
+export in quizz_add_sources/, repeated under fresh guids up to --notes
+notes. Each copy of a note gets its own cloze answers and backs, so the
+distractor pools fill up to their POOL_LIMIT cap. Times the package and text importers'
+question generation and reports their peak traced memory. Also checks that
+a package of the original notes alone yields exactly the questions the text
+export does.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, REPO_ROOT)
+
+from import_anki import AnkiNotesAdapter, AnkiPackageAdapter
+
+ANKI_EXPORT = os.path.join(REPO_ROOT, 'quizz_add_sources', 'AWS Solutions Architect Associate.txt')
+
+
+def export_notes() -> list:
+    """(guid, note type, front, back) of every note in the text export."""
+    notes = []
+    with open(ANKI_EXPORT, 'r', encoding='utf-8') as f:
+        for line in f:
+            fields = line.strip().split('\t')
+            if not line.startswith('#') and len(fields) >= 5:
+                notes.append((fields[0], fields[1], fields[3], fields[4]))
+    return notes
+
+
+def scaled_notes(notes: list, count: int) -> list:
+    """notes repeated up to count, copies with a new guid and their own answers."""
+    scaled = list(notes[:count])
+    copy = 0
+    while len(scaled) < count:
+        copy += 1
+        for guid, note_type, front, back in notes[:count - len(scaled)]:
+            front = front.replace('}}', f' {copy}}}}}') if note_type == 'Cloze+' else front
+            scaled.append((f'{guid}#{copy}', note_type, front, f'{back} ({copy})'))
+    return scaled
+
+
+def write_package(notes: list, path: str):
+    types = sorted({note_type for _, note_type, _, _ in notes})
+    model_ids = {note_type: 1000 + i for i, note_type in enumerate(types)}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        collection = os.path.join(tmp_dir, 'collection.anki2')
+        conn = sqlite3.connect(collection)
+        conn.execute('CREATE TABLE col (id INTEGER PRIMARY KEY, models TEXT NOT NULL)')
+        conn.execute('CREATE TABLE notes (id INTEGER PRIMARY KEY, guid TEXT NOT NULL, mid INTEGER NOT NULL, '
+                     'flds TEXT NOT NULL)')
+        conn.execute('INSERT INTO col (id, models) VALUES (1, ?)',
+                     (json.dumps({str(i): {'name': t} for t, i in model_ids.items()}),))
+        conn.executemany('INSERT INTO notes (id, guid, mid, flds) VALUES (?, ?, ?, ?)', (
+            (i + 1, guid, model_ids[note_type], f'{front}\x1f{back}')
+            for i, (guid, note_type, front, back) in enumerate(notes)
+        ))
+        conn.commit()
+        conn.close()
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as package:
+            package.write(collection, 'collection.anki2')
+
+
+def write_export(notes: list, path: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('#separator:tab\n#html:true\n')
+        for guid, note_type, front, back in notes:
+            f.write(f'{guid}\t{note_type}\tdeck\t{front}\t{back}\ttags\n')
+
+
+def measure(adapter, path: str) -> tuple:
+    tracemalloc.start()
+    began = time.perf_counter()
+    count = sum(1 for _ in adapter.parse(path))
+    seconds = time.perf_counter() - began
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Anki .apkg imports.")
+    parser.add_argument('--notes', type=int, nargs='*', default=[10000, 100000],
+                        help="Notes in the generated deck, one run each")
+    args = parser.parse_args()
+
+    notes = export_notes()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        package = os.path.join(tmp_dir, 'deck.apkg')
+        write_package(notes, package)
+        same = list(AnkiPackageAdapter().parse(package)) == list(AnkiNotesAdapter().parse(ANKI_EXPORT))
+        print(f"{'ok  ' if same else 'FAIL'} package of the {len(notes)} exported notes gives the same questions\n")
+
+        for count in args.notes:
+            deck = scaled_notes(notes, count)
+            export = os.path.join(tmp_dir, 'deck.txt')
+            write_package(deck, package)
+            write_export(deck, export)
+
+            questions, seconds, peak = measure(AnkiPackageAdapter(), package)
+            print(f"{count:7d} notes, package: {questions} questions in {seconds:.1f} s, "
+                  f"peak {peak / 1e6:.0f} MB")
+            questions, seconds, peak = measure(AnkiNotesAdapter(), export)
+            print(f"{count:7d} notes, text:    {questions} questions in {seconds:.1f} s, "
+                  f"peak {peak / 1e6:.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
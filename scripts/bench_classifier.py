@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark for keyword classification.
+
+Times the shared keyword automaton against one substring search per
+keyword (how the importers used to classify) on the seed question texts,
+with the classifier's own keyword tables and with those tables padded with
+extra keywords drawn from the texts. Both must find the same keywords.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, REPO_ROOT)
+
+from utils.classifier import KeywordAutomaton, classifier
+
+SEED_PATH = os.path.join(REPO_ROOT, 'data', 'seed_questions.json')
+
+
+def seed_texts() -> list:
+    with open(SEED_PATH, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    questions = data if isinstance(data, list) else data.get('questions', [])
+    return [(q.get('question_text', '') + ' ' + ' '.join(q.get('options', []))).lower() for q in questions]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark keyword classification.")
+    parser.add_argument('--extra', type=int, nargs='*', default=[0, 300, 1000],
+                        help="Extra keywords added to the tables, one run each")
+    args = parser.parse_args()
+
+    texts = seed_texts()
+    words = sorted({word for text in texts for word in text.split() if word.isalpha() and len(word) > 4})
+    print(f"{len(texts)} texts, {sum(map(len, texts)) // max(len(texts), 1)} characters on average\n")
+
+    for extra in args.extra:
+        automaton = KeywordAutomaton(classifier.automaton.keywords + random.Random(extra).sample(words, extra))
+
+        began = time.perf_counter()
+        found = [{index for _, index in automaton.finditer(text)} for text in texts]
+        scanned = time.perf_counter()
+        expected = [{i for i, keyword in enumerate(automaton.keywords) if keyword in text} for text in texts]
+        searched = time.perf_counter()
+
+        status = 'ok  ' if found == expected else 'FAIL'
+        print(f"{status} {len(automaton.keywords):5d} keywords: automaton {(scanned - began) * 1000:6.1f} ms, "
+              f"substring per keyword {(searched - scanned) * 1000:6.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark for similarity-ranked distractors.
+
+Builds a DistractorEngine over a pool of candidate answers (the seed
+question options, padded up to --answers with variants of them: a word
+dropped, swapped for another option's word, or a verb put in front) and
+times building it and finding 3 distractors for every answer in the pool.
+The picks are checked against an exact engine (no query budget) on a
+sample of queries: recall of its top 3, and the exact cosine of the picks
+relative to that of its top 3.
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, REPO_ROOT)
+
+from utils.distractors import DistractorEngine
+
+SEED_PATH = os.path.join(REPO_ROOT, 'data', 'seed_questions.json')
+
+
+def seed_answers() -> list:
+    with open(SEED_PATH, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    questions = data if isinstance(data, list) else data.get('questions', [])
+    options = (re.sub(r'^[A-Za-z][.)]\s+', '', option) for q in questions for option in q.get('options', []))
+    return list(dict.fromkeys(options))
+
+
+def build_pool(size: int, seed: int) -> list:
+    answers = seed_answers()
+    words = sorted({word for answer in answers for word in answer.split()})
+    rng = random.Random(seed)
+    pool = dict.fromkeys(answers)
+    while len(pool) < size:
+        variant = rng.choice(answers).split()
+        position = rng.randrange(len(variant))
+        change = rng.randrange(3)
+        if change == 0 and len(variant) > 1:
+            del variant[position]
+        elif change == 1:
+            variant[position] = rng.choice(words)
+        else:
+            variant.insert(0, rng.choice(['Use', 'Enable', 'Configure', 'Deploy', 'Create']))
+        pool[' '.join(variant)] = None
+    return list(pool)[:size]
+
+
+def cosine(engine: DistractorEngine, text: str, others: list) -> float:
+    """Summed exact cosine between text and each of others."""
+    rows, features, weights = engine._vectorize([text] + others)
+    vectors = [dict() for _ in range(len(others) + 1)]
+    for row, feature, weight in zip(rows.tolist(), features.tolist(), weights.tolist()):
+        vectors[row][feature] = weight
+    return sum(sum(w * other.get(f, 0.0) for f, w in vectors[0].items()) for other in vectors[1:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark similarity-ranked distractors.")
+    parser.add_argument('--answers', type=int, default=20000, help="Candidate answers in the pool")
+    parser.add_argument('--sample', type=int, default=300, help="Queries checked against the exact engine")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    pool = build_pool(args.answers, args.seed)
+
+    began = time.perf_counter()
+    engine = DistractorEngine(pool)
+    built = time.perf_counter()
+    found = engine.nearest(pool, 3)
+    done = time.perf_counter()
+
+    print(f"Pool: {len(engine)} answers")
+    print(f"Build: {(built - began) * 1000:.0f} ms")
+    print(f"Distractors for {len(pool)} answers: {(done - built) * 1000:.0f} ms "
+          f"({(done - built) * 1e6 / len(pool):.0f} us per answer)")
+    print(f"Answers with 3 similar distractors: {sum(len(f) == 3 for f in found)}")
+
+    sample = random.Random(args.seed).sample(range(len(pool)), min(args.sample, len(pool)))
+    exact = DistractorEngine(pool, query_budget=sys.maxsize)
+    expected = exact.nearest([pool[i] for i in sample], 3)
+    hits = sum(len(set(found[i]) & set(e)) for i, e in zip(sample, expected))
+    best = sum(cosine(exact, pool[i], e) for i, e in zip(sample, expected))
+    picked = sum(cosine(exact, pool[i], found[i]) for i in sample)
+    print(f"Against exact cosine on {len(sample)} queries: recall@3 {hits / max(sum(map(len, expected)), 1):.0%}, "
+          f"similarity of picks {picked / max(best, 1e-9):.0%} of the best")
+
+    for i in sample[:3]:
+        print(f"\n  {pool[i][:70]}")
+        for distractor in found[i]:
+            print(f"    - {distractor[:70]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Server CPU per click on the exam page.
+
+Drives app.py with Streamlit's AppTest from a scratch copy of the repo (so
+data/questions.db is never touched) and compares, for the same clicks:
+
+  full     the whole script rerun, which is what every click cost before
+           the exam page was split into fragments
+  fragment only the region that owns the clicked widget, which is what a
+           click inside that fragment costs now
+
+AppTest always reruns the full script, so fragment cost is measured by
+running the fragment function on its own against the same session state.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+def copy_repo(target: str):
+    shutil.copytree(REPO_ROOT, target, dirs_exist_ok=True,
+                    ignore=shutil.ignore_patterns('.git', '__pycache__', '*.db', 'quizz_add_sources'))
+
+
+def fragment_script(region: str):
+    """AppTest script that renders a single exam page fragment."""
+    import streamlit as st
+    import app
+
+    db = app.get_db_manager()
+    exam = st.session_state.exam
+    idx = st.session_state.current_question
+    question = db.catalog.get(exam.question_ids[idx])
+
+    if region == 'question':
+        app.render_question_panel(db, question, idx)
+    elif region == 'rating':
+        app.render_rating_bar(db, app.get_auth_manager(), question, idx)
+    elif region == 'navigator':
+        app.render_navigator_panel(db, idx)
+    elif region == 'submit':
+        app.render_submit_bar(db)
+
+
+def cpu_ms(at, clicks: int, interact) -> list:
+    """CPU time (ms) of each rerun triggered by `interact(at, i)`."""
+    samples = []
+    for i in range(clicks):
+        interact(at, i)
+        began = time.process_time()
+        at.run()
+        samples.append((time.process_time() - began) * 1000)
+        if at.exception:
+            sys.exit(f"Run failed: {at.exception[0].message}")
+    return samples
+
+
+def select_option(at, i):
+    radio = at.radio[0]
+    radio.set_value(radio.options[i % len(radio.options)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure server CPU per click on the exam page.")
+    parser.add_argument('--clicks', type=int, default=30, help="Clicks measured per case")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    try:
+        copy_repo(workdir)
+        os.chdir(workdir)
+        sys.path.insert(0, workdir)
+
+        from streamlit.testing.v1 import AppTest
+        from auth.models import User
+
+        user = User(id=1, email='bench@example.com', username='bench', password_hash=None,
+                    auth_provider='email', created_at=datetime.now(), last_login=None)
+
+        full = AppTest.from_file(os.path.join(workdir, 'app.py'), default_timeout=120)
+        full.session_state['user'] = user
+        full.session_state['user_id'] = user.id
+        full.run()
+        next(b for b in full.button if b.label == 'Start Exam').click().run()
+        # Land on a single-answer question so every click is a radio selection
+        while not full.radio:
+            next(b for b in full.button if b.label == 'Next').click().run()
+
+        fragment = AppTest.from_function(fragment_script, args=('question',), default_timeout=120)
+        for key in ('user', 'user_id', 'exam', 'exam_config', 'current_question', 'start_time',
+                    'show_result', 'submitted', 'show_submit_confirm', 'exam_attempt_id', 'last_checkpoint'):
+            fragment.session_state[key] = full.session_state[key]
+        fragment.run()
+
+        cases = [
+            ('full', full, select_option),
+            ('fragment', fragment, select_option),
+        ]
+        results = {}
+        for name, at, interact in cases:
+            cpu_ms(at, 3, interact)  # warm up caches and imports
+            samples = sorted(cpu_ms(at, args.clicks, interact))
+            results[name] = statistics.median(samples)
+            print(f"{name:9s} select option: median {results[name]:7.2f} ms CPU, "
+                  f"p90 {samples[int(len(samples) * 0.9) - 1]:7.2f} ms ({args.clicks} clicks)")
+
+        print(f"\nCPU per option click: {results['full'] / results['fragment']:.1f}x less")
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
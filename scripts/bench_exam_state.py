@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark for per-session exam state.
+
+Compares the previous representation (a list of full Question objects plus
+answer/mark/check dicts and sets held in every session) with ExamState
+(question ids, answer bitmasks and flags) backed by the shared
+QuestionCatalog. Reports retained memory per active session and exam-start
+latency with many exams starting concurrently.
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from database.db_manager import DatabaseManager
+from database.models import ExamState
+
+SEED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'seed_questions.json')
+
+
+def start_legacy(db: DatabaseManager, exam_type: str, num_questions: int) -> dict:
+    """The old start_exam: full questions copied into session state."""
+    questions = db.get_questions_by_exam(exam_type, limit=num_questions)
+    questions.sort(key=lambda q: (q.difficulty, q.id))
+    return {
+        'questions': questions,
+        'answers': {},
+        'marked_questions': set(),
+        'checked_questions': set(),
+        'rated_questions': set(),
+    }
+
+
+def start_compact(db: DatabaseManager, exam_type: str, num_questions: int) -> dict:
+    """The current start_exam: ids in session state, content in the catalog."""
+    question_ids = db.get_question_ids_by_exam(exam_type, limit=num_questions)
+    db.catalog.get_many(question_ids)
+    return {'exam': ExamState.new(question_ids)}
+
+
+def answer_some(state: dict):
+    """Answer and mark roughly half the questions, like a session mid-exam."""
+    if 'exam' in state:
+        exam = state['exam']
+        for i in range(0, len(exam), 2):
+            exam.set_answer(i, random.choice('ABCD'))
+            exam.set_flag(i, ExamState.FLAG_CHECKED)
+    else:
+        for i, question in enumerate(state['questions']):
+            if i % 2 == 0:
+                state['answers'][question.id] = random.choice('ABCD')
+                state['checked_questions'].add(question.id)
+
+
+def measure_memory(db: DatabaseManager, start, sessions: int, exam_type: str, num_questions: int) -> float:
+    """Bytes retained per session, including the catalog's share."""
+    db.catalog.clear()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    states = []
+    for _ in range(sessions):
+        state = start(db, exam_type, num_questions)
+        answer_some(state)
+        states.append(state)
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return retained / sessions
+
+
+def measure_latency(db: DatabaseManager, start, sessions: int, workers: int,
+                    exam_type: str, num_questions: int):
+    """Per-start latencies (ms) with `sessions` starts spread over `workers` threads."""
+    def timed_start(_):
+        began = time.perf_counter()
+        start(db, exam_type, num_questions)
+        return (time.perf_counter() - began) * 1000
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        began = time.perf_counter()
+        latencies = sorted(pool.map(timed_start, range(sessions)))
+        wall = time.perf_counter() - began
+    return latencies, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-session exam state.")
+    parser.add_argument('--sessions', type=int, default=1000, help="Concurrent exams to simulate")
+    parser.add_argument('--workers', type=int, default=32, help="Threads starting exams at once")
+    parser.add_argument('--questions', type=int, default=65, help="Questions per exam")
+    parser.add_argument('--exam-type', default='SAA-C03')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(workdir, 'bench.db'))
+        db.import_questions_from_json(SEED_PATH)
+        print(f"Question bank: {db.get_question_count(args.exam_type)} {args.exam_type} questions")
+
+        results = {}
+        for name, start in [('legacy', start_legacy), ('compact', start_compact)]:
+            per_session = measure_memory(db, start, args.sessions, args.exam_type, args.questions)
+            db.catalog.clear()
+            latencies, wall = measure_latency(db, start, args.sessions, args.workers,
+                                              args.exam_type, args.questions)
+            results[name] = per_session
+            print(f"\n{name}:")
+            print(f"  memory per session: {per_session / 1024:8.1f} KB")
+            print(f"  start latency: p50 {statistics.median(latencies):.2f} ms, "
+                  f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.2f} ms, "
+                  f"{args.sessions} starts in {wall:.2f} s ({args.workers} threads)")
+
+        print(f"\nMemory per session: {results['legacy'] / results['compact']:.1f}x smaller")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark for HTML-to-text normalization.
+
+Collects every HTML fragment the importers clean (question, answer,
+feedback and explanation fields of the quiz pages, both fields of the Anki
+notes) from quizz_add_sources/ and times the previous regex cleaner against
+html_to_text, with its cache cold and warm. Also checks that html_to_text
+keeps the same words as the regex cleaner once its Markdown (list markers,
+backticks, code fences) is taken out; the exceptions are <pre> blocks,
+whose layout is kept, and text after a bare '<' ("S3 < EBS"), which the
+regex cleaner dropped as if it opened a tag. Finally checks html_to_text
+on a few fragments with known Markdown.
+"""
+
+import html
+import os
+import re
+import sys
+import time
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, REPO_ROOT)
+
+from import_anki import parse_anki_file
+from import_quizzes import read_quiz_blocks
+from utils.html_text import html_to_text
+
+SOURCE_DIR = os.path.join(REPO_ROOT, 'quizz_add_sources')
+
+# Fragment -> expected Markdown
+CASES = {
+    'Run <code>aws s3 ls</code> to list buckets': 'Run `aws s3 ls` to list buckets',
+    'Use <code> aws s3 ls </code>, then': 'Use `aws s3 ls`, then',
+    '<code>x</code> <code>y</code> z': '`x` `y` z',
+    'a <code> </code> b': 'a b',
+    'a<br>b<br><br>c<br>': 'a  \nb\n\nc',
+    '<p>Pick:</p><ol><li>one</li><li>two</li></ol>': 'Pick:\n\n1. one\n2. two',
+    'S3 &lt; EBS': 'S3 < EBS',
+}
+
+MARKDOWN = re.compile(r'^\s*(?:[-*]|\d+\.)\s+|`|^```', re.MULTILINE)
+
+
+def legacy_clean(text: str) -> str:
+    """The old import_quizzes.clean_html."""
+    if not text:
+        return ""
+    text = html.unescape(text)
+    text = re.sub(r'<[^>]+>', '', text)
+    return ' '.join(text.split()).strip()
+
+
+def corpus_fragments() -> list:
+    fragments = []
+    for name in sorted(os.listdir(SOURCE_DIR)):
+        path = os.path.join(SOURCE_DIR, name)
+        if name.endswith('.html'):
+            for quiz in read_quiz_blocks(path):
+                for q in quiz.get('questions', []):
+                    prompt = q.get('prompt', {})
+                    fragments.append(prompt.get('question', ''))
+                    fragments.extend(prompt.get('answers', []))
+                    fragments.extend(prompt.get('feedbacks', []))
+                    fragments.append(prompt.get('explanation', ''))
+        elif name.endswith('.txt'):
+            cards, _ = parse_anki_file(path)
+            for card in cards:
+                fragments.extend([card['front'], card['back']])
+    return [f for f in fragments if f]
+
+
+def main():
+    fragments = corpus_fragments()
+    print(f"{len(fragments)} fragments, {len(set(fragments))} distinct, "
+          f"{sum(map(len, fragments)) / 1e6:.1f} MB, {sum('<' in f for f in fragments)} with tags\n")
+
+    began = time.perf_counter()
+    expected = [legacy_clean(f) for f in fragments]
+    legacy = time.perf_counter()
+    html_to_text.cache_clear()
+    converted = [html_to_text(f) for f in fragments]
+    cold = time.perf_counter()
+    [html_to_text(f) for f in fragments]
+    warm = time.perf_counter()
+
+    print(f"Regex cleaner:         {(legacy - began) * 1000:7.1f} ms")
+    print(f"html_to_text, cold:    {(cold - legacy) * 1000:7.1f} ms")
+    print(f"html_to_text, cached:  {(warm - cold) * 1000:7.1f} ms")
+
+    differ = [(e, c) for e, c in zip(expected, converted) if ' '.join(MARKDOWN.sub(' ', c).split()) != e]
+    print(f"\nSame words as the regex cleaner: {len(fragments) - len(differ)} of {len(fragments)}")
+    for e, c in differ[:3]:
+        print(f"\n  regex:    {e[:100]!r}\n  markdown: {c[:100]!r}")
+
+    print()
+    for fragment, markdown in CASES.items():
+        result = html_to_text(fragment)
+        status = 'ok  ' if result == markdown else 'FAIL'
+        print(f"{status} {fragment!r} -> {result!r}")
+
+
+if __name__ == '__main__':
+    main()
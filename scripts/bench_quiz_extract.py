@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark for quizData extraction from HTML quiz pages.
+
+Compares the previous extractor (a lazy DOTALL regex over the whole page,
+then json.loads on the match) with read_quiz_blocks (memory-mapped file,
+marker search, JSONDecoder.raw_decode) on the largest files in
+quizz_add_sources/. Also checks both on a page where '};' appears inside a
+JSON string and on a page with two quiz blocks.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, REPO_ROOT)
+
+from import_quizzes import read_quiz_blocks
+
+SOURCE_DIR = os.path.join(REPO_ROOT, 'quizz_add_sources')
+
+
+def legacy_extract(filepath: str) -> list:
+    """The old extract_quiz_data, applied to the whole file."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        html_content = f.read()
+    match = re.search(r'const quizData = ({.*?});', html_content, re.DOTALL)
+    if not match:
+        return []
+    try:
+        return [json.loads(match.group(1))]
+    except json.JSONDecodeError:
+        return []
+
+
+def time_ms(extract, filepath: str, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        began = time.perf_counter()
+        extract(filepath)
+        samples.append((time.perf_counter() - began) * 1000)
+    return statistics.median(samples)
+
+
+def edge_cases(workdir: str) -> list:
+    """(description, path, expected block count) for hand-made pages."""
+    tricky = {"quiz_title": "Tricky", "questions": [{"prompt": {"question": "Is `x = {a: 1};` valid?"}}]}
+    second = {"quiz_title": "Second", "questions": []}
+    pages = [
+        ("'};' inside a string", f"<script>const quizData = {json.dumps(tricky)};</script>", 1),
+        ("two quiz blocks", f"<script>const quizData = {json.dumps(tricky)};</script>"
+                            f"<script>var quizData = {json.dumps(second)};</script>", 2),
+    ]
+    cases = []
+    for i, (description, content, expected) in enumerate(pages):
+        path = os.path.join(workdir, f'case{i}.html')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        cases.append((description, path, expected))
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quizData extraction.")
+    parser.add_argument('--files', type=int, default=6, help="Number of largest files to time")
+    parser.add_argument('--rounds', type=int, default=50, help="Timed extractions per file")
+    args = parser.parse_args()
+
+    html_files = sorted(
+        (os.path.join(SOURCE_DIR, name) for name in os.listdir(SOURCE_DIR) if name.endswith('.html')),
+        key=os.path.getsize, reverse=True
+    )[:args.files]
+
+    legacy_total = current_total = 0.0
+    for filepath in html_files:
+        legacy = legacy_extract(filepath)
+        current = read_quiz_blocks(filepath)
+        if legacy != current:
+            sys.exit(f"Extractors disagree on {os.path.basename(filepath)}")
+
+        legacy_ms = time_ms(legacy_extract, filepath, args.rounds)
+        current_ms = time_ms(read_quiz_blocks, filepath, args.rounds)
+        legacy_total += legacy_ms
+        current_total += current_ms
+        print(f"{os.path.getsize(filepath) / 1024:6.0f} KB  legacy {legacy_ms:6.2f} ms  "
+              f"raw_decode {current_ms:6.2f} ms  {os.path.basename(filepath)[:50]}")
+
+    print(f"\nTotal: legacy {legacy_total:.1f} ms, raw_decode {current_total:.1f} ms "
+          f"({legacy_total / current_total:.1f}x)")
+
+    print("\nEdge cases (blocks found, legacy / raw_decode):")
+    with tempfile.TemporaryDirectory() as workdir:
+        for description, path, expected in edge_cases(workdir):
+            legacy, current = len(legacy_extract(path)), len(read_quiz_blocks(path))
+            status = 'ok  ' if current == expected else 'FAIL'
+            print(f"  {status} {description}: {legacy} / {current} (expected {expected})")
+
+
+if __name__ == '__main__':
+    main()
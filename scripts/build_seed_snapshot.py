@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Compile data/seed_questions.json into data/seed_questions.db, the prebuilt
+snapshot the app copies into place on first boot (see database/snapshot.py).
+The dev container runs it before starting the app, and deploys should do
+the same; the app also rebuilds a stale snapshot itself, but then the first
+request pays for it.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from database.snapshot import build_snapshot, seed_fingerprint, snapshot_fingerprint
+
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the seed question snapshot.")
+    parser.add_argument('--seed', default=os.path.join(DATA_DIR, 'seed_questions.json'))
+    parser.add_argument('--output', default=os.path.join(DATA_DIR, 'seed_questions.db'))
+    parser.add_argument('--force', action='store_true', help="Rebuild even if the snapshot is current")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.seed):
+        print(f"{args.seed} not found, nothing to build")
+        return
+
+    if not args.force and snapshot_fingerprint(args.output) == seed_fingerprint(args.seed):
+        print(f"{args.output} is up to date")
+        return
+
+    started = time.perf_counter()
+    count = build_snapshot(args.seed, args.output)
+    elapsed = time.perf_counter() - started
+    size_kb = os.path.getsize(args.output) / 1024
+    print(f"Built {args.output}: {count} questions, {size_kb:.0f} KB in {elapsed:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
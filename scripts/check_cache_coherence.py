@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Cross-process cache coherence check.
+
+Warms the caches of a DatabaseManager and AuthManager in this process,
+then has a second process write to the same database file: import a
+question, rate a question for one user and revoke a session. Verifies that
+this process notices each write, invalidates only the affected partitions,
+and reports what an idle poll costs. Also checks that a session this
+process revokes right after the other process revoked one does not hide
+the other revocation.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from auth import AuthManager
+from database.db_manager import DatabaseManager
+from database.models import Question
+
+EXAM_TYPE = 'SAA-C03'
+
+
+def make_question(n: int) -> Question:
+    return Question(
+        id=0, exam_type=EXAM_TYPE, domain='1', difficulty=1,
+        question_text=f'Coherence question {n}?',
+        options=['A. One', 'B. Two', 'C. Three', 'D. Four'],
+        correct_answer='A', explanation='', reference=''
+    )
+
+
+def writer(db_path: str, action: str, token: str = ''):
+    """Runs in the second process."""
+    db = DatabaseManager(db_path)
+    if action == 'import':
+        db.add_question(make_question(99))
+        AuthManager(db_path).revoke_session(token)
+    elif action == 'rate':
+        db.update_question_stats(1, True, 3, user_id=2)
+    elif action == 'revoke':
+        AuthManager(db_path).revoke_session(token)
+
+
+def run_writer(db_path: str, *args: str):
+    subprocess.run([sys.executable, os.path.abspath(__file__), '--writer', db_path, *args], check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check cross-process cache invalidation.")
+    parser.add_argument('--writer', nargs='+', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.writer:
+        writer(*args.writer)
+        return
+
+    workdir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(workdir, 'coherence.db')
+        db = DatabaseManager(db_path)
+        auth = AuthManager(db_path)
+        for n in range(3):
+            db.add_question(make_question(n))
+        _, _, user = auth.register('coherence@example.com', 'coherence', 'Password123!')
+        token = auth.create_session(user.id)
+
+        # Warm every cache: shared counts, two user partitions, catalog, sessions
+        db.get_question_count(EXAM_TYPE)
+        db.get_learning_progress(EXAM_TYPE, user_id=1)
+        db.get_learning_progress(EXAM_TYPE, user_id=2)
+        db.catalog.get_many([1, 2, 3])
+        assert auth.get_user_by_session(token) is not None
+
+        # Idle polls: nothing was committed anywhere
+        rounds = 10000
+        started = time.perf_counter()
+        for _ in range(rounds):
+            db.watcher.poll(force=True)
+        idle_us = (time.perf_counter() - started) / rounds * 1e6
+
+        db.watcher.poll_interval = auth.watcher.poll_interval = 0
+
+        # A question import clears everything derived from the question bank
+        run_writer(db_path, 'import', token)
+        checks = [
+            ("question count reflects the other process's import",
+             db.get_question_count(EXAM_TYPE) == 4),
+            ("catalog was cleared", len(db.catalog) == 0),
+            ("revoked session is rejected", auth.get_user_by_session(token) is None),
+        ]
+
+        # A rating invalidates only the rating user's partition
+        db.get_learning_progress(EXAM_TYPE, user_id=1)
+        db.get_learning_progress(EXAM_TYPE, user_id=2)
+        run_writer(db_path, 'rate')
+        before = db.cache.get_metrics()
+        db.get_learning_progress(EXAM_TYPE, user_id=1)
+        db.get_learning_progress(EXAM_TYPE, user_id=2)
+        after = db.cache.get_metrics()
+        checks.append(("user 1 partition kept", after.get('hits', 0) == before.get('hits', 0) + 1))
+        checks.append(("user 2 partition invalidated", after.get('misses', 0) == before.get('misses', 0) + 1))
+
+        # A local revocation after a foreign one, before any poll, shares its scope
+        foreign, local = auth.create_session(user.id), auth.create_session(user.id)
+        assert auth.get_user_by_session(foreign) is not None
+        run_writer(db_path, 'revoke', foreign)
+        auth.revoke_session(local)
+        checks.append(("session revoked elsewhere is rejected after a local revocation",
+                       auth.get_user_by_session(foreign) is None))
+
+        print(f"Idle poll (PRAGMA data_version): {idle_us:.1f} us")
+        print(f"Watcher: {db.watcher.polls} polls, {db.watcher.changes_seen} foreign changes seen")
+        ok = True
+        for description, passed in checks:
+            ok = ok and passed
+            print(f"  {'ok  ' if passed else 'FAIL'} {description}")
+        print("PASS" if ok else "FAIL")
+        sys.exit(0 if ok else 1)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
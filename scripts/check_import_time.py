@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the app's cold start.
+
+Runs `python -X importtime -c "import app"` in a fresh interpreter, reports
+the slowest imports, and exits non-zero when a heavy page-only dependency is
+imported at startup or when the app's own import cost (everything except
+Streamlit itself) exceeds the budget. Meant to be run in CI.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Modules that must only load on the page that needs them
+DEFERRED_MODULES = [
+    'pandas',
+    'plotly.express',
+    'plotly.graph_objects',
+    'google_auth_oauthlib',
+    'google.oauth2.id_token',
+    'requests',
+]
+
+# Time attributed to these top-level imports is outside our control
+FRAMEWORK_MODULES = {'streamlit'}
+
+DEFAULT_BUDGET_MS = 250
+
+LINE_PATTERN = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def measure(module: str = 'app'):
+    """Return a list of (depth, name, self_us, cumulative_us) for one cold import."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        sys.exit(f"Importing {module} failed")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = LINE_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append(((len(indent) - 1) // 2, name, int(self_us), int(cumulative_us)))
+    return entries
+
+
+def imported_outside_framework(entries) -> set:
+    """Names imported by our code, excluding anything pulled in by the framework."""
+    # -X importtime lists children before their parent, so every entry
+    # belongs to the next top-level (depth 1) import that follows it
+    names, pending = set(), []
+    for depth, name, _, _ in entries:
+        pending.append(name)
+        if depth <= 1:
+            if name not in FRAMEWORK_MODULES:
+                names.update(pending)
+            pending = []
+    return names
+
+
+def app_cost_ms(entries, module: str = 'app') -> float:
+    """Cumulative import time of the module minus the framework imports under it."""
+    total = next(cum for depth, name, _, cum in entries if depth == 0 and name == module)
+    framework = sum(cum for depth, name, _, cum in entries if depth == 1 and name in FRAMEWORK_MODULES)
+    return (total - framework) / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the app's import-time budget.")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Budget for the app's own imports (default: {DEFAULT_BUDGET_MS})")
+    parser.add_argument('--runs', type=int, default=3, help="Cold imports to measure; the fastest counts")
+    parser.add_argument('--top', type=int, default=15, help="Number of slowest imports to list")
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    best = min(runs, key=app_cost_ms)
+
+    print(f"Slowest imports (best of {args.runs} runs, cumulative ms):")
+    for depth, name, _, cumulative in sorted(best, key=lambda e: -e[3])[:args.top]:
+        print(f"  {cumulative / 1000:8.1f}  {'  ' * depth}{name}")
+
+    failures = []
+
+    imported = imported_outside_framework(best)
+    for module in DEFERRED_MODULES:
+        if module in imported:
+            failures.append(f"{module} is imported at startup")
+
+    cost = app_cost_ms(best)
+    print(f"\nApp import cost excluding {', '.join(sorted(FRAMEWORK_MODULES))}: "
+          f"{cost:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if cost > args.budget_ms:
+        failures.append(f"app import cost {cost:.1f} ms exceeds budget of {args.budget_ms:.0f} ms")
+
+    if failures:
+        print("\nFAIL")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+
+    print("PASS")
+
+
+if __name__ == '__main__':
+    main()
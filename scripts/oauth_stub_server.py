@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Local stub of Google's OAuth endpoints for exercising auth/google_oauth.py
+without network access.
+
+Serves /token (issues an RS256-signed ID token), /userinfo and /certs
+(with a Cache-Control max-age). Run with --check to drive the app's OAuth
+callback (handle_google_callback, with st.query_params stubbed) against
+the stub and report request counts: logins with a valid ID token must not
+call /userinfo, logins with an ID token signed by an unknown key must fall
+back to it, and a /userinfo that fails once with a 503 must be retried.
+Run without --check to keep the server up and point the app at it via the
+printed variables.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+CLIENT_ID = "stub-client-id.apps.googleusercontent.com"
+CLIENT_SECRET = "stub-client-secret"
+KEY_ID = "stub-key-1"
+USER = {
+    "email": "stub.user@example.com",
+    "email_verified": True,
+    "name": "Stub User",
+    "picture": "https://example.com/avatar.png",
+}
+
+request_counts = Counter()
+# Stub modes: responses still to fail with a 503, by path, and whether
+# /token signs its ID token with a key /certs does not publish
+failures = Counter()
+modes = {"unknown_key": False}
+
+
+def generate_key_and_cert():
+    """Generate an RSA key and a self-signed certificate (PEM strings)."""
+    try:
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+        from cryptography.x509.oid import NameOID
+    except ImportError:
+        print("The stub server needs the 'cryptography' package to sign ID tokens.")
+        sys.exit(1)
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "oauth-stub")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+
+    key_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.TraditionalOpenSSL,
+        serialization.NoEncryption()
+    ).decode()
+    cert_pem = cert.public_bytes(serialization.Encoding.PEM).decode()
+    return key_pem, cert_pem
+
+
+def make_handler(key_pem: str, cert_pem: str):
+    from google.auth import crypt, jwt
+
+    signer = crypt.RSASigner.from_string(key_pem, key_id=KEY_ID)
+    unknown_signer = crypt.RSASigner.from_string(generate_key_and_cert()[0], key_id="stub-key-unknown")
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def _send_json(self, payload, headers=None):
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _fail(self) -> bool:
+            """Answer with a 503 if the path still has failures queued."""
+            if not failures[self.path]:
+                return False
+            failures[self.path] -= 1
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return True
+
+        def do_POST(self):
+            request_counts[self.path] += 1
+            length = int(self.headers.get("Content-Length", 0))
+            self.rfile.read(length)
+            if self._fail():
+                return
+
+            if self.path != "/token":
+                self.send_error(404)
+                return
+
+            now = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+            claims = dict(USER, iss="https://accounts.google.com", aud=CLIENT_ID,
+                          sub="1234567890", iat=now, exp=now + 3600)
+            self._send_json({
+                "access_token": "stub-access-token",
+                "expires_in": 3599,
+                "token_type": "Bearer",
+                "id_token": jwt.encode(unknown_signer if modes["unknown_key"] else signer, claims).decode(),
+            })
+
+        def do_GET(self):
+            request_counts[self.path] += 1
+            if self._fail():
+                return
+
+            if self.path == "/certs":
+                self._send_json({KEY_ID: cert_pem}, {"Cache-Control": "public, max-age=3600"})
+            elif self.path == "/userinfo":
+                self._send_json(USER)
+            else:
+                self.send_error(404)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_server(port: int = 0) -> ThreadingHTTPServer:
+    key_pem, cert_pem = generate_key_and_cert()
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(key_pem, cert_pem))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stub_environment(base_url: str) -> dict:
+    return {
+        "GOOGLE_CLIENT_ID": CLIENT_ID,
+        "GOOGLE_CLIENT_SECRET": CLIENT_SECRET,
+        "GOOGLE_TOKEN_URL": f"{base_url}/token",
+        "GOOGLE_USERINFO_URL": f"{base_url}/userinfo",
+        "GOOGLE_CERTS_URL": f"{base_url}/certs",
+    }
+
+
+class StubQueryParams(dict):
+    """Stands in for st.query_params outside a Streamlit run."""
+
+    def clear(self):
+        super().clear()
+
+
+def callback_login(google_oauth) -> bool:
+    """One pass through handle_google_callback, as on the redirect back from Google."""
+    import streamlit as st
+
+    st.query_params = StubQueryParams(code="stub-code")
+    result = google_oauth.handle_google_callback()
+    return bool(result) and result[0] == USER["email"] and not st.query_params
+
+
+def run_check(base_url: str, logins: int) -> bool:
+    """Drive the OAuth callback against the stub and check which endpoints it used."""
+    os.environ.update(stub_environment(base_url))
+
+    from auth import google_oauth
+
+    checks = []
+
+    # A verified ID token carries the profile: no userinfo call
+    ok = all(callback_login(google_oauth) for _ in range(logins))
+    checks.append((f"{logins} logins with a valid ID token", ok))
+    checks.append(("certificates fetched once", request_counts["/certs"] == 1))
+    checks.append(("userinfo never called", request_counts["/userinfo"] == 0))
+
+    # An ID token that does not verify falls back to userinfo
+    modes["unknown_key"] = True
+    ok = callback_login(google_oauth)
+    checks.append(("unverifiable ID token falls back to userinfo", ok and request_counts["/userinfo"] == 1))
+
+    # A transient 503 from userinfo is retried
+    failures["/userinfo"] = 1
+    ok = callback_login(google_oauth) and request_counts["/userinfo"] == 3
+    checks.append(("userinfo 503 is retried", ok and not failures["/userinfo"]))
+    modes["unknown_key"] = False
+
+    cache = google_oauth.get_cert_request()
+    print(f"Requests served: {dict(request_counts)}")
+    print(f"Certificate cache: {cache.hits} hits, {cache.misses} misses")
+    for description, passed in checks:
+        print(f"  {'ok  ' if passed else 'FAIL'} {description}")
+    ok = all(passed for _, passed in checks)
+    print("PASS" if ok else "FAIL")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=0, help="Port to listen on (default: random)")
+    parser.add_argument("--check", action="store_true", help="Run the client against the stub and exit")
+    parser.add_argument("--logins", type=int, default=5, help="Number of logins for --check")
+    args = parser.parse_args()
+
+    server = start_server(args.port)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    if args.check:
+        sys.exit(0 if run_check(base_url, args.logins) else 1)
+
+    print(f"OAuth stub listening on {base_url}")
+    for name, value in stub_environment(base_url).items():
+        print(f"export {name}={value}")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
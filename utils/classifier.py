@@ -0,0 +1,300 @@
+"""
+Keyword classification of question text into exam domains and AWS services.
+
+Every keyword table (domain keywords for card content, domain keywords for
+quiz titles, service names) is compiled into one Aho-Corasick automaton, so
+a text is scanned once, character by character, whatever the number of
+keywords. classify() returns the weighted domain scores, the domain of the
+best matching title keyword and the services mentioned; the importers and
+any re-tagging job share the module-level `classifier`.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Domain keywords for question and card content. A domain scores the
+# weight of each of its keywords found in the text (each counted once)
+DOMAIN_KEYWORDS = {
+    "1": ["iam", "security", "encryption", "kms", "cognito", "guard duty", "policy", "role", "mfa", "access key"],
+    "2": ["rds", "aurora", "elasticache", "route 53", "multi-az", "replica", "failover", "backup", "disaster", "recovery", "high availability", "scalability", "load balancer"],
+    "3": ["ec2", "s3", "ebs", "efs", "lambda", "dynamodb", "cloudfront", "vpc", "subnet", "kinesis", "sqs", "sns", "container", "ecs", "eks"],
+    "4": ["cost", "pricing", "reserved", "spot", "savings", "budget", "architecture"]
+}
+DEFAULT_DOMAIN = "3"
+
+# Mapping quiz titles to domains; the first keyword in this order found in
+# a title decides
+TITLE_DOMAINS = {
+    # Domain 1: Design Secure Architectures (30%)
+    "iam": "1",
+    "security": "1",
+    "encryption": "1",
+    "cli": "1",
+
+    # Domain 2: Design Resilient Architectures (26%)
+    "high availability": "2",
+    "scalability": "2",
+    "disaster recovery": "2",
+    "migration": "2",
+    "rds": "2",
+    "aurora": "2",
+    "elasticache": "2",
+    "route 53": "2",
+
+    # Domain 3: Design High-Performing Architectures (24%)
+    "ec2": "3",
+    "s3": "3",
+    "cloudfront": "3",
+    "storage": "3",
+    "databases": "3",
+    "containers": "3",
+    "serverless": "3",
+    "lambda": "3",
+    "messaging": "3",
+    "integration": "3",
+    "data management": "3",
+    "global accelerator": "3",
+
+    # Domain 4: Design Cost-Optimized Architectures (20%)
+    "solutions architecture": "4",
+    "whitepaper": "4",
+    "architectures": "4",
+
+    # Analytics & ML - Domain 3
+    "analytics": "3",
+    "machine learning": "3",
+
+    # Monitoring - Domain 2
+    "monitoring": "2",
+    "auditing": "2",
+
+    # VPC - Domain 1
+    "vpc": "1",
+
+    # Other services - Mixed
+    "other services": "3",
+}
+
+# Service tags: spellings found in text -> service name. Matched on whole
+# words only, so "s3" does not tag "ss3" and "ecs" does not tag "specs"
+SERVICE_KEYWORDS = {
+    "ec2": "EC2",
+    "auto scaling": "EC2 Auto Scaling",
+    "s3": "S3",
+    "glacier": "S3 Glacier",
+    "ebs": "EBS",
+    "efs": "EFS",
+    "fsx": "FSx",
+    "storage gateway": "Storage Gateway",
+    "snowball": "Snow Family",
+    "snowmobile": "Snow Family",
+    "datasync": "DataSync",
+    "lambda": "Lambda",
+    "fargate": "Fargate",
+    "ecs": "ECS",
+    "eks": "EKS",
+    "ecr": "ECR",
+    "elastic beanstalk": "Elastic Beanstalk",
+    "rds": "RDS",
+    "aurora": "Aurora",
+    "dynamodb": "DynamoDB",
+    "dax": "DynamoDB",
+    "elasticache": "ElastiCache",
+    "redshift": "Redshift",
+    "neptune": "Neptune",
+    "documentdb": "DocumentDB",
+    "vpc": "VPC",
+    "subnet": "VPC",
+    "nat gateway": "VPC",
+    "transit gateway": "Transit Gateway",
+    "direct connect": "Direct Connect",
+    "route 53": "Route 53",
+    "cloudfront": "CloudFront",
+    "global accelerator": "Global Accelerator",
+    "load balancer": "Elastic Load Balancing",
+    "elastic load balancing": "Elastic Load Balancing",
+    "elb": "Elastic Load Balancing",
+    "alb": "Elastic Load Balancing",
+    "nlb": "Elastic Load Balancing",
+    "api gateway": "API Gateway",
+    "sqs": "SQS",
+    "sns": "SNS",
+    "eventbridge": "EventBridge",
+    "step functions": "Step Functions",
+    "kinesis": "Kinesis",
+    "athena": "Athena",
+    "glue": "Glue",
+    "emr": "EMR",
+    "quicksight": "QuickSight",
+    "sagemaker": "SageMaker",
+    "rekognition": "Rekognition",
+    "iam": "IAM",
+    "cognito": "Cognito",
+    "kms": "KMS",
+    "cloudhsm": "CloudHSM",
+    "secrets manager": "Secrets Manager",
+    "guardduty": "GuardDuty",
+    "guard duty": "GuardDuty",
+    "waf": "WAF",
+    "shield": "Shield",
+    "macie": "Macie",
+    "inspector": "Inspector",
+    "cloudwatch": "CloudWatch",
+    "cloudtrail": "CloudTrail",
+    "aws config": "Config",
+    "cloudformation": "CloudFormation",
+    "systems manager": "Systems Manager",
+    "organizations": "Organizations",
+}
+
+Entry = Union[str, Tuple[str, float]]
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over lowercase keywords, with the failure links
+    folded into the transitions so the scan takes one lookup per character.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = list(dict.fromkeys(keyword.lower() for keyword in keywords))
+        goto: List[Dict[str, int]] = [{}]
+        out: List[Tuple[int, ...]] = [()]
+
+        for index, keyword in enumerate(self.keywords):
+            node = 0
+            for char in keyword:
+                child = goto[node].get(char)
+                if child is None:
+                    child = len(goto)
+                    goto[node][char] = child
+                    goto.append({})
+                    out.append(())
+                node = child
+            out[node] += (index,)
+
+        # Breadth first, each state takes over the transitions of its failure
+        # state (the longest proper suffix that is also a path from the root)
+        # that it does not have itself, and inherits its outputs
+        self._next: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            self._next[node] = {**self._next[fail[node]], **goto[node]}
+            for char, child in goto[node].items():
+                fail[child] = self._next[fail[node]].get(char, 0) if node else 0
+                out[child] += out[fail[child]]
+                queue.append(child)
+        self._out = out
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int]]:
+        """(start, keyword index) of every occurrence in lowercase text, overlaps included."""
+        transitions, out, keywords = self._next, self._out, self.keywords
+        node = 0
+        for position, char in enumerate(text):
+            node = transitions[node].get(char, 0)
+            if out[node]:
+                for index in out[node]:
+                    yield position - len(keywords[index]) + 1, index
+
+
+@dataclass
+class Classification:
+    """What classify() found in one text."""
+    # Table name -> keywords found, in table order
+    keywords: Dict[str, List[str]] = field(default_factory=dict)
+    # Domain -> summed weight of its content keywords found
+    domain_scores: Dict[str, float] = field(default_factory=dict)
+    # Domain of the first title keyword (in TITLE_DOMAINS order) found
+    title_domain: Optional[str] = None
+    # Services mentioned, in SERVICE_KEYWORDS order
+    services: List[str] = field(default_factory=list)
+
+    def domain(self, default: Optional[str] = DEFAULT_DOMAIN) -> Optional[str]:
+        """Highest scoring domain; ties go to the domain listed first."""
+        best = max(self.domain_scores.values(), default=0)
+        if best <= 0:
+            return default
+        return next(d for d, score in self.domain_scores.items() if score == best)
+
+
+class TopicClassifier:
+    """
+    Keyword tables compiled into one automaton. A table maps each keyword to
+    a label, or to (label, weight); weights default to 1.
+    """
+
+    def __init__(self, tables: Dict[str, Dict[str, Entry]], whole_word_tables: Iterable[str] = ()):
+        self.tables: Dict[str, Dict[str, Tuple[str, float]]] = {
+            name: {keyword.lower(): (entry, 1.0) if isinstance(entry, str) else tuple(entry)
+                   for keyword, entry in table.items()}
+            for name, table in tables.items()
+        }
+        self.whole_word_tables = set(whole_word_tables)
+        self.automaton = KeywordAutomaton(keyword for table in self.tables.values() for keyword in table)
+
+        # Keyword index -> (table, position in table) for every table holding it
+        rank = {name: {keyword: i for i, keyword in enumerate(table)} for name, table in self.tables.items()}
+        self._owners: List[List[Tuple[str, int]]] = [
+            [(name, rank[name][keyword]) for name in self.tables if keyword in rank[name]]
+            for keyword in self.automaton.keywords
+        ]
+
+    def matches(self, text: str) -> Dict[str, List[str]]:
+        """Keywords of each table found in text, in table order, each once."""
+        text = text.lower()
+        found: Dict[str, Dict[int, str]] = {name: {} for name in self.tables}
+        for start, index in self.automaton.finditer(text):
+            keyword = self.automaton.keywords[index]
+            for name, position in self._owners[index]:
+                if position in found[name]:
+                    continue
+                if name in self.whole_word_tables and not _whole_word(text, start, start + len(keyword)):
+                    continue
+                found[name][position] = keyword
+        return {name: [hits[i] for i in sorted(hits)] for name, hits in found.items()}
+
+    def scores(self, keywords: Iterable[str], table: str) -> Dict[str, float]:
+        """Summed weight per label of the given keywords of a table."""
+        totals: Dict[str, float] = {}
+        for keyword in keywords:
+            label, weight = self.tables[table][keyword]
+            totals[label] = totals.get(label, 0.0) + weight
+        return totals
+
+    def labels(self, keywords: Iterable[str], table: str) -> List[str]:
+        """Labels of the given keywords of a table, each once, in keyword order."""
+        return list(dict.fromkeys(self.tables[table][keyword][0] for keyword in keywords))
+
+
+def _whole_word(text: str, start: int, end: int) -> bool:
+    return (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+
+
+class QuestionClassifier(TopicClassifier):
+    """TopicClassifier over this module's domain, title and service tables."""
+
+    def __init__(self):
+        super().__init__(
+            {
+                "domain": {keyword: domain for domain, keywords in DOMAIN_KEYWORDS.items() for keyword in keywords},
+                "title": TITLE_DOMAINS,
+                "service": SERVICE_KEYWORDS,
+            },
+            whole_word_tables=["service"],
+        )
+
+    def classify(self, text: str) -> Classification:
+        """Domain scores, title domain and services of a text, in one pass over it."""
+        keywords = self.matches(text)
+        scores = self.scores(keywords["domain"], "domain")
+        return Classification(
+            keywords=keywords,
+            domain_scores={d: scores.get(d, 0.0) for d in DOMAIN_KEYWORDS},
+            title_domain=self.tables["title"][keywords["title"][0]][0] if keywords["title"] else None,
+            services=self.labels(keywords["service"], "service"),
+        )
+
+
+classifier = QuestionClassifier()
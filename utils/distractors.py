@@ -0,0 +1,188 @@
+"""
+Similarity-ranked distractors for generated questions.
+
+DistractorEngine builds a sparse TF-IDF matrix of character n-grams over
+all candidate answers once. For each correct answer it returns the k most
+similar candidates (cosine similarity) that are not the answer itself, so
+wrong options look like the right one instead of being picked at random.
+
+Only numpy is needed. N-grams are taken over UTF-8 bytes and packed into
+int64 keys, and the matrix is kept as posting lists (the answers holding
+each n-gram). Similarities for a batch of queries are accumulated over the
+posting lists of their n-grams in a few array operations. Each query walks
+its n-grams from the rarest up within a fixed budget of posting entries,
+which keeps the work per query bounded whatever the pool size; what falls
+outside the budget are the common n-grams, which weigh least in the cosine.
+"""
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_NGRAM_RANGE = (3, 5)
+# Posting list entries one query may visit; past it, a query's commonest
+# n-grams ("amazon", "the ") are left out
+QUERY_BUDGET = 2048
+# Queries scored at once
+QUERY_BATCH = 1024
+
+
+def normalize_answer_text(text: str) -> str:
+    return ' '.join(text.lower().split())
+
+
+def _ngram_keys(texts: Sequence[str], ngram_range: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (row, key) for every byte n-gram inside the words of every text, each
+    word padded with spaces, so n-grams never span two words. Keys are the
+    n-gram bytes packed into an int64 with the length on top, so n-grams of
+    different lengths never collide.
+    """
+    low, high = ngram_range
+    words = [text.split() for text in texts]
+    encoded = [f' {word} '.encode('utf-8') for text_words in words for word in text_words]
+    lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+    data = np.frombuffer(b''.join(encoded), dtype=np.uint8).astype(np.int64)
+    ends = np.cumsum(lengths)
+    word_of_byte = np.repeat(np.arange(len(encoded), dtype=np.int64), lengths)
+    row_of_word = np.repeat(np.arange(len(texts), dtype=np.int64), [len(w) for w in words])
+
+    rows, keys = [], []
+    for n in range(low, high + 1):
+        if len(data) < n:
+            continue
+        count = len(data) - n + 1
+        key = np.full(count, n, dtype=np.int64)
+        for offset in range(n):
+            key = (key << 8) | data[offset:offset + count]
+        # Keep n-grams that lie inside one word
+        word = word_of_byte[:count]
+        inside = np.arange(count, dtype=np.int64) + n <= ends[word]
+        rows.append(row_of_word[word[inside]])
+        keys.append(key[inside])
+
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(rows), np.concatenate(keys)
+
+
+class DistractorEngine:
+    """Nearest-neighbour lookup over a fixed set of candidate answers."""
+
+    def __init__(self, answers: Iterable[str], ngram_range: Tuple[int, int] = DEFAULT_NGRAM_RANGE,
+                 query_budget: int = QUERY_BUDGET):
+        self.ngram_range = ngram_range
+        self.query_budget = query_budget
+        self.answers: List[str] = []
+        self._index: Dict[str, int] = {}
+        for answer in answers:
+            key = normalize_answer_text(answer or '')
+            if key and key not in self._index:
+                self._index[key] = len(self.answers)
+                self.answers.append(answer)
+
+        rows, keys = _ngram_keys([normalize_answer_text(a) for a in self.answers], ngram_range)
+        self.vocabulary, features = np.unique(keys, return_inverse=True)
+
+        # Term counts per (answer, n-gram)
+        pairs, tf = np.unique(rows * len(self.vocabulary) + features, return_counts=True)
+        rows, features = np.divmod(pairs, len(self.vocabulary)) if len(self.vocabulary) else (pairs, pairs)
+
+        n_answers = len(self.answers)
+        df = np.bincount(features, minlength=len(self.vocabulary))
+        self.idf = np.log((1 + n_answers) / (1 + df)) + 1.0
+        weights = (1.0 + np.log(tf)) * self.idf[features]
+        weights /= np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=n_answers))[rows]
+
+        # Posting lists: the answers holding each n-gram
+        order = np.argsort(features, kind='stable')
+        self._post_rows = rows[order]
+        self._post_weights = weights[order]
+        self._post_ptr = np.concatenate(([0], np.cumsum(df)))
+
+    def __len__(self):
+        return len(self.answers)
+
+    def _vectorize(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (row, feature, weight) of L2-normalized TF-IDF vectors over the
+        engine's vocabulary, sorted by row, trimmed to the query budget.
+        """
+        rows, keys = _ngram_keys([normalize_answer_text(t) for t in texts], self.ngram_range)
+        features = np.searchsorted(self.vocabulary, keys)
+        known = features < len(self.vocabulary)
+        known[known] = self.vocabulary[features[known]] == keys[known]
+
+        # N-grams no answer has still count towards the norm, with the highest idf
+        unknown_keys, unknown = np.unique(keys[~known], return_inverse=True)
+        features[~known] = len(self.vocabulary) + unknown
+        idf = np.concatenate((self.idf, np.full(len(unknown_keys), np.log(1 + len(self.answers)) + 1.0)))
+
+        width = max(len(idf), 1)
+        pairs, tf = np.unique(rows * width + features, return_counts=True)
+        rows, features = np.divmod(pairs, width)
+        weights = (1.0 + np.log(tf)) * idf[features]
+        weights /= np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=len(texts)))[rows]
+
+        # Rarest n-grams first, for as long as their posting lists fit the budget
+        known = features < len(self.vocabulary)
+        rows, features, weights = rows[known], features[known], weights[known]
+        df = self._post_ptr[features + 1] - self._post_ptr[features]
+        order = np.lexsort((features, df, rows))
+        rows, features, weights, df = rows[order], features[order], weights[order], df[order]
+        spent = np.cumsum(df)
+        spent -= (spent - df)[np.searchsorted(rows, rows)]
+        keep = spent <= self.query_budget
+        return rows[keep], features[keep], weights[keep]
+
+    def _scores(self, rows: np.ndarray, features: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sparse similarities for a batch of query vectors, as sorted cells
+        (row * answers + answer) and values: the cosine over the n-grams each
+        query kept.
+        """
+        starts = self._post_ptr[features]
+        lengths = self._post_ptr[features + 1] - starts
+        total = int(lengths.sum())
+
+        # Expand every query n-gram into the answers that share it
+        offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        postings = np.repeat(starts, lengths) + offsets
+        cells = np.repeat(rows, lengths) * len(self.answers) + self._post_rows[postings]
+        products = np.repeat(weights, lengths) * self._post_weights[postings]
+        cells, inverse = np.unique(cells, return_inverse=True)
+        return cells, np.bincount(inverse, weights=products, minlength=len(cells))
+
+    def nearest(self, texts: Sequence[str], k: int = 3) -> List[List[str]]:
+        """
+        For each text, up to k candidate answers most similar to it, most
+        similar first. The text itself and answers sharing no n-gram with it
+        are never returned; ties go to the earlier answer.
+        """
+        n_answers = len(self.answers)
+        if not n_answers or k <= 0:
+            return [[] for _ in texts]
+
+        results: List[List[str]] = []
+        for start in range(0, len(texts), QUERY_BATCH):
+            batch = texts[start:start + QUERY_BATCH]
+            cells, scores = self._scores(*self._vectorize(batch))
+
+            # Never offer the answer itself
+            own = [(i, self._index.get(normalize_answer_text(text or ''))) for i, text in enumerate(batch)]
+            own = np.array([i * n_answers + index for i, index in own if index is not None], dtype=np.int64)
+            keep = ~np.isin(cells, own)
+            rows, columns = np.divmod(cells[keep], n_answers)
+            scores = scores[keep]
+
+            # Best first per query, then the earliest answer: cells are already
+            # in (row, column) order and scores lie in [0, 1], so one stable
+            # sort on 2 * row - score does it
+            order = np.argsort(2.0 * rows - scores, kind='stable')
+            rows, columns = rows[order], columns[order]
+            top = np.arange(len(rows)) - np.searchsorted(rows, rows) < k
+
+            picks: List[List[str]] = [[] for _ in batch]
+            for row, column in zip(rows[top].tolist(), columns[top].tolist()):
+                picks[row].append(self.answers[column])
+            results.extend(picks)
+        return results
@@ -0,0 +1,175 @@
+"""
+HTML fragments to Markdown-flavoured text.
+
+Question, answer and explanation fields from quiz pages and Anki notes are
+small HTML fragments. html_to_text() converts one in a single pass with
+html.parser, entities decoded as the text streams through, and keeps the
+structure the app can render as Markdown: paragraphs, <br> line breaks,
+ordered and unordered lists, inline code and <pre> blocks. Other tags are
+dropped and their text kept. Runs of whitespace collapse to one space
+outside <pre>.
+
+Fragments repeat a lot across a corpus ("Correct option:", common
+answers), so results are kept in an LRU cache shared by every caller in
+the process; fragments without markup or entities skip the parser.
+"""
+import re
+from functools import lru_cache
+from html.parser import HTMLParser
+from typing import List
+
+CACHE_SIZE = 16384
+
+# Tags that start and end a paragraph
+BLOCK_TAGS = frozenset({
+    'p', 'div', 'section', 'article', 'header', 'footer', 'blockquote', 'table', 'tr',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'dl', 'dt', 'dd', 'figure', 'hr',
+})
+# Tags whose content is not text
+SKIP_TAGS = frozenset({'script', 'style', 'head', 'title', 'template'})
+
+# Stands in for a <br> until lines are finished: a Markdown hard break
+# ("  \n") when more text follows on the next line, nothing otherwise
+_HARD_BREAK = '\x00'
+
+_WHITESPACE = re.compile(r'\s+')
+_BLANK_LINES = re.compile(r'\n{3,}')
+
+
+class _MarkdownWriter(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        # One entry per open list: the next item number, or None if unordered
+        self.lists: List = []
+        self.pre = 0
+        self.code = 0
+        # Nothing written since the opening backtick of inline code
+        self.code_opened = False
+        self.skip = 0
+
+    def _ends_with_space(self) -> bool:
+        # Right after an opening backtick counts, so inline code does not
+        # start with a space; a closing one does not
+        if self.code_opened:
+            return True
+        return not self.parts or self.parts[-1][-1:] in (' ', '\n', _HARD_BREAK)
+
+    def _trim(self):
+        while self.parts and self.parts[-1].endswith(' '):
+            self.parts[-1] = self.parts[-1].rstrip(' ')
+            if not self.parts[-1]:
+                self.parts.pop()
+
+    def _break(self, newlines: int):
+        """End the current line with at least `newlines` newlines (none at the start)."""
+        self._trim()
+        if not self.parts:
+            return
+        tail = ''.join(self.parts[-newlines:])
+        missing = newlines - (len(tail) - len(tail.rstrip('\n')))
+        if missing > 0:
+            self.parts.append('\n' * missing)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip += 1
+        elif self.skip:
+            return
+        elif tag == 'br':
+            self._trim()
+            self.parts.append(_HARD_BREAK + '\n')
+        elif tag in BLOCK_TAGS:
+            self._break(2)
+        elif tag in ('ul', 'ol'):
+            self._break(1 if self.lists else 2)
+            self.lists.append(1 if tag == 'ol' else None)
+        elif tag == 'li':
+            self._break(1)
+            indent = '   ' * max(len(self.lists) - 1, 0)
+            if self.lists and self.lists[-1] is not None:
+                self.parts.append(f'{indent}{self.lists[-1]}. ')
+                self.lists[-1] += 1
+            else:
+                self.parts.append(f'{indent}- ')
+        elif tag == 'pre':
+            self._break(2)
+            self.parts.append('```\n')
+            self.pre += 1
+        elif tag == 'code' and not self.pre:
+            if not self.code:
+                self.parts.append('`')
+                self.code_opened = True
+            self.code += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in ('br', 'hr'):
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self.skip = max(self.skip - 1, 0)
+        elif self.skip:
+            return
+        elif tag in BLOCK_TAGS:
+            self._break(2)
+        elif tag in ('ul', 'ol'):
+            if self.lists:
+                self.lists.pop()
+            self._break(1 if self.lists else 2)
+        elif tag == 'li':
+            self._break(1)
+        elif tag == 'pre' and self.pre:
+            self.pre -= 1
+            if self.parts and not self.parts[-1].endswith('\n'):
+                self.parts.append('\n')
+            self.parts.append('```')
+            self._break(2)
+        elif tag == 'code' and self.code and not self.pre:
+            self.code -= 1
+            if not self.code:
+                self._trim()
+                if self.code_opened and self.parts and self.parts[-1] == '`':
+                    # Empty span: drop the opening backtick too
+                    self.parts.pop()
+                else:
+                    self.parts.append('`')
+                self.code_opened = False
+
+    def handle_data(self, data):
+        if self.skip or not data:
+            return
+        if self.pre:
+            self.parts.append(data)
+            return
+        data = _WHITESPACE.sub(' ', data)
+        if self._ends_with_space():
+            data = data.lstrip(' ')
+        if data:
+            self.parts.append(data)
+            self.code_opened = False
+
+    def text(self) -> str:
+        self.close()
+        lines = ''.join(self.parts).split('\n')
+        for i, line in enumerate(lines):
+            if line.endswith(_HARD_BREAK):
+                line = line.rstrip(_HARD_BREAK)
+                if line and i + 1 < len(lines) and lines[i + 1].replace(_HARD_BREAK, '').strip():
+                    line += '  '
+            lines[i] = line.replace(_HARD_BREAK, '')
+        return _BLANK_LINES.sub('\n\n', '\n'.join(lines)).strip()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def html_to_text(fragment: str) -> str:
+    """Markdown-flavoured text of an HTML fragment (see the module docstring)."""
+    if not fragment:
+        return ""
+    if '<' not in fragment and '&' not in fragment:
+        return ' '.join(fragment.split())
+
+    writer = _MarkdownWriter()
+    writer.feed(fragment)
+    return writer.text()